@@ -0,0 +1,64 @@
+"""Upstream requests and latency for concurrent get_profile_analytics calls, one profile each.
+
+Calls for the same period and metrics that arrive within the batching window
+share one /analytics/profiles request.
+
+    python -m benchmarks.bench_batching --callers 50 --latency 0.1
+    python -m benchmarks.bench_batching --rate-limit 600   # under a tight rate limit
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from .fake_api import TOKEN, create_app, serve
+
+WINDOWS_MS = (0, 2, 5, 20)
+
+
+async def main(args: argparse.Namespace) -> None:
+    app = create_app(latency=args.latency, profiles=args.callers, page_size=args.page_size)
+    fake = app.state.fake
+    os.environ.update({
+        "SPROUT_API_BASE_URL": f"http://127.0.0.1:{args.port}",
+        "SPROUT_API_TOKEN": TOKEN,
+        "SPROUT_CUSTOMER_ID": "1",
+        "SPROUT_RATE_LIMIT": str(args.rate_limit),
+        "SPROUT_RATE_LIMIT_BURST": str(min(args.rate_limit, 10)),
+    })
+    from sprout_mcp import server
+
+    async def call(profile: int) -> tuple[float, int]:
+        t0 = time.perf_counter()
+        result = await server.mcp.call_tool("get_profile_analytics", {
+            "profile_ids": str(1000 + profile), "start_time": "2024-01-01T00:00:00", "end_time": "2024-01-31T23:59:59",
+        })
+        rows = json.loads(result[0][0].text)["data"]
+        assert all(r["dimensions"]["customer_profile_id"] == 1000 + profile for r in rows)
+        return time.perf_counter() - t0, len(rows)
+
+    async with serve(port=args.port, app=app), server._lifespan(server.mcp):
+        for window in WINDOWS_MS:
+            server._analytics_cache.clear()
+            server._analytics_cache.batch_window = window / 1000
+            fake.reset()
+            results = await asyncio.gather(*(call(p) for p in range(args.callers)))
+            latencies = sorted(t for t, _ in results)
+            print(
+                f"window={window:>3}ms callers={args.callers} upstream={fake.calls['analytics/profiles']:<4} "
+                f"rows={sum(n for _, n in results):<6} p50={statistics.median(latencies) * 1000:6.0f}ms "
+                f"max={latencies[-1] * 1000:6.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--page-size", type=int, default=100, help="rows per fake API page")
+    parser.add_argument("--rate-limit", type=int, default=1_000_000, help="SPROUT_RATE_LIMIT, requests per minute")
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,71 @@
+"""A campaign calendar: N sequential create_post calls vs one create_posts_bulk call.
+
+Some requests are throttled (HTTP 429) and some posts are created but their
+response is lost (HTTP 502). The bulk call is then replayed, as a client
+would after a timeout, to show that nothing is posted twice. Only tool and
+API time is measured; a real agent also pays an LLM round trip per
+sequential call.
+
+    python -m benchmarks.bench_bulk --posts 300 --latency 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from .fake_api import TOKEN, create_app, serve
+
+
+async def main(args: argparse.Namespace) -> None:
+    app = create_app(
+        latency=args.latency, error_rate=args.error_rate, lost_create_rate=args.lost_rate, retry_after=0.05
+    )
+    fake = app.state.fake
+    ledger = os.path.join(tempfile.mkdtemp(), "posts-ledger.jsonl")
+    os.environ.update({
+        "SPROUT_API_BASE_URL": f"http://127.0.0.1:{args.port}",
+        "SPROUT_API_TOKEN": TOKEN,
+        "SPROUT_CUSTOMER_ID": "1",
+        "SPROUT_RATE_LIMIT": "1000000",
+        "SPROUT_RETRY_BASE_DELAY": "0.05",
+        "SPROUT_RESULT_HANDLE_BYTES": "0",
+        "SPROUT_POST_LEDGER": ledger,
+        "SPROUT_BULK_CONCURRENCY": str(args.concurrency),
+    })
+    from sprout_mcp import server
+
+    specs = [
+        {"profile_ids": [str(1000 + i % 10)], "text": f"Campaign post {i}", "scheduled_send_time": f"2030-01-{1 + i % 28:02d}T12:00:00"}
+        for i in range(args.posts)
+    ]
+
+    async with serve(port=args.port, app=app), server._lifespan(server.mcp):
+        t0 = time.perf_counter()
+        failed = 0
+        for spec in specs:
+            r = json.loads((await server.mcp.call_tool("create_post", {**spec, "profile_ids": ",".join(spec["profile_ids"])}))[0][0].text)
+            failed += "error" in r
+        print(f"{'sequential create_post':<28} {time.perf_counter() - t0:6.2f}s  {failed} errors (not retried)")
+
+        fake.created.clear()
+        for label in ("create_posts_bulk", "replay"):
+            before = len(fake.created)
+            t0 = time.perf_counter()
+            r = json.loads((await server.mcp.call_tool("create_posts_bulk", {"posts": specs}))[0][0].text)
+            elapsed = time.perf_counter() - t0
+            print(f"{label:<28} {elapsed:6.2f}s  {r['summary']}  new posts upstream: {len(fake.created) - before}")
+        print(f"posts upstream: {len(fake.created)} for {args.posts} specs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--error-rate", type=float, default=0.05, help="share of requests answered with HTTP 429")
+    parser.add_argument("--lost-rate", type=float, default=0.02, help="share of creations answered with HTTP 502")
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
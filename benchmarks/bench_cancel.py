@@ -0,0 +1,89 @@
+"""Check that cancelling a tool call stops all of its upstream traffic.
+
+Each scenario starts a tool call in-process and, once the fake API has seen
+a few of its requests, cancels it the way the MCP session does (an anyio
+cancel scope), then watches the fake API for a while. Any request that arrives after the cancel is a leak.
+
+    python -m benchmarks.bench_cancel --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import Any
+
+import anyio
+
+from .fake_api import TOKEN, create_app, serve
+from .loadgen import END, START, TOPIC
+
+# scenario -> (tool, arguments, upstream requests to let through before cancelling)
+SCENARIOS: dict[str, tuple[str, dict[str, Any], int]] = {
+    "single request": ("get_post_analytics", {"profile_ids": "1000", "start_time": START, "end_time": END}, 1),
+    "auto_paginate": ("get_listening_messages", {
+        "topic_id": TOPIC, "start_time": START, "end_time": END, "auto_paginate": True, "max_items": 100000,
+    }, 3),
+    "sharded pull": ("get_listening_messages", {
+        "topic_id": TOPIC, "start_time": START, "end_time": END, "auto_paginate": True,
+        "max_items": 100000, "shards": 8,
+    }, 12),
+    "analytics days": ("get_profile_analytics", {
+        "profile_ids": "1000,1001", "start_time": START, "end_time": END,
+    }, 1),
+}
+
+
+async def _cancelled_call(fake: Any, name: str, args: dict[str, Any], requests: int) -> None:
+    """Run a tool call and cancel it as soon as the fake API has seen `requests` requests."""
+    from sprout_mcp import server
+
+    async with anyio.create_task_group() as tg:
+        async def call() -> None:
+            await server.mcp.call_tool(name, args)
+            raise RuntimeError(f"{name} finished before it could be cancelled; raise --latency")
+
+        tg.start_soon(call)
+        while sum(fake.calls.values()) < requests:
+            await asyncio.sleep(0.001)
+        tg.cancel_scope.cancel()
+
+
+async def main(args: argparse.Namespace) -> int:
+    app = create_app(latency=args.latency, page_size=50)
+    fake = app.state.fake
+    os.environ.update({
+        "SPROUT_API_BASE_URL": f"http://127.0.0.1:{args.port}",
+        "SPROUT_API_TOKEN": TOKEN,
+        "SPROUT_CUSTOMER_ID": "1",
+        "SPROUT_RATE_LIMIT": "1000000",
+    })
+    from sprout_mcp import server
+
+    leaks = 0
+    async with serve(port=args.port, app=app), server._lifespan(server.mcp):
+        for label, (name, tool_args, requests) in SCENARIOS.items():
+            fake.reset()
+            server._analytics_cache.clear()
+            await _cancelled_call(fake, name, tool_args, requests)
+            at_cancel = sum(fake.calls.values())
+            await asyncio.sleep(args.settle)
+            after = sum(fake.calls.values()) - at_cancel
+            in_flight = server._get_client().diagnostics()["requests"]["in_flight"]
+            ok = after == 0 and in_flight == 0
+            leaks += not ok
+            print(
+                f"{label:<16} requests before cancel={at_cancel:<4} after={after:<4} "
+                f"in_flight={in_flight} {'ok' if ok else 'LEAK'}"
+            )
+        cancelled = {k: v["cancelled"] for k, v in server._metrics.snapshot()["tools"].items()}
+        print(f"\ncancelled tool calls recorded: {cancelled}")
+    return 1 if leaks else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake API latency in seconds")
+    parser.add_argument("--settle", type=float, default=1.0, help="seconds to watch for late requests")
+    parser.add_argument("--port", type=int, default=8765)
+    sys.exit(asyncio.run(main(parser.parse_args())))
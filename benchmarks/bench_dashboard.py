@@ -0,0 +1,58 @@
+"""A weekly overview: five sequential tool calls vs one get_dashboard call.
+
+Only tool and API time is measured; a real agent also pays an LLM round
+trip between each sequential call.
+
+    python -m benchmarks.bench_dashboard --latency 0.1
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from .fake_api import TOKEN, create_app, serve
+
+PERIOD = {"start_time": "2024-01-01T00:00:00", "end_time": "2024-01-07T23:59:59"}
+
+
+async def main(args: argparse.Namespace) -> None:
+    app = create_app(latency=args.latency, profiles=args.profiles)
+    os.environ.update({
+        "SPROUT_API_BASE_URL": f"http://127.0.0.1:{args.port}",
+        "SPROUT_API_TOKEN": TOKEN,
+        "SPROUT_CUSTOMER_ID": "1",
+        "SPROUT_RATE_LIMIT": "1000000",
+    })
+    from sprout_mcp import server
+
+    ids = ",".join(str(1000 + i) for i in range(args.profiles))
+    sequential = [
+        ("list_profiles", {}),
+        ("get_profile_analytics", {"profile_ids": ids, **PERIOD}),
+        ("get_post_analytics", {"profile_ids": ids, "aggregate": True, **PERIOD}),
+        ("get_messages", {"profile_ids": ids, "auto_paginate": True, "max_items": 10000, "limit": 100, **PERIOD}),
+        ("list_publishing_posts", {"profile_ids": ids, **PERIOD}),
+    ]
+
+    async def run(calls: list[tuple[str, dict]]) -> tuple[float, int]:
+        server._analytics_cache.clear()
+        server._metadata_cache.clear()
+        t0 = time.perf_counter()
+        size = 0
+        for name, tool_args in calls:
+            size += len((await server.mcp.call_tool(name, tool_args))[0][0].text)
+        return time.perf_counter() - t0, size
+
+    async with serve(port=args.port, app=app), server._lifespan(server.mcp):
+        for label, calls in (("5 sequential tool calls", sequential), ("get_dashboard", [("get_dashboard", PERIOD)])):
+            elapsed, size = await run(calls)
+            print(f"{label:<24} {elapsed:6.2f}s {size / 1024:8.1f} KiB returned")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
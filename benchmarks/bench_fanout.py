@@ -0,0 +1,63 @@
+"""Profile analytics for a large profile group: one request vs concurrent batches.
+
+The fake API rejects filters on more than --max-profiles profiles, as the
+real API does for very long profile lists, so an unbatched request fails.
+
+    python -m benchmarks.bench_fanout --profiles 500 --latency 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from .fake_api import TOKEN, create_app, serve
+
+# (label, batch size, batches in flight)
+SCENARIOS = [
+    ("one request", 100_000, 1),
+    ("batches of 100, sequential", 100, 1),
+    ("batches of 50, 4 at once", 50, 4),
+    ("batches of 50, 8 at once", 50, 8),
+]
+
+
+async def main(args: argparse.Namespace) -> None:
+    app = create_app(
+        latency=args.latency, profiles=args.profiles, groups=1, max_filter_profiles=args.max_profiles, page_size=500
+    )
+    fake = app.state.fake
+    os.environ.update({
+        "SPROUT_API_BASE_URL": f"http://127.0.0.1:{args.port}",
+        "SPROUT_API_TOKEN": TOKEN,
+        "SPROUT_CUSTOMER_ID": "1",
+        "SPROUT_RATE_LIMIT": "1000000",
+    })
+    from sprout_mcp import server
+
+    tool_args = {"group_id": "0", "start_time": "2024-01-01T00:00:00", "end_time": f"2024-01-{args.days:02d}T23:59:59"}
+    async with serve(port=args.port, app=app), server._lifespan(server.mcp):
+        for label, batch_size, concurrency in SCENARIOS:
+            server._analytics_cache.clear()
+            server._analytics_cache.batch_size, server._analytics_cache.concurrency = batch_size, concurrency
+            fake.reset()
+            t0 = time.perf_counter()
+            result = json.loads((await server.mcp.call_tool("get_profile_analytics", tool_args))[0][0].text)
+            elapsed = time.perf_counter() - t0
+            if "error" in result:
+                outcome = f"{result['error']}: {result.get('detail') or result.get('message')}"
+            else:
+                rows = result["rows"] if "result_handle" in result else len(result["data"])
+                outcome = f"{rows:,} rows, {len(result.get('errors', []))} failed batches"
+            print(f"{label:<28} {elapsed:6.2f}s requests={fake.calls['analytics/profiles']:<4} {outcome}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=500)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--max-profiles", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""Concurrent throughput and tail latency: HTTP/1.1 pool vs HTTP/2 multiplexing.
+
+Needs the optional `h2` and `hypercorn` packages (uvicorn does not speak
+HTTP/2). The stand-in API is served over cleartext h2c, so the HTTP/2 client
+uses prior knowledge instead of TLS ALPN.
+
+    python -m benchmarks.bench_http2 --concurrency 64 --requests 2000 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import time
+from collections.abc import AsyncIterator
+
+from sprout_mcp.client import SproutClient
+
+from .fake_api import TOKEN, create_app
+
+
+@contextlib.asynccontextmanager
+async def _serve_h2c(port: int, latency: float) -> AsyncIterator[str]:
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.loglevel = "WARNING"
+    config.keep_alive_max_requests = 1_000_000
+    stop = asyncio.Event()
+    task = asyncio.create_task(serve(create_app(latency), config, shutdown_trigger=stop.wait))
+    await asyncio.sleep(0.5)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        stop.set()
+        await task
+
+
+async def _run(client: SproutClient, concurrency: int, requests: int) -> tuple[float, list[float]]:
+    sem = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await client.post("/v1/1/analytics/profiles", {"filters": [f"customer_profile_id.eq({i})"]})
+            samples.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - t0, samples
+
+
+def _report(name: str, elapsed: float, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000  # noqa: E731
+    print(
+        f"{name:<10} {len(samples) / elapsed:8.1f} req/s  mean={statistics.fmean(samples) * 1000:7.2f}ms "
+        f"p50={p(0.50):7.2f}ms p95={p(0.95):7.2f}ms p99={p(0.99):7.2f}ms"
+    )
+
+
+async def main(concurrency: int, requests: int, latency: float, port: int) -> None:
+    os.environ.setdefault("SPROUT_API_TOKEN", TOKEN)
+    os.environ.setdefault("SPROUT_RATE_LIMIT", "1000000")  # measure the transport, not the token bucket
+    async with _serve_h2c(port, latency) as base_url:
+        modes = [("http/1.1", {"http2": False}), ("http/2", {"http2": True, "http1": False})]
+        for name, options in modes:
+            async with SproutClient(base_url, **options) as client:
+                await _run(client, concurrency, concurrency)  # open connections first
+                _report(name, *await _run(client, concurrency, requests))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests, args.latency, args.port))
@@ -0,0 +1,95 @@
+"""Serialization time and output size for each output format and encoder.
+
+Payloads mimic the largest tool results: listening pages merged by
+auto_paginate and post analytics with lifetime metrics.
+
+    python -m benchmarks.bench_output
+"""
+
+import argparse
+import json
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sprout_mcp import output
+
+NETWORKS = ["REDDIT", "TWITTER", "FACEBOOK", "INSTAGRAM", "YOUTUBE", "NEWS", "BLOG"]
+WORDS = "recall product launch love hate shipping refund support update price new great bad".split()
+
+
+def listening_payload(n: int, rng: random.Random) -> dict[str, Any]:
+    return {
+        "data": [
+            {
+                "created_time": f"2024-01-{rng.randint(1, 31):02d}T{rng.randint(0, 23):02d}:00:00Z",
+                "text": " ".join(rng.choices(WORDS, k=rng.randint(8, 60))),
+                "network": rng.choice(NETWORKS),
+                "perma_link": f"https://example.com/post/{rng.getrandbits(48):x}",
+                "language": rng.choice(["en", "es", "fr", "de"]),
+            }
+            for _ in range(n)
+        ],
+        "paging": {"pages": n // 100 + 1, "shards": 1, "truncated": False},
+        "_meta": {"retries": 0},
+    }
+
+
+def post_analytics_payload(n: int, rng: random.Random) -> dict[str, Any]:
+    return {
+        "data": [
+            {
+                "created_time": f"2024-01-{rng.randint(1, 31):02d}T12:00:00Z",
+                "text": " ".join(rng.choices(WORDS, k=rng.randint(8, 40))),
+                "perma_link": f"https://example.com/p/{rng.getrandbits(48):x}",
+                "metrics": {
+                    m: rng.randint(0, 100_000)
+                    for m in ("lifetime.impressions", "lifetime.reactions", "lifetime.engagements", "lifetime.clicks")
+                },
+            }
+            for _ in range(n)
+        ],
+        "paging": {"current_page": 1, "total_pages": 1},
+        "_meta": {"retries": 0},
+    }
+
+
+def _time(fn: Callable[[], str], repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        text = fn()
+        best = min(best, time.perf_counter() - t0)
+        size = len(text.encode())
+    return best, size
+
+
+def main(repeat: int) -> None:
+    rng = random.Random(7)
+    stdlib = lambda data: lambda: json.dumps(data, indent=2)  # noqa: E731  (pre-change baseline)
+    print(f"{'payload':<24} {'encoder':<22} {'ms':>9} {'bytes':>11} {'vs baseline':>12}")
+    for name, build in (("listening", listening_payload), ("post_analytics", post_analytics_payload)):
+        for n in (100, 1_000, 10_000):
+            data = build(n, rng)
+            base_t, base_size = _time(stdlib(data), repeat)
+            rows = [("json indent=2 (old)", base_t, base_size)]
+            encoders = [("orjson", output.orjson), ("stdlib json", None)] if output.orjson else [("stdlib json", None)]
+            for label, impl in encoders:
+                saved, output.orjson = output.orjson, impl
+                try:
+                    for fmt in output.FORMATS:
+                        rows.append((f"{label} {fmt}", *_time(lambda: output.dumps(data, fmt), repeat)))
+                finally:
+                    output.orjson = saved
+            for enc, t, size in rows:
+                print(f"{name + f' x{n}':<24} {enc:<22} {t * 1000:9.3f} {size:11,d} {size / base_size:11.0%}")
+            print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.repeat)
@@ -0,0 +1,65 @@
+"""Per-call latency: a fresh httpx client per request vs the pooled SproutClient.
+
+    python -m benchmarks.bench_pool --calls 500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from sprout_mcp.client import SproutClient
+
+from .fake_api import TOKEN, serve
+
+
+def _report(name: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000  # noqa: E731
+    print(
+        f"{name:<16} mean={statistics.fmean(samples) * 1000:7.3f}ms "
+        f"p50={p(0.50):7.3f}ms p95={p(0.95):7.3f}ms p99={p(0.99):7.3f}ms"
+    )
+
+
+async def _fresh_client(base_url: str, calls: int) -> list[float]:
+    headers = {"Authorization": f"Bearer {TOKEN}", "Accept": "application/json"}
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        async with httpx.AsyncClient() as c:
+            r = await c.get(f"{base_url}/v1/1/metadata/customer", headers=headers, timeout=30)
+            r.raise_for_status()
+            r.json()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+async def _pooled_client(base_url: str, calls: int) -> list[float]:
+    samples = []
+    async with SproutClient(base_url) as client:
+        for _ in range(calls):
+            t0 = time.perf_counter()
+            await client.get("/v1/1/metadata/customer")
+            samples.append(time.perf_counter() - t0)
+    return samples
+
+
+async def main(calls: int, port: int) -> None:
+    os.environ.setdefault("SPROUT_API_TOKEN", TOKEN)
+    os.environ.setdefault("SPROUT_RATE_LIMIT", "1000000")  # measure the transport, not the token bucket
+    async with serve(port=port) as base_url:
+        await _pooled_client(base_url, 10)  # warm up the server
+        _report("fresh-per-call", await _fresh_client(base_url, calls))
+        _report("pooled", await _pooled_client(base_url, calls))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.port))
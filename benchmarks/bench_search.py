@@ -0,0 +1,71 @@
+"""Index build time, memory and query latency of the listening search index.
+
+Messages draw words from a Zipf-distributed vocabulary, so common words have
+long posting lists and rare ones short, as in real listening data.
+
+    python -m benchmarks.bench_search --messages 1000000
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import time
+import tracemalloc
+
+from sprout_mcp.search import SearchIndex
+
+from .fake_api import LANGUAGES, NETWORKS
+
+QUERIES = ['"product recall"', "recall refund", "battery crash", "w123 w456", "w40000", '"love the" app']
+
+
+def _messages(count: int, vocabulary: int, seed: int):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    words[:12] = ["the", "product", "recall", "love", "refund", "app", "battery", "crash", "new", "order", "bad", "great"]
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    for i in range(count):
+        yield {
+            "guid": f"m{i}",
+            "created_time": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00Z",
+            "text": " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(6, 40))),
+            "network": NETWORKS[i % len(NETWORKS)],
+            "language": LANGUAGES[i % len(LANGUAGES)],
+        }
+
+
+def main(count: int, vocabulary: int, limit: int) -> None:
+    index = SearchIndex()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    batch = []
+    for m in _messages(count, vocabulary, seed=1):
+        batch.append(m)
+        if len(batch) == 100:  # one API page at a time, as the tools feed it
+            index.add("1", "topic", batch)
+            batch = []
+    index.add("1", "topic", batch)
+    index.flush()
+    built = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"indexed {len(index):,} messages in {built:.1f}s ({len(index) / built:,.0f}/s), peak {peak / 2**20:,.0f} MiB")
+    for query in QUERIES:
+        for filters in ({}, {"networks": {"REDDIT"}, "start_time": "2024-06-01T00:00:00"}):
+            samples = []
+            for _ in range(3):
+                t0 = time.perf_counter()
+                _, matched = index.search(query, customer_id="1", limit=limit, **filters)
+                samples.append(time.perf_counter() - t0)
+            label = query + (" +filters" if filters else "")
+            print(f"{label:<32} matched={matched:>9,} median={statistics.median(samples) * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    main(args.messages, args.vocabulary, args.limit)
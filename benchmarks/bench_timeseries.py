@@ -0,0 +1,61 @@
+"""Time to compute profile trends (rolling averages, deltas, anomalies) from daily rows.
+
+Rows are shaped like get_profile_analytics output, with a few missing days
+and injected spikes so every code path does real work.
+
+    python -m benchmarks.bench_timeseries --profiles 500 --days 730
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sprout_mcp.analytics import DAY_KEY
+from sprout_mcp.timeseries import analyze
+
+
+def _rows(profiles: int, days: int, first: date, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for p in range(profiles):
+        scale = rng.uniform(100, 10_000)
+        for d in range(days):
+            if rng.random() < 0.02:  # a missing day
+                continue
+            impressions = max(0.0, rng.gauss(scale, scale * 0.1)) * (8 if rng.random() < 0.002 else 1)
+            rows.append({
+                "dimensions": {"customer_profile_id": p, DAY_KEY: (first + timedelta(days=d)).isoformat()},
+                "metrics": {
+                    "impressions": round(impressions),
+                    "engagements": round(impressions * rng.uniform(0.01, 0.05)),
+                    "net_follower_growth": rng.randint(-5, 20),
+                },
+            })
+    return rows
+
+
+def main(profiles: int, days: int, repeat: int) -> None:
+    first = date(2023, 1, 1)
+    last = first + timedelta(days=days - 1)
+    rows = _rows(profiles, days, first, seed=1)
+    ids = [str(p) for p in range(profiles)]
+    metrics = ["impressions", "engagements", "net_follower_growth"]
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = analyze(rows, ids, metrics, first, last)
+        samples.append(time.perf_counter() - t0)
+    anomalies = sum(len(p["anomalies"]) for p in result["profiles"].values())
+    print(f"{profiles} profiles x {days} days ({len(rows):,} rows): "
+          f"median {statistics.median(samples) * 1000:.0f}ms, max {max(samples) * 1000:.0f}ms, {anomalies} anomalies")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=500)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.profiles, args.days, args.repeat)
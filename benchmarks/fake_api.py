@@ -0,0 +1,361 @@
+"""Local stand-in for the Sprout Social API, used by the benchmarks.
+
+Serves synthetic, deterministic data for every endpoint the tools call:
+metadata, analytics/profiles, analytics/posts, listening, messages and
+publishing. Latency, page size, data volume and injected HTTP 429s are
+configurable, and every upstream call is counted per endpoint so a benchmark
+can report how many API calls each tool made. Run standalone with:
+
+    python -m benchmarks.fake_api --port 8765 --latency 0.05 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import contextlib
+import random
+import re
+import zlib
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+TOKEN = "bench-token"
+
+NETWORKS = ["REDDIT", "TWITTER", "FACEBOOK", "INSTAGRAM", "YOUTUBE", "NEWS", "BLOG"]
+LANGUAGES = ["en", "en", "en", "es", "fr", "de"]
+WORDS = (
+    "recall product launch love hate shipping refund support update price new great bad "
+    "battery screen app crash fast slow service store order delivery team thanks broken"
+).split()
+
+
+class LostResponse(Exception):
+    """The handler did its work but the client gets a 502."""
+
+
+@dataclass
+class FakeConfig:
+    """Knobs for the fake API. Volumes are per day, so longer windows mean more data."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    page_size: int = 100
+    profiles: int = 10
+    max_filter_profiles: int = 0  # reject analytics requests filtering on more profiles (0: no limit)
+    groups: int = 3
+    topics: int = 3
+    listening_per_day: int = 200
+    inbox_per_day: int = 50
+    posts_per_day: int = 3
+    error_rate: float = 0.0
+    lost_create_rate: float = 0.0  # posts created but answered with a 502, as if the response were lost
+    retry_after: float = 0.05
+    seed: int = 1
+
+
+def _seed(*parts: object) -> int:
+    return zlib.crc32("|".join(map(str, parts)).encode())
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+def _filters(body: dict[str, Any]) -> dict[str, str]:
+    """Map filter field -> raw argument, e.g. {"created_time.in": "a..b"}."""
+    out = {}
+    for f in body.get("filters", []):
+        m = re.fullmatch(r"([\w.]+)\((.*)\)", f)
+        if m:
+            out[m.group(1)] = m.group(2)
+    return out
+
+
+def _window(filters: dict[str, str]) -> tuple[datetime, datetime]:
+    start, _, end = filters["created_time.in"].partition("..")
+    return _parse_time(start), _parse_time(end)
+
+
+class FakeSprout:
+    """Synthetic data generator plus per-endpoint call counters."""
+
+    def __init__(self, config: FakeConfig) -> None:
+        self.config = config
+        self.calls: Counter[str] = Counter()
+        self.throttled = 0
+        self.created: dict[str, dict[str, Any]] = {}
+        self._rng = random.Random(config.seed)
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.throttled = 0
+
+    # ----- synthetic data -----
+
+    def _messages_on(self, kind: str, scope: str, day: date, per_day: int) -> list[dict[str, Any]]:
+        """One day of messages, newest first."""
+        rng = random.Random(_seed(self.config.seed, kind, scope, day))
+        base = datetime(day.year, day.month, day.day)
+        seconds = sorted((rng.randrange(86400) for _ in range(per_day)), reverse=True)
+        return [
+            {
+                "guid": f"{kind}-{scope}-{day.isoformat()}-{i}",
+                "created_time": (base + timedelta(seconds=s)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "text": " ".join(rng.choices(WORDS, k=rng.randint(6, 40))),
+                "network": rng.choice(NETWORKS),
+                "language": rng.choice(LANGUAGES),
+                "perma_link": f"https://example.com/{kind}/{scope}/{day.isoformat()}/{i}",
+            }
+            for i, s in enumerate(seconds)
+        ]
+
+    def _stream(
+        self, kind: str, scopes: list[str], start: datetime, end: datetime, per_day: int
+    ) -> Iterator[dict[str, Any]]:
+        day = end.date()
+        while day >= start.date():
+            merged = [m for scope in scopes for m in self._messages_on(kind, scope, day, per_day)]
+            merged.sort(key=lambda m: m["created_time"], reverse=True)
+            for m in merged:
+                t = _parse_time(m["created_time"])
+                if start <= t <= end:
+                    yield m
+            day -= timedelta(days=1)
+
+    def _cursor_page(
+        self, items: Iterator[dict[str, Any]], cursor: str | None, limit: int
+    ) -> dict[str, Any]:
+        offset = int(cursor or 0)
+        limit = min(limit or self.config.page_size, self.config.page_size)
+        page = []
+        for i, item in enumerate(items):
+            if i < offset:
+                continue
+            if len(page) == limit:
+                return {"data": page, "paging": {"next_cursor": str(offset + limit)}}
+            page.append(item)
+        return {"data": page, "paging": {}}
+
+    def profile_ids(self) -> list[int]:
+        return [1000 + i for i in range(self.config.profiles)]
+
+    # ----- endpoints -----
+
+    def metadata_client(self) -> dict[str, Any]:
+        return {"data": [{"customer_id": 1, "name": "Bench Co"}]}
+
+    def metadata_customer(self, what: str) -> dict[str, Any]:
+        ids = self.profile_ids()
+        if what == "":
+            return {"data": [
+                {"customer_profile_id": p, "network_type": NETWORKS[p % len(NETWORKS)].lower(),
+                 "name": f"profile-{p}", "native_name": f"@bench{p}"}
+                for p in ids
+            ]}
+        if what == "groups":
+            return {"data": [
+                {"group_id": g, "name": f"group-{g}", "customer_profile_ids": ids[g::self.config.groups]}
+                for g in range(self.config.groups)
+            ]}
+        if what == "tags":
+            return {"data": [{"tag_id": t, "text": f"tag-{t}"} for t in range(20)]}
+        if what == "users":
+            return {"data": [{"id": u, "name": f"user-{u}"} for u in range(15)]}
+        return {"data": [{"id": t, "name": f"team-{t}"} for t in range(4)]}
+
+    def listening_topics(self) -> dict[str, Any]:
+        return {"data": [
+            {"id": f"00000000-0000-0000-0000-{t:012d}", "name": f"topic-{t}"}
+            for t in range(self.config.topics)
+        ]}
+
+    def profile_analytics(self, body: dict[str, Any]) -> dict[str, Any]:
+        filters = _filters(body)
+        ids = filters["customer_profile_id.eq"].split(",")
+        if self.config.max_filter_profiles and len(ids) > self.config.max_filter_profiles:
+            raise ValueError(f"at most {self.config.max_filter_profiles} profiles per request")
+        start, _, end = filters["reporting_period.in"].partition("...")
+        first, last = date.fromisoformat(start), date.fromisoformat(end)
+        rows = []
+        for p in ids:
+            d = first
+            while d <= last:
+                rng = random.Random(_seed(self.config.seed, "profile", p, d))
+                rows.append({
+                    "dimensions": {"customer_profile_id": int(p), "reporting_period.by(day)": d.isoformat()},
+                    "metrics": {m: rng.randint(0, 5000) for m in body.get("metrics", [])},
+                })
+                d += timedelta(days=1)
+        return self._numbered_page(rows, int(body.get("page") or 1))
+
+    def post_analytics(self, body: dict[str, Any]) -> dict[str, Any]:
+        filters = _filters(body)
+        ids = filters["customer_profile_id.eq"].split(",")
+        start, end = _window(filters)
+        posts = []
+        for p in ids:
+            for m in self._stream("post", [p], start, end, self.config.posts_per_day):
+                rng = random.Random(_seed(self.config.seed, m["guid"]))
+                posts.append({
+                    "customer_profile_id": int(p),
+                    "guid": m["guid"],
+                    "created_time": m["created_time"],
+                    "text": m["text"],
+                    "perma_link": m["perma_link"],
+                    "metrics": {k: rng.randint(0, 20000) for k in body.get("metrics", [])},
+                })
+        posts.sort(key=lambda m: m["created_time"], reverse=True)
+        limit = int(body.get("limit") or self.config.page_size)
+        return self._numbered_page(posts, int(body.get("page") or 1), limit)
+
+    def _numbered_page(self, rows: list[Any], page: int, limit: int | None = None) -> dict[str, Any]:
+        size = min(limit or self.config.page_size, self.config.page_size)
+        total = max(1, -(-len(rows) // size))
+        return {
+            "data": rows[(page - 1) * size: page * size],
+            "paging": {"current_page": page, "total_pages": total},
+        }
+
+    def listening_messages(self, topic_id: str, body: dict[str, Any]) -> dict[str, Any]:
+        filters = _filters(body)
+        start, end = _window(filters)
+        items = self._stream("listening", [topic_id], start, end, self.config.listening_per_day)
+        networks = {
+            f.removeprefix("network.eq(").rstrip(")")
+            for f in body.get("filters", [])
+            if f.startswith("network.eq(")
+        }
+        if networks:
+            items = (m for m in items if m["network"] in networks)
+        return self._cursor_page(items, body.get("cursor"), int(body.get("limit") or 100))
+
+    def inbox_messages(self, body: dict[str, Any]) -> dict[str, Any]:
+        filters = _filters(body)
+        ids = filters["customer_profile_id.eq"].split(",")
+        start, end = _window(filters)
+        items = self._stream("inbox", ids, start, end, self.config.inbox_per_day)
+        return self._cursor_page(items, body.get("page_cursor"), int(body.get("limit") or 50))
+
+    def publishing_posts(self, body: dict[str, Any]) -> dict[str, Any]:
+        if body.get("post_type"):
+            post_id = str(9_000_000 + len(self.created))
+            post = {
+                "id": post_id,
+                "status": "SCHEDULED" if body.get("scheduled_send_time") else "DRAFT",
+                "profile_ids": body.get("profile_ids", []),
+                "fields": body.get("fields", {}),
+                "scheduled_send_time": body.get("scheduled_send_time"),
+            }
+            self.created[post_id] = post
+            if self.config.lost_create_rate and self._rng.random() < self.config.lost_create_rate:
+                raise LostResponse
+            return {"data": [post]}
+        filters = _filters(body)
+        ids = filters["customer_profile_id.eq"].split(",")
+        start, end = _window(filters)
+        posts = [
+            {"id": m["guid"], "status": "PUBLISHED", "created_time": m["created_time"], "fields": {"text": m["text"]}}
+            for m in self._stream("post", ids, start, end, self.config.posts_per_day)
+        ]
+        return self._numbered_page(posts, int(body.get("page") or 1), int(body.get("limit") or 50))
+
+    def publishing_post(self, post_id: str) -> dict[str, Any] | None:
+        if post_id in self.created:
+            return {"data": [self.created[post_id]]}
+        if post_id.startswith("post-"):
+            return {"data": [{"id": post_id, "status": "PUBLISHED"}]}
+        return None
+
+
+def create_app(latency: float = 0.0, **options: Any) -> Starlette:
+    """Build the fake API. Keyword options are FakeConfig fields."""
+    fake = FakeSprout(FakeConfig(latency=latency, **options))
+    cfg = fake.config
+
+    def endpoint(name: str, handler):
+        async def wrapped(request: Request) -> Response:
+            fake.calls[name] += 1
+            delay = cfg.latency + (random.uniform(0, cfg.jitter) if cfg.jitter else 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            if cfg.error_rate and fake._rng.random() < cfg.error_rate:
+                fake.throttled += 1
+                return JSONResponse(
+                    {"error": "rate limited"}, status_code=429,
+                    headers={"Retry-After": str(cfg.retry_after)},
+                )
+            body = await request.json() if request.method == "POST" else {}
+            try:
+                data = handler(request.path_params, body)
+            except ValueError as e:
+                return JSONResponse({"error": str(e)}, status_code=400)
+            except LostResponse:
+                return JSONResponse({"error": "bad gateway"}, status_code=502)
+            if data is None:
+                return JSONResponse({"error": "not found"}, status_code=404)
+            return JSONResponse(data)
+
+        return wrapped
+
+    async def stats(request: Request) -> JSONResponse:
+        return JSONResponse({"calls": dict(fake.calls), "throttled": fake.throttled})
+
+    async def reset(request: Request) -> JSONResponse:
+        fake.reset()
+        return JSONResponse({"ok": True})
+
+    app = Starlette(routes=[
+        Route("/v1/metadata/client", endpoint("metadata", lambda p, b: fake.metadata_client())),
+        Route("/v1/{cid}/metadata/customer", endpoint("metadata", lambda p, b: fake.metadata_customer(""))),
+        Route("/v1/{cid}/metadata/customer/{what}", endpoint("metadata", lambda p, b: fake.metadata_customer(p["what"]))),
+        Route("/v1/{cid}/analytics/profiles", endpoint("analytics/profiles", lambda p, b: fake.profile_analytics(b)), methods=["POST"]),
+        Route("/v1/{cid}/analytics/posts", endpoint("analytics/posts", lambda p, b: fake.post_analytics(b)), methods=["POST"]),
+        Route("/v1/{cid}/listening/topics", endpoint("listening/topics", lambda p, b: fake.listening_topics())),
+        Route(
+            "/v1/{cid}/listening/topics/{tid}/messages",
+            endpoint("listening/messages", lambda p, b: fake.listening_messages(p["tid"], b)),
+            methods=["POST"],
+        ),
+        Route("/v1/{cid}/messages", endpoint("messages", lambda p, b: fake.inbox_messages(b)), methods=["POST"]),
+        Route("/v1/{cid}/publishing/posts", endpoint("publishing/posts", lambda p, b: fake.publishing_posts(b)), methods=["POST"]),
+        Route("/v1/{cid}/publishing/posts/{pid}", endpoint("publishing/post", lambda p, b: fake.publishing_post(p["pid"]))),
+        Route("/_stats", stats),
+        Route("/_reset", reset, methods=["POST"]),
+    ])
+    app.state.fake = fake
+    return app
+
+
+@contextlib.asynccontextmanager
+async def serve(
+    host: str = "127.0.0.1", port: int = 8765, app: Starlette | None = None
+) -> AsyncIterator[str]:
+    """Run the fake API on the current event loop and yield its base URL."""
+    server = uvicorn.Server(uvicorn.Config(app or create_app(), host=host, port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    for f in fields(FakeConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=f.default)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+    uvicorn.run(create_app(**args), host=host, port=port, log_level="warning")
@@ -0,0 +1,164 @@
+"""Load generator that drives the sprout_mcp tools against the fake Sprout API.
+
+Each tool in the scenario mix is called `--requests` times at `--concurrency`,
+either in-process through FastMCP's tool dispatch or over stdio against a
+`python -m sprout_mcp.server` subprocess. For every tool it reports
+throughput, p50/p95/p99 latency, errors and upstream API calls per tool call
+(counted by the fake API, so caching and coalescing show up directly).
+
+    python -m benchmarks.loadgen --transport inprocess --concurrency 16 --requests 200
+    python -m benchmarks.loadgen --transport stdio --latency 0.05 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from .fake_api import TOKEN, create_app, serve
+
+Caller = Callable[[str, dict[str, Any]], Awaitable[str]]
+
+START, END = "2024-01-01T00:00:00", "2024-01-31T23:59:59"
+TOPIC = "00000000-0000-0000-0000-000000000000"
+
+SCENARIOS: dict[str, dict[str, Any]] = {
+    "list_customers": {},
+    "list_profiles": {},
+    "list_groups": {},
+    "get_profile_analytics": {"profile_ids": "1000,1001,1002", "start_time": START, "end_time": END},
+    "get_post_analytics": {"profile_ids": "1000,1001", "start_time": START, "end_time": END, "limit": 100},
+    "get_listening_messages": {"topic_id": TOPIC, "start_time": START, "end_time": END},
+    "get_listening_messages:auto": {
+        "topic_id": TOPIC, "start_time": START, "end_time": END, "auto_paginate": True, "max_items": 2000,
+    },
+    "get_messages": {"profile_ids": "1000,1001", "start_time": START, "end_time": END},
+    "list_publishing_posts": {"profile_ids": "1000", "start_time": START, "end_time": END},
+    "get_publishing_post": {"post_id": "post-1000-2024-01-02-0"},
+}
+
+
+def is_error(text: str) -> bool:
+    try:
+        doc = json.loads(text)
+    except ValueError:  # multi-line NDJSON results are never errors
+        return False
+    return isinstance(doc, dict) and "error" in doc
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@asynccontextmanager
+async def inprocess() -> AsyncIterator[Caller]:
+    """Call tools through the in-process FastMCP server, with its real lifespan."""
+    from sprout_mcp import server
+
+    async def call(name: str, args: dict[str, Any]) -> str:
+        result = await server.mcp.call_tool(name, args)
+        content = result[0] if isinstance(result, tuple) else result
+        return content[0].text
+
+    async with server._lifespan(server.mcp):
+        yield call
+
+
+@asynccontextmanager
+async def stdio() -> AsyncIterator[Caller]:
+    """Call tools over stdio against a separate server process."""
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=["-m", "sprout_mcp.server"],
+        env={k: v for k, v in os.environ.items() if k.startswith(("SPROUT_", "PATH", "PYTHON"))},
+    )
+    async with stdio_client(params) as (read, write), ClientSession(read, write) as session:
+        await session.initialize()
+
+        async def call(name: str, args: dict[str, Any]) -> str:
+            result = await session.call_tool(name, args)
+            return result.content[0].text
+
+        yield call
+
+
+async def run_tool(
+    call: Caller, name: str, args: dict[str, Any], requests: int, concurrency: int
+) -> tuple[float, list[float], int]:
+    sem = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            text = await call(name, args)
+            samples.append(time.perf_counter() - t0)
+            if is_error(text):
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - t0, samples, errors
+
+
+async def main(args: argparse.Namespace) -> None:
+    app = create_app(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        listening_per_day=args.listening_per_day, page_size=args.page_size,
+    )
+    fake = app.state.fake
+    base_url = f"http://127.0.0.1:{args.port}"
+    os.environ.update({
+        "SPROUT_API_BASE_URL": base_url,
+        "SPROUT_API_TOKEN": TOKEN,
+        "SPROUT_CUSTOMER_ID": "1",
+    })
+    os.environ.setdefault("SPROUT_RATE_LIMIT", "1000000")
+    os.environ.setdefault("SPROUT_RETRY_BASE_DELAY", "0.05")
+    tools = args.tools.split(",") if args.tools else list(SCENARIOS)
+    driver = inprocess if args.transport == "inprocess" else stdio
+
+    async with serve(port=args.port, app=app), driver() as call:
+        print(
+            f"{'tool':<30} {'calls':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'upstream/call':>14}"
+        )
+        for key in tools:
+            name = key.split(":")[0]
+            before = sum(fake.calls.values())
+            elapsed, samples, errors = await run_tool(
+                call, name, SCENARIOS[key], args.requests, args.concurrency
+            )
+            upstream = sum(fake.calls.values()) - before
+            print(
+                f"{key:<30} {len(samples):>6} {errors:>4} {len(samples) / elapsed:>8.1f} "
+                f"{percentile(samples, 0.50) * 1000:>8.2f} {percentile(samples, 0.95) * 1000:>8.2f} "
+                f"{percentile(samples, 0.99) * 1000:>8.2f} {upstream / len(samples):>14.2f}"
+            )
+        print(f"\nupstream calls by endpoint: {dict(fake.calls)}; 429s injected: {fake.throttled}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=["inprocess", "stdio"], default="inprocess")
+    parser.add_argument("--tools", default="", help="comma-separated scenario names (default: all)")
+    parser.add_argument("--requests", type=int, default=100, help="calls per tool")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake API latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--listening-per-day", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
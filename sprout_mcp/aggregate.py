@@ -0,0 +1,113 @@
+import heapq
+import random
+from collections.abc import Callable
+from typing import Any
+
+GROUP_BY = ("profile", "network", "day")
+
+RESERVOIR_SIZE = 2048
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def _post_ref(post: dict[str, Any]) -> dict[str, Any]:
+    """The few fields needed to identify a post in a top/bottom list."""
+    text = post.get("text") or ""
+    return {
+        "guid": post.get("guid"),
+        "customer_profile_id": post.get("customer_profile_id"),
+        "created_time": post.get("created_time"),
+        "perma_link": post.get("perma_link"),
+        "text": text if len(text) <= 140 else text[:139] + "…",
+    }
+
+
+class MetricStats:
+    """Constant-memory summary of one metric over a stream of posts.
+
+    Totals, mean, min and max are exact. Percentiles come from a fixed-size
+    reservoir sample, so they are exact up to RESERVOIR_SIZE posts and
+    estimates beyond. Top and bottom posts are kept in size-n heaps.
+    """
+
+    def __init__(self, top_n: int, rng: random.Random) -> None:
+        self.top_n = top_n
+        self.rng = rng
+        self.count = 0
+        self.total: float = 0
+        self.min: float | None = None
+        self.max: float | None = None
+        self.sample: list[float] = []
+        # (value, tiebreak, post): a min-heap of the largest values and one of negated values.
+        self._top: list[tuple[float, int, dict[str, Any]]] = []
+        self._bottom: list[tuple[float, int, dict[str, Any]]] = []
+
+    def add(self, value: float, seq: int, post: dict[str, Any]) -> None:
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.sample) < RESERVOIR_SIZE:
+            self.sample.append(value)
+        elif (j := self.rng.randrange(self.count)) < RESERVOIR_SIZE:
+            self.sample[j] = value
+        if self.top_n:
+            # Ties keep the earlier post (newest first, as pages arrive).
+            for heap, entry in ((self._top, (value, -seq)), (self._bottom, (-value, -seq))):
+                if len(heap) < self.top_n:
+                    heapq.heappush(heap, (*entry, _post_ref(post)))
+                elif entry > heap[0][:2]:
+                    heapq.heapreplace(heap, (*entry, _post_ref(post)))
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "count": self.count,
+            "total": self.total,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+        }
+        ordered = sorted(self.sample)
+        for q in PERCENTILES:
+            result[f"p{round(q * 100)}"] = ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+        if self.top_n:
+            result["top"] = [
+                {"value": v, **post} for v, _, post in sorted(self._top, key=lambda e: e[:2], reverse=True)
+            ]
+            result["bottom"] = [
+                {"value": -v, **post} for v, _, post in sorted(self._bottom, key=lambda e: e[:2], reverse=True)
+            ]
+        return result
+
+
+class PostAggregator:
+    """Fold post analytics rows into per-group, per-metric MetricStats as pages stream in."""
+
+    def __init__(self, metrics: list[str], group_key: Callable[[dict[str, Any]], str], top_n: int = 5) -> None:
+        self.metrics = metrics
+        self.group_key = group_key
+        self.top_n = top_n
+        self.posts = 0
+        self._groups: dict[str, dict[str, MetricStats]] = {}
+        self._counts: dict[str, int] = {}
+        self._rng = random.Random(0)  # fixed seed: the same posts give the same percentiles
+
+    def add(self, post: dict[str, Any]) -> None:
+        group = self._groups.get(key := self.group_key(post))
+        if group is None:
+            group = self._groups[key] = {m: MetricStats(self.top_n, self._rng) for m in self.metrics}
+        self._counts[key] = self._counts.get(key, 0) + 1
+        values = post.get("metrics") or {}
+        for metric, stats in group.items():
+            value = values.get(metric)
+            if isinstance(value, (int, float)):
+                stats.add(value, self.posts, post)
+        self.posts += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            key: {
+                "posts": self._counts[key],
+                "metrics": {m: s.to_dict() for m, s in group.items()},
+            }
+            for key, group in sorted(self._groups.items())
+        }
@@ -0,0 +1,361 @@
+import asyncio
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import httpx
+
+from .client import SproutClient, current_call
+
+DAY_KEY = "reporting_period.by(day)"
+
+_ABSENT = object()
+
+
+def profile_analytics_body(
+    profile_ids: list[str], start_date: str, end_date: str, metrics: list[str], timezone: str
+) -> dict[str, Any]:
+    return {
+        "filters": [
+            f"customer_profile_id.eq({','.join(profile_ids)})",
+            f"reporting_period.in({start_date}...{end_date})",
+        ],
+        "metrics": metrics,
+        "timezone": timezone,
+    }
+
+
+def _today(timezone: str) -> date:
+    try:
+        return datetime.now(ZoneInfo(timezone)).date()
+    except (ZoneInfoNotFoundError, ValueError):
+        return datetime.now(UTC).date()
+
+
+def _ranges(days: list[date]) -> list[tuple[date, date]]:
+    """Collapse sorted days into inclusive (first, last) runs of consecutive days."""
+    runs: list[tuple[date, date]] = []
+    for d in days:
+        if runs and d - runs[-1][1] == timedelta(days=1):
+            runs[-1] = (runs[-1][0], d)
+        else:
+            runs.append((d, d))
+    return runs
+
+
+def _profile_key(value: Any) -> str:
+    return str(value)
+
+
+def _profile_value(profile_id: str) -> Any:
+    return int(profile_id) if profile_id.isdigit() else profile_id
+
+
+def _batch_error(e: BaseException) -> dict[str, Any]:
+    if isinstance(e, httpx.HTTPStatusError):
+        try:
+            detail = e.response.json()
+        except ValueError:
+            detail = e.response.text
+        return {"error": f"HTTP {e.response.status_code}", "detail": detail}
+    return {"error": type(e).__name__, "message": str(e)}
+
+
+# (customer_id, timezone, profile_id, metric): one cached daily series
+_SeriesKey = tuple[str, str, str, str]
+
+# (customer_id, timezone, metrics, first day, last day) shared by every profile in one request
+_BatchKey = tuple[str, str, tuple[str, ...], date, date]
+
+
+@dataclass
+class _PendingBatch:
+    profile_ids: dict[str, None]
+    task: asyncio.Future[None] | None = None
+    waiters: int = 0
+
+
+class ProfileAnalyticsCache:
+    """Per-profile, per-day, per-metric cache for /analytics/profiles.
+
+    A request only fetches the days that are not cached yet, plus the most
+    recent settle_days days, whose numbers can still change upstream. Older
+    days are treated as final and never refetched. Days a profile had no row
+    for are remembered too, so gaps are not refetched either.
+
+    With batch_window > 0, fetches wait that many seconds before going out,
+    and concurrent calls for the same customer, days, metrics and timezone
+    that arrive meanwhile join the same upstream request (up to batch_size
+    profiles); each caller then reads its own profiles from the cache. If a
+    merged request fails, each caller refetches its own profiles alone, so
+    one caller's bad profile ID cannot fail the others.
+
+    With max_values set, the cache holds at most that many day values: after
+    each call, whole series (one profile and metric) are evicted, least
+    recently used first, skipping series that a call in progress still reads.
+    """
+
+    def __init__(
+        self,
+        settle_days: int = 3,
+        batch_size: int = 50,
+        concurrency: int = 4,
+        batch_window: float = 0.0,
+        max_values: int | None = None,
+    ) -> None:
+        self.settle_days = settle_days
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.batch_window = batch_window
+        self.max_values = max_values
+        self._pending: dict[_BatchKey, _PendingBatch] = {}
+        self.merged_requests = 0
+        self.evicted_series = 0
+        # (customer_id, timezone, profile_id, metric) -> {day: value}, least recently used first
+        self._values: OrderedDict[_SeriesKey, dict[date, Any]] = OrderedDict()
+        self._size = 0  # day values across all series
+        self._pinned: Counter[_SeriesKey] = Counter()  # series read by calls in progress
+
+    def _read(self, key: _SeriesKey) -> dict[date, Any]:
+        series = self._values.get(key)
+        if series is None:
+            return {}
+        self._values.move_to_end(key)
+        return series
+
+    def _write(self, key: _SeriesKey, day: date, value: Any) -> None:
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = {}
+        else:
+            self._values.move_to_end(key)
+        if day not in series:
+            self._size += 1
+        series[day] = value
+
+    def _trim(self) -> None:
+        if self.max_values is None:
+            return
+        for key in list(self._values):
+            if self._size <= self.max_values:
+                break
+            if self._pinned[key] > 0:
+                continue
+            self._size -= len(self._values.pop(key))
+            self.evicted_series += 1
+
+    def _missing_days(
+        self, customer_id: str, timezone: str, profile_ids: list[str], metrics: list[str], days: list[date]
+    ) -> list[date]:
+        settled = _today(timezone) - timedelta(days=self.settle_days)
+        series = [self._read((customer_id, timezone, p, m)) for p in profile_ids for m in metrics]
+        return [d for d in days if d > settled or any(d not in s for s in series)]
+
+    async def _fetch(
+        self,
+        client: SproutClient,
+        customer_id: str,
+        profile_ids: list[str],
+        first: date,
+        last: date,
+        metrics: list[str],
+        timezone: str,
+    ) -> None:
+        """Fetch and cache every page; pages after the first are requested concurrently."""
+        path = f"/v1/{customer_id}/analytics/profiles"
+        body = profile_analytics_body(profile_ids, first.isoformat(), last.isoformat(), metrics, timezone)
+        seen: set[tuple[str, date]] = set()
+
+        def store(data: dict[str, Any]) -> None:
+            for row in data.get("data", []):
+                dims = row.get("dimensions", {})
+                profile = _profile_key(dims.get("customer_profile_id"))
+                day = date.fromisoformat(str(dims.get(DAY_KEY))[:10])
+                seen.add((profile, day))
+                values = row.get("metrics", {})
+                for m in metrics:
+                    self._write((customer_id, timezone, profile, m), day, values.get(m))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_page(page: int) -> None:
+            async with semaphore:
+                store(await client.post(path, {**body, "page": page}))
+
+        first_page = await client.post(path, {**body, "page": 1})
+        store(first_page)
+        total_pages = int((first_page.get("paging") or {}).get("total_pages") or 1)
+        results = await asyncio.gather(*(fetch_page(p) for p in range(2, total_pages + 1)), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        d = first
+        while d <= last:
+            for p in profile_ids:
+                if (p, d) not in seen:
+                    for m in metrics:
+                        self._write((customer_id, timezone, p, m), d, _ABSENT)
+            d += timedelta(days=1)
+
+    async def _fetch_merged(
+        self,
+        client: SproutClient,
+        customer_id: str,
+        profile_ids: list[str],
+        first: date,
+        last: date,
+        metrics: list[str],
+        timezone: str,
+    ) -> None:
+        """_fetch, sharing one upstream request with concurrent callers that want the same days and metrics."""
+        if self.batch_window <= 0:
+            await self._fetch(client, customer_id, profile_ids, first, last, metrics, timezone)
+            return
+        key = (customer_id, timezone, tuple(sorted(metrics)), first, last)
+        batch = self._pending.get(key)
+        if batch is not None and len(batch.profile_ids.keys() | set(profile_ids)) <= self.batch_size:
+            self.merged_requests += 1
+        else:
+            batch = self._pending[key] = _PendingBatch({})
+            batch.task = asyncio.ensure_future(self._send(client, key, batch))
+        batch.profile_ids.update(dict.fromkeys(profile_ids))
+        batch.waiters += 1
+        try:
+            await asyncio.shield(batch.task)
+        except Exception:
+            if batch.profile_ids.keys() <= set(profile_ids):
+                raise  # nobody else's profiles were in it
+            # The failure may come from another caller's profiles; retry ours on their own.
+            await self._fetch(client, customer_id, profile_ids, first, last, metrics, timezone)
+        finally:
+            batch.waiters -= 1
+            if not batch.waiters and not batch.task.done():
+                # Every caller was cancelled: drop the request before or while it runs.
+                batch.task.cancel()
+                self._forget(key, batch)
+
+    async def _send(self, client: SproutClient, key: _BatchKey, batch: _PendingBatch) -> None:
+        await asyncio.sleep(self.batch_window)
+        self._forget(key, batch)  # callers arriving from now on start a new batch
+        customer_id, timezone, metrics, first, last = key
+        await self._fetch(client, customer_id, list(batch.profile_ids), first, last, list(metrics), timezone)
+
+    def _forget(self, key: _BatchKey, batch: _PendingBatch) -> None:
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+
+    async def _fetch_batch(
+        self,
+        client: SproutClient,
+        semaphore: asyncio.Semaphore,
+        customer_id: str,
+        profile_ids: list[str],
+        days: list[date],
+        metrics: list[str],
+        timezone: str,
+    ) -> list[date]:
+        missing = self._missing_days(customer_id, timezone, profile_ids, metrics, days)
+        if missing:
+            async with semaphore:
+                for run_first, run_last in _ranges(missing):
+                    await self._fetch_merged(client, customer_id, profile_ids, run_first, run_last, metrics, timezone)
+        return missing
+
+    async def get(
+        self,
+        client: SproutClient,
+        customer_id: str,
+        profile_ids: list[str],
+        start_date: str,
+        end_date: str,
+        metrics: list[str],
+        timezone: str,
+    ) -> dict[str, Any]:
+        """Return daily rows for every profile in the range, fetching only what is missing.
+
+        Profiles are requested in batches of batch_size, up to concurrency
+        batches at once. A failed batch is listed under "errors" and the
+        other batches are still returned; only if every batch fails is the
+        error raised.
+        """
+        keys = [(customer_id, timezone, p, m) for p in profile_ids for m in metrics]
+        self._pinned.update(keys)
+        try:
+            return await self._get(client, customer_id, profile_ids, start_date, end_date, metrics, timezone)
+        finally:
+            self._pinned.subtract(keys)
+            for key in keys:
+                if self._pinned[key] <= 0:
+                    del self._pinned[key]
+            self._trim()
+
+    async def _get(
+        self,
+        client: SproutClient,
+        customer_id: str,
+        profile_ids: list[str],
+        start_date: str,
+        end_date: str,
+        metrics: list[str],
+        timezone: str,
+    ) -> dict[str, Any]:
+        first, last = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        batches = [profile_ids[i:i + self.batch_size] for i in range(0, len(profile_ids), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self._fetch_batch(client, semaphore, customer_id, b, days, metrics, timezone) for b in batches),
+            return_exceptions=True,
+        )
+        fetched: set[date] = set()
+        errors: list[dict[str, Any]] = []
+        failed: set[str] = set()
+        for batch, result in zip(batches, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                if len(errors) + 1 == len(batches):
+                    raise result  # nothing to return
+                errors.append({"profile_ids": batch, **_batch_error(result)})
+                failed.update(batch)
+            else:
+                fetched.update(result)
+
+        rows = []
+        for p in profile_ids:
+            if p in failed:
+                continue
+            series = [self._read((customer_id, timezone, p, m)) for m in metrics]
+            for d in days:
+                values = [s.get(d, _ABSENT) for s in series]
+                if all(v is _ABSENT for v in values):
+                    continue
+                rows.append({
+                    "dimensions": {"customer_profile_id": _profile_value(p), DAY_KEY: d.isoformat()},
+                    "metrics": {m: (None if v is _ABSENT else v) for m, v in zip(metrics, values)},
+                })
+        if (stats := current_call()) is not None:
+            stats.notes["days_fetched"] = len(fetched)
+            stats.notes["days_cached"] = len(days) - len(fetched)
+            if len(batches) > 1:
+                stats.notes["batches"] = len(batches)
+        result: dict[str, Any] = {"data": rows}
+        if errors:
+            result["errors"] = errors
+        return result
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._size = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "series": len(self._values),
+            "values": self._size,
+            "max_values": self.max_values,
+            "evicted_series": self.evicted_series,
+            "settle_days": self.settle_days,
+            "merged_requests": self.merged_requests,
+        }
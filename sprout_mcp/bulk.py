@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+import httpx
+
+from .client import SproutClient, current_call
+from .ratelimit import RateLimitExceeded
+from .retry import RETRY_EXCEPTIONS
+
+DEFAULT_LEDGER = os.path.join("~", ".cache", "sprout-mcp", "posts-ledger.jsonl")
+
+MAX_POSTS = 500
+
+
+def post_key(customer_id: str, body: dict[str, Any]) -> str:
+    """Content hash of a post request; the same post for the same customer always gets the same key."""
+    canonical = json.dumps([customer_id, body], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+@dataclass
+class LedgerEntry:
+    key: str
+    customer_id: str
+    status: str  # "created", "uncertain", or "discarded" for a send that definitely created nothing
+    post_ids: list[str] = field(default_factory=list)
+    error: str | None = None
+    at: str = field(default_factory=lambda: datetime.now(UTC).isoformat(timespec="seconds"))
+
+
+class PostLedger:
+    """Append-only record of bulk submissions whose post may exist upstream.
+
+    A key is written as uncertain before its request is sent, then as
+    created once the answer comes back, or discarded if Sprout definitely
+    did not create it. A process that dies in between therefore leaves the
+    key uncertain rather than unrecorded. Later lines for a key replace
+    earlier ones. Keys being submitted right now are held in memory, so
+    concurrent bulk calls cannot both send the same post.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._entries: dict[str, LedgerEntry] | None = None
+        self._pending: set[str] = set()
+
+    def _load(self) -> dict[str, LedgerEntry]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path) as f:
+                    for line in f:
+                        try:
+                            entry = LedgerEntry(**json.loads(line))
+                        except (ValueError, TypeError):
+                            continue  # a line cut short by a crash
+                        if entry.status == "discarded":
+                            self._entries.pop(entry.key, None)
+                        else:
+                            self._entries[entry.key] = entry
+            except FileNotFoundError:
+                pass
+        return self._entries
+
+    def get(self, key: str) -> LedgerEntry | None:
+        return self._load().get(key)
+
+    def claim(self, key: str) -> bool:
+        if key in self._pending:
+            return False
+        self._pending.add(key)
+        return True
+
+    def release(self, key: str) -> None:
+        self._pending.discard(key)
+
+    def record(self, entry: LedgerEntry) -> None:
+        if entry.status == "discarded":
+            self._load().pop(entry.key, None)
+        else:
+            self._load()[entry.key] = entry
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(asdict(entry), separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def stats(self) -> dict[str, Any]:
+        entries = self._load().values()
+        return {
+            "path": self.path,
+            "created": sum(e.status == "created" for e in entries),
+            "uncertain": sum(e.status == "uncertain" for e in entries),
+            "pending": len(self._pending),
+        }
+
+
+def _describe(e: BaseException) -> str:
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"HTTP {e.response.status_code}: {e.response.text[:200]}"
+    return f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+
+def _outcome(e: Exception) -> str:
+    """Classify a failed create: resend (refused before Sprout acted), failed (rejected) or uncertain."""
+    if isinstance(e, httpx.HTTPStatusError):
+        code = e.response.status_code
+        return "resend" if code == 429 else "uncertain" if code >= 500 else "failed"
+    if isinstance(e, (RateLimitExceeded, *RETRY_EXCEPTIONS)):
+        return "resend"
+    return "uncertain"  # timeout, dropped connection, unreadable 2xx body
+
+
+async def submit_posts(
+    client: SproutClient,
+    customer_id: str,
+    bodies: list[dict[str, Any]],
+    ledger: PostLedger,
+    *,
+    concurrency: int = 4,
+    retry_uncertain: bool = False,
+    on_created: Callable[[dict[str, Any], Any], None] | None = None,
+) -> list[dict[str, Any]]:
+    """Create posts concurrently, at most once each, and report every item's outcome.
+
+    Each body is keyed by post_key. A key the ledger already has as created
+    is not sent again ("already_created"), nor is a repeat within the same
+    call ("duplicate"). A request refused before Sprout acted on it (429,
+    connect error, client-side rate limit) is retried per the client's
+    RetryPolicy. Anything else that may have created the post (5xx, timeout,
+    dropped connection, cancellation) is recorded as "uncertain" and is not
+    sent again, here or in a later call, unless retry_uncertain is set.
+    Definite rejections (other 4xx) are "failed" and may simply be resubmitted.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    path = f"/v1/{customer_id}/publishing/posts"
+    first_index: dict[str, int] = {}
+
+    async def one(index: int, body: dict[str, Any]) -> dict[str, Any]:
+        key = post_key(customer_id, body)
+        item: dict[str, Any] = {"index": index, "key": key}
+        if key in first_index:
+            return {**item, "status": "duplicate", "duplicate_of": first_index[key]}
+        first_index[key] = index
+        previous = ledger.get(key)
+        if previous is not None and (previous.status == "created" or not retry_uncertain):
+            status = "already_created" if previous.status == "created" else "uncertain"
+            return {**item, "status": status, "post_ids": previous.post_ids, "error": previous.error, "since": previous.at}
+        if not ledger.claim(key):
+            return {**item, "status": "in_progress"}
+        try:
+            async with semaphore:
+                attempt, delay = 1, 0.0
+                while True:
+                    # Written ahead: if the process dies before the answer is recorded, the post stays uncertain.
+                    ledger.record(LedgerEntry(key, customer_id, "uncertain", error="sent; no answer recorded"))
+                    try:
+                        data = await client.post(path, body, idempotent=False)
+                        break
+                    except asyncio.CancelledError:
+                        ledger.record(LedgerEntry(key, customer_id, "uncertain", error="cancelled while in flight"))
+                        raise
+                    except Exception as e:
+                        outcome, error = _outcome(e), _describe(e)
+                        if outcome != "uncertain":
+                            ledger.record(LedgerEntry(key, customer_id, "discarded", error=error))
+                        if outcome == "resend":
+                            response = e.response if isinstance(e, httpx.HTTPStatusError) else None
+                            if (delay := client.retry.delay(attempt, delay, response)) is not None:
+                                attempt += 1
+                                if (stats := current_call()) is not None:
+                                    stats.retries += 1
+                                await asyncio.sleep(delay)
+                                continue
+                            outcome = "failed"  # never reached Sprout, so nothing was created
+                        if outcome == "uncertain":
+                            ledger.record(LedgerEntry(key, customer_id, "uncertain", error=error))
+                        return {**item, "status": outcome, "error": error, "attempts": attempt}
+            posts = [p for p in data.get("data") or [] if isinstance(p, dict)]
+            post_ids = [str(p["id"]) for p in posts if p.get("id") is not None]
+            ledger.record(LedgerEntry(key, customer_id, "created", post_ids))
+            if on_created is not None:
+                on_created(body, data)
+            return {**item, "status": "created", "post_ids": post_ids, "attempts": attempt}
+        finally:
+            ledger.release(key)
+
+    results = await asyncio.gather(*(one(i, b) for i, b in enumerate(bodies)), return_exceptions=True)
+    for r in results:
+        if isinstance(r, asyncio.CancelledError):
+            raise r
+    out = []
+    for i, r in enumerate(results):
+        if isinstance(r, BaseException):
+            # Unexpected (e.g. the ledger file is unwritable): the post may exist.
+            r = {"index": i, "key": post_key(customer_id, bodies[i]), "status": "uncertain", "error": _describe(r)}
+        out.append(r)
+    return out
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from .client import current_call
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fetched: float
+
+
+class TTLCache:
+    """In-process cache with stale-while-revalidate.
+
+    A fresh entry (younger than its TTL) is returned as is. A stale entry is
+    returned immediately while one background task reloads it. Entries older
+    than max_stale, and missing ones, are loaded inline.
+    """
+
+    def __init__(self, max_stale: float = 86400.0) -> None:
+        self.max_stale = max_stale
+        self._entries: dict[Hashable, _Entry] = {}
+        self._refreshing: dict[Hashable, asyncio.Task[None]] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+
+    async def get(self, key: Hashable, ttl: float, load: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched
+            if age < ttl:
+                self.hits += 1
+                return entry.value
+            if age < ttl + self.max_stale:
+                self.stale_hits += 1
+                if key not in self._refreshing:
+                    task = asyncio.create_task(self._refresh(key, load))
+                    self._refreshing[key] = task
+                    task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+                return entry.value
+        self.misses += 1
+        value = await load()
+        self._entries[key] = _Entry(value, time.monotonic())
+        return value
+
+    async def _refresh(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            value = await load()
+        except Exception:
+            self.refresh_errors += 1
+            log.warning("background refresh of %r failed; keeping stale value", key, exc_info=True)
+            return
+        self._entries[key] = _Entry(value, time.monotonic())
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def aclose(self) -> None:
+        """Cancel any background refreshes still running."""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._refreshing),
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+@dataclass
+class _NotFound:
+    """What is needed to raise a cached 404 again: a fresh error per hit, so tracebacks do not pile up."""
+
+    message: str
+    request: httpx.Request
+    response: httpx.Response
+
+    def error(self) -> httpx.HTTPStatusError:
+        return httpx.HTTPStatusError(self.message, request=self.request, response=self.response)
+
+
+@dataclass
+class _Timed:
+    value: Any  # a response, or the _NotFound of a cached 404
+    expires: float
+    profile_ids: frozenset[str] = frozenset()
+
+
+def _note(result: str) -> None:
+    if (stats := current_call()) is not None:
+        stats.notes["cache"] = result
+
+
+class PublishingCache:
+    """Read-through cache for publishing posts, with TTLs that follow post status.
+
+    A PUBLISHED post no longer changes, so it is kept for published_ttl;
+    SCHEDULED and DRAFT posts (and any other status) only for pending_ttl.
+    A 404 is cached for missing_ttl and raised again on a hit. Post lists
+    are cached for list_ttl, and created posts drop the cached lists for
+    any of their profiles; a list fetch that was in flight when that
+    happened is returned but not cached. Each map keeps at most
+    max_entries, least recently used evicted first.
+    """
+
+    def __init__(
+        self,
+        published_ttl: float = 86400.0,
+        pending_ttl: float = 60.0,
+        missing_ttl: float = 300.0,
+        list_ttl: float = 60.0,
+        max_entries: int = 10000,
+    ) -> None:
+        self.published_ttl = published_ttl
+        self.pending_ttl = pending_ttl
+        self.missing_ttl = missing_ttl
+        self.list_ttl = list_ttl
+        self.max_entries = max_entries
+        self._posts: OrderedDict[tuple[str, str], _Timed] = OrderedDict()
+        self._lists: OrderedDict[tuple[str, str], _Timed] = OrderedDict()
+        self._list_generation: dict[str, int] = {}  # per customer, bumped by invalidate_lists
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.list_hits = 0
+        self.list_misses = 0
+        self.invalidated_lists = 0
+
+    def _ttl(self, response: Any) -> float:
+        posts = response.get("data") if isinstance(response, dict) else None
+        status = str(posts[0].get("status") or "").upper() if posts and isinstance(posts[0], dict) else ""
+        return self.published_ttl if status == "PUBLISHED" else self.pending_ttl
+
+    def _put(self, entries: OrderedDict[tuple[str, str], _Timed], key: tuple[str, str], entry: _Timed) -> None:
+        entries[key] = entry
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def _fresh(self, entries: OrderedDict[tuple[str, str], _Timed], key: tuple[str, str]) -> _Timed | None:
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            del entries[key]
+            return None
+        entries.move_to_end(key)
+        return entry
+
+    async def get_post(self, customer_id: str, post_id: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        key = (customer_id, post_id)
+        entry = self._fresh(self._posts, key)
+        if entry is not None:
+            if isinstance(entry.value, _NotFound):
+                self.negative_hits += 1
+                _note("hit_not_found")
+                raise entry.value.error()
+            self.hits += 1
+            _note("hit")
+            return entry.value
+        self.misses += 1
+        _note("miss")
+        try:
+            value = await load()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                missing = _NotFound(str(e), e.request, e.response)
+                self._put(self._posts, key, _Timed(missing, time.monotonic() + self.missing_ttl))
+            raise
+        self._put(self._posts, key, _Timed(value, time.monotonic() + self._ttl(value)))
+        return value
+
+    def put_post(self, customer_id: str, post_id: str, response: Any) -> None:
+        """Write through a post just created or fetched elsewhere."""
+        self._put(self._posts, (customer_id, post_id), _Timed(response, time.monotonic() + self._ttl(response)))
+
+    async def get_list(
+        self, customer_id: str, key: str, profile_ids: list[str], load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        entry = self._fresh(self._lists, (customer_id, key))
+        if entry is not None:
+            self.list_hits += 1
+            _note("hit")
+            return entry.value
+        self.list_misses += 1
+        _note("miss")
+        generation = self._list_generation.get(customer_id, 0)
+        value = await load()
+        if self._list_generation.get(customer_id, 0) != generation:
+            return value  # a post was created meanwhile; this list may already be missing it
+        self._put(
+            self._lists, (customer_id, key), _Timed(value, time.monotonic() + self.list_ttl, frozenset(profile_ids))
+        )
+        return value
+
+    def invalidate_lists(self, customer_id: str, profile_ids: list[str]) -> None:
+        """Drop cached lists of this customer that cover any of these profiles."""
+        touched = set(profile_ids)
+        self._list_generation[customer_id] = self._list_generation.get(customer_id, 0) + 1
+        stale = [k for k, e in self._lists.items() if k[0] == customer_id and e.profile_ids & touched]
+        for k in stale:
+            del self._lists[k]
+        self.invalidated_lists += len(stale)
+
+    def clear(self) -> None:
+        self._posts.clear()
+        self._lists.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "posts": len(self._posts),
+            "lists": len(self._lists),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "list_hits": self.list_hits,
+            "list_misses": self.list_misses,
+            "invalidated_lists": self.invalidated_lists,
+        }
@@ -1,13 +1,118 @@
+import asyncio
+import json
+import logging
 import os
+import time
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Any
 
 import httpx
 
-BASE_URL = "https://api.sproutsocial.com"
+from .metrics import Metrics
+from .ratelimit import TokenBucket
+from .retry import RETRY_EXCEPTIONS, RETRY_STATUSES, RetryPolicy, is_read_post
+
+log = logging.getLogger(__name__)
+
+BASE_URL = os.environ.get("SPROUT_API_BASE_URL", "https://api.sproutsocial.com")
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name) or default)
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name) or default)
+
+
+def _env_bool(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass
+class CallStats:
+    """Counters for one tool call, shared with any tasks the call fans out to."""
+
+    tool: str = ""
+    retries: int = 0
+    upstream_requests: int = 0
+    serialize_seconds: float = 0.0
+    error: bool = False
+    notes: dict[str, Any] = field(default_factory=dict)
+
+
+_call_stats: ContextVar[CallStats | None] = ContextVar("sprout_call_stats", default=None)
+
+
+def begin_call(tool: str = "") -> CallStats:
+    """Start a fresh set of counters for the current tool call."""
+    stats = CallStats(tool=tool)
+    _call_stats.set(stats)
+    return stats
+
+
+def current_call() -> CallStats | None:
+    return _call_stats.get()
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Future[Any]
+    waiters: int = 0
+
+
+def _flight_key(method: str, path: str, payload: dict[str, Any] | None) -> str:
+    return f"{method} {path} {json.dumps(payload, sort_keys=True, separators=(',', ':'))}"
 
 
 class SproutClient:
-    def __init__(self) -> None:
+    """Async Sprout API client backed by one pooled, long-lived httpx client.
+
+    Pool limits are read from the environment:
+        SPROUT_MAX_CONNECTIONS: Maximum open connections (default 20).
+        SPROUT_MAX_KEEPALIVE: Maximum idle keep-alive connections (default 10).
+        SPROUT_KEEPALIVE_EXPIRY: Seconds an idle connection is kept (default 30).
+        SPROUT_HTTP2: Set to 1 to negotiate HTTP/2 and multiplex concurrent
+            calls over fewer connections. Falls back to HTTP/1.1 when the
+            server does not offer h2 or the h2 package is not installed.
+
+    Every request waits for a rate-limit permit first:
+        SPROUT_RATE_LIMIT: Requests allowed per minute (default 60).
+        SPROUT_RATE_LIMIT_BURST: Bucket capacity (default SPROUT_RATE_LIMIT).
+        SPROUT_RATE_LIMIT_MAX_WAIT: Seconds a call may queue for a permit
+            before failing with RateLimitExceeded (default 30).
+
+    Transient failures (HTTP 429/502/503/504, connect errors) are retried per
+    RetryPolicy.from_env(). GETs are always retried; POSTs only when they hit a
+    read-only endpoint or the caller passes idempotent=True.
+
+    When a Metrics registry is given, every attempt records its network
+    latency, JSON decode time, bytes in and out, status code and retry flag.
+
+    Cancelling a call aborts its request (or its wait for a permit or retry)
+    unless another coalesced caller is still waiting for the same response.
+
+    Extra keyword arguments are passed through to httpx.AsyncClient.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        *,
+        http2: bool | None = None,
+        metrics: Metrics | None = None,
+        **http_options: Any,
+    ) -> None:
         token = os.environ.get("SPROUT_API_TOKEN")
         if not token:
             raise RuntimeError("SPROUT_API_TOKEN environment variable is not set")
@@ -16,25 +121,160 @@ class SproutClient:
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
+        if http2 is None:
+            http2 = _env_bool("SPROUT_HTTP2")
+        if http2 and not _http2_available():
+            log.warning("SPROUT_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            http2=http2,
+            headers=self._headers,
+            timeout=30,
+            limits=httpx.Limits(
+                max_connections=_env_int("SPROUT_MAX_CONNECTIONS", 20),
+                max_keepalive_connections=_env_int("SPROUT_MAX_KEEPALIVE", 10),
+                keepalive_expiry=_env_float("SPROUT_KEEPALIVE_EXPIRY", 30.0),
+            ),
+            **http_options,
+        )
+        per_minute = _env_float("SPROUT_RATE_LIMIT", 60.0)
+        self.rate_limit = TokenBucket(
+            rate=per_minute / 60,
+            capacity=_env_float("SPROUT_RATE_LIMIT_BURST", per_minute),
+            max_wait=_env_float("SPROUT_RATE_LIMIT_MAX_WAIT", 30.0),
+        )
+        self.retry = RetryPolicy.from_env()
+        self._inflight: dict[str, _Flight] = {}
+        self.upstream_requests = 0
+        self.coalesced_requests = 0
+        self.metrics = metrics
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "SproutClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "base_url": str(self._http.base_url),
+            "http2": self.http2,
+            "rate_limit": self.rate_limit.snapshot(),
+            "requests": {
+                "upstream": self.upstream_requests,
+                "coalesced": self.coalesced_requests,
+                "in_flight": len(self._inflight),
+            },
+        }
+
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fetch once for all concurrent callers with the same key."""
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = self._inflight[key] = _Flight(asyncio.ensure_future(fetch()))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.coalesced_requests += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Every caller was cancelled: abort the request, and make sure a
+                # caller arriving before the task unwinds starts a fresh one.
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    async def _request(self, method: str, path: str, retry: bool, **kwargs: Any) -> Any:
+        attempt, delay = 1, 0.0
+        stats = current_call()
+        while True:
+            await self.rate_limit.acquire()
+            self.upstream_requests += 1
+            if stats is not None:
+                stats.upstream_requests += 1
+            started = time.perf_counter()
+            try:
+                r = await self._http.request(method, path, **kwargs)
+            except asyncio.CancelledError:
+                # httpx closes the connection, so the upstream request is aborted too.
+                self._record(method, path, "cancelled", started, attempt)
+                raise
+            except RETRY_EXCEPTIONS as e:
+                self._record(method, path, type(e).__name__, started, attempt)
+                if not retry or (delay := self.retry.delay(attempt, delay, None)) is None:
+                    raise
+            else:
+                self.rate_limit.observe(r.headers)
+                if r.status_code not in RETRY_STATUSES or not retry:
+                    if r.is_error:
+                        self._record(method, path, r.status_code, started, attempt, r)
+                    r.raise_for_status()
+                    return self._decode(method, path, started, attempt, r)
+                self._record(method, path, r.status_code, started, attempt, r)
+                if (delay := self.retry.delay(attempt, delay, r)) is None:
+                    r.raise_for_status()
+            attempt += 1
+            if stats is not None:
+                stats.retries += 1
+            log.info("retrying %s %s in %.2fs (attempt %d)", method, path, delay, attempt)
+            await asyncio.sleep(delay)
+
+    def _decode(self, method: str, path: str, started: float, attempt: int, r: httpx.Response) -> Any:
+        network_done = time.perf_counter()
+        data = r.json()
+        self._record(method, path, r.status_code, started, attempt, r, network_done)
+        return data
+
+    def _record(
+        self,
+        method: str,
+        path: str,
+        status: int | str,
+        started: float,
+        attempt: int,
+        r: httpx.Response | None = None,
+        network_done: float | None = None,
+    ) -> None:
+        if self.metrics is None:
+            return
+        now = time.perf_counter()
+        end = network_done or now
+        self.metrics.record_request(
+            method,
+            path,
+            status,
+            end - started,
+            decode_seconds=now - end,
+            bytes_in=len(r.content) if r is not None else 0,
+            bytes_out=len(r.request.content) if r is not None else 0,
+            retry=attempt > 1,
+        )
 
     async def get(self, path: str, params: dict[str, Any] | None = None) -> Any:
-        async with httpx.AsyncClient() as c:
-            r = await c.get(
-                f"{BASE_URL}{path}",
-                headers=self._headers,
-                params=params,
-                timeout=30,
-            )
-            r.raise_for_status()
-            return r.json()
-
-    async def post(self, path: str, body: dict[str, Any] | None = None) -> Any:
-        async with httpx.AsyncClient() as c:
-            r = await c.post(
-                f"{BASE_URL}{path}",
-                headers=self._headers,
-                json=body,
-                timeout=30,
-            )
-            r.raise_for_status()
-            return r.json()
+        key = _flight_key("GET", path, params)
+        return await self._single_flight(key, lambda: self._request("GET", path, True, params=params))
+
+    async def post(
+        self,
+        path: str,
+        body: dict[str, Any] | None = None,
+        *,
+        idempotent: bool | None = None,
+    ) -> Any:
+        """POST to the API. idempotent defaults to whether the path is a read-only endpoint."""
+        retry = is_read_post(path) if idempotent is None else idempotent
+        if not retry:
+            return await self._request("POST", path, False, json=body)
+        key = _flight_key("POST", path, body)
+        return await self._single_flight(key, lambda: self._request("POST", path, True, json=body))
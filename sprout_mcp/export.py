@@ -0,0 +1,193 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any, BinaryIO
+
+from .client import SproutClient, current_call
+from .warehouse import DATASETS, iso_utc, next_token
+
+DEFAULT_DIR = os.path.join("~", ".cache", "sprout-mcp", "exports")
+
+FORMATS = ("jsonl", "csv")
+
+
+def flatten(row: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """Nested dicts to dotted columns; lists become JSON text."""
+    flat: dict[str, Any] = {}
+    for k, v in row.items():
+        name = f"{prefix}{k}"
+        if isinstance(v, dict):
+            flat.update(flatten(v, f"{name}."))
+        elif isinstance(v, list):
+            flat[name] = json.dumps(v, separators=(",", ":"))
+        else:
+            flat[name] = v
+    return flat
+
+
+@dataclass
+class Checkpoint:
+    """Progress of one export, saved next to the file after every page."""
+
+    dataset: str
+    customer_id: str
+    scopes: list[str]
+    start_time: str
+    end_time: str
+    fmt: str
+    compress: bool
+    scope_index: int = 0  # scope being exported
+    token: str | None = None  # page to fetch next within it
+    rows: int = 0
+    bytes: int = 0  # size of the file being appended to after the last complete page
+    columns: list[str] = field(default_factory=list)  # CSV: every column seen so far, in first-seen order
+
+    def same_job(self, other: "Checkpoint") -> bool:
+        keys = ("dataset", "customer_id", "scopes", "start_time", "end_time", "fmt", "compress")
+        return all(getattr(self, k) == getattr(other, k) for k in keys)
+
+
+def _load(path: str) -> Checkpoint | None:
+    try:
+        with open(path) as f:
+            return Checkpoint(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _save(path: str, checkpoint: Checkpoint) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(asdict(checkpoint), f)
+    os.replace(tmp, path)
+
+
+def _encode(rows: list[dict[str, Any]], checkpoint: Checkpoint) -> bytes:
+    """One page as JSON lines; for CSV the rows are flattened and their new columns recorded."""
+    if checkpoint.fmt == "csv":
+        rows = [flatten(r) for r in rows]
+        checkpoint.columns = list(dict.fromkeys([*checkpoint.columns, *(k for r in rows for k in r)]))
+    return "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in rows).encode()
+
+
+def _append_page(
+    f: BinaryIO, checkpoint_path: str, checkpoint: Checkpoint, rows: list[dict[str, Any]], token: str | None
+) -> None:
+    """Write one page at the end of f and checkpoint it; token is the page after it, None at the end of a scope."""
+    chunk = _encode(rows, checkpoint)
+    if checkpoint.compress and checkpoint.fmt == "jsonl" and chunk:
+        chunk = gzip.compress(chunk, compresslevel=6)
+    f.write(chunk)
+    f.flush()
+    checkpoint.rows += len(rows)
+    checkpoint.bytes += len(chunk)
+    checkpoint.token = token
+    if token is None:
+        checkpoint.scope_index += 1
+    _save(checkpoint_path, checkpoint)
+
+
+def _write_csv(spill: str, path: str, columns: list[str], compress: bool) -> None:
+    """Second pass: rewrite the flattened rows in spill as CSV under the final header, a line at a time."""
+    with open(path, "wb") as raw:
+        stream = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) if compress else raw
+        with io.TextIOWrapper(stream, encoding="utf-8", newline="") as out, open(spill, "rb") as rows:
+            if columns:
+                writer = csv.DictWriter(out, columns)
+                writer.writeheader()
+                for line in rows:
+                    writer.writerow(json.loads(line))
+            out.flush()
+            if stream is not raw:
+                stream.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+
+
+async def _in_thread(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run fn in a worker thread, and wait for it even if the export is cancelled meanwhile.
+
+    Otherwise a cancelled export could close its file under a write, or
+    leave a checkpoint that does not match the file.
+    """
+    task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        await asyncio.wait([task])
+        raise
+
+
+async def export(
+    client: SproutClient,
+    dataset: str,
+    customer_id: str,
+    scopes: list[str],
+    start_time: str,
+    end_time: str,
+    path: str,
+    fmt: str = "jsonl",
+    compress: bool = False,
+) -> dict[str, Any]:
+    """Stream every page of a dataset for start..end to path, one page in memory at a time.
+
+    Profile datasets are fetched with all profiles in one filter; listening
+    is fetched topic by topic. After each page is written, the file size
+    and the next page token are saved to path + ".checkpoint". If an export
+    stops partway, running it again with the same arguments truncates the
+    file to the last checkpoint and continues from there. Compressed files
+    get one gzip member per page, so a truncated file is still valid gzip.
+
+    A later page can bring fields an earlier one lacked, so CSV exports
+    first spool flattened rows as JSON lines to path + ".rows" and, once
+    every page is in, write the CSV from it with the union of all columns
+    as its header (rows leave columns they lack empty).
+
+    File writes, compression and fsync run in worker threads, so a large
+    export does not hold up the event loop other sessions share.
+    """
+    ds = DATASETS[dataset]
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    jobs = scopes if ds.scope == "topic" else [",".join(scopes)]
+    wanted = Checkpoint(dataset, customer_id, jobs, start_time, end_time, fmt, compress)
+    checkpoint_path = f"{path}.checkpoint"
+    target = f"{path}.rows" if fmt == "csv" else path
+    saved = _load(checkpoint_path)
+    resumed = (
+        saved is not None
+        and saved.same_job(wanted)
+        and os.path.exists(target)
+        and os.path.getsize(target) >= saved.bytes
+    )
+    checkpoint = saved if resumed else wanted
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pages, resumed_at = 0, checkpoint.rows
+    with open(target, "r+b" if resumed else "wb") as f:
+        f.truncate(checkpoint.bytes)
+        f.seek(checkpoint.bytes)
+        _save(checkpoint_path, checkpoint)
+        while checkpoint.scope_index < len(jobs):
+            scope = jobs[checkpoint.scope_index]
+            body = ds.body(scope, iso_utc(start_time), iso_utc(end_time))
+            if checkpoint.token is not None:
+                body[ds.token_field] = int(checkpoint.token) if ds.token_field == "page" else checkpoint.token
+            data = await client.post(ds.path.format(cid=customer_id, scope=scope), body, idempotent=True)
+            token = next_token(ds, data, checkpoint.token)
+            await _in_thread(_append_page, f, checkpoint_path, checkpoint, data.get("data") or [], token)
+            pages += 1
+        await _in_thread(os.fsync, f.fileno())
+    if fmt == "csv":
+        await _in_thread(_write_csv, target, path, checkpoint.columns, compress)
+        os.remove(target)
+    os.remove(checkpoint_path)
+    if (stats := current_call()) is not None:
+        stats.notes["pages"] = pages
+        if resumed:
+            stats.notes["resumed_at_rows"] = resumed_at
+    return {"path": path, "rows": checkpoint.rows, "bytes": os.path.getsize(path)}
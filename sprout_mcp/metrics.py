@@ -0,0 +1,221 @@
+import bisect
+import os
+import re
+import tempfile
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+# Seconds. Upper bounds of the histogram buckets; +Inf is implicit.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_ID_SEGMENT = re.compile(
+    r"/(?:\d+|[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12})(?=/|$)"
+)
+
+
+def endpoint_label(path: str) -> str:
+    """Collapse customer, topic and post IDs so paths group into a few endpoints."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def summary(self) -> dict[str, float | None]:
+        def ms(v: float | None) -> float | None:
+            return None if v is None else round(v * 1000, 2)
+
+        return {
+            "mean_ms": ms(self.sum / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.50)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+        }
+
+
+@dataclass
+class ToolStats:
+    latency: Histogram = field(default_factory=Histogram)
+    serialize_seconds: float = 0.0
+    calls: int = 0
+    errors: int = 0
+    cancelled: int = 0
+    bytes_out: int = 0
+    upstream_requests: int = 0
+    retries: int = 0
+
+
+@dataclass
+class EndpointStats:
+    latency: Histogram = field(default_factory=Histogram)
+    decode_seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    retries: int = 0
+    statuses: Counter[str] = field(default_factory=Counter)
+
+
+class Metrics:
+    """Latency histograms and byte/status/retry counters for tools and upstream requests."""
+
+    def __init__(self) -> None:
+        self.tools: dict[str, ToolStats] = {}
+        self.endpoints: dict[tuple[str, str], EndpointStats] = {}
+
+    def reset(self) -> None:
+        self.tools.clear()
+        self.endpoints.clear()
+
+    def record_tool(
+        self,
+        name: str,
+        seconds: float,
+        *,
+        bytes_out: int,
+        error: bool,
+        serialize_seconds: float,
+        upstream_requests: int,
+        retries: int,
+        cancelled: bool = False,
+    ) -> None:
+        stats = self.tools.setdefault(name, ToolStats())
+        stats.latency.observe(seconds)
+        stats.calls += 1
+        stats.errors += error
+        stats.cancelled += cancelled
+        stats.bytes_out += bytes_out
+        stats.serialize_seconds += serialize_seconds
+        stats.upstream_requests += upstream_requests
+        stats.retries += retries
+
+    def record_request(
+        self,
+        method: str,
+        path: str,
+        status: int | str,
+        seconds: float,
+        *,
+        decode_seconds: float = 0.0,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+        retry: bool = False,
+    ) -> None:
+        stats = self.endpoints.setdefault((method, endpoint_label(path)), EndpointStats())
+        stats.latency.observe(seconds)
+        stats.statuses[str(status)] += 1
+        stats.decode_seconds += decode_seconds
+        stats.bytes_in += bytes_in
+        stats.bytes_out += bytes_out
+        stats.retries += retry
+
+    def snapshot(self) -> dict[str, Any]:
+        tools = {}
+        for name, t in sorted(self.tools.items()):
+            tools[name] = {
+                "calls": t.calls,
+                "errors": t.errors,
+                "cancelled": t.cancelled,
+                **t.latency.summary(),
+                "serialize_mean_ms": round(t.serialize_seconds / t.calls * 1000, 3),
+                "bytes_out": t.bytes_out,
+                "upstream_requests_per_call": round(t.upstream_requests / t.calls, 2),
+                "retries": t.retries,
+            }
+        endpoints = {}
+        for (method, path), e in sorted(self.endpoints.items()):
+            n = e.latency.count
+            endpoints[f"{method} {path}"] = {
+                "requests": n,
+                **e.latency.summary(),
+                "decode_mean_ms": round(e.decode_seconds / n * 1000, 3),
+                "bytes_in": e.bytes_in,
+                "bytes_out": e.bytes_out,
+                "statuses": dict(e.statuses),
+                "retries": e.retries,
+            }
+        return {"tools": tools, "upstream": endpoints}
+
+    def prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format."""
+        lines: list[str] = []
+
+        def histogram(name: str, help_: str, series: list[tuple[str, Histogram]]) -> None:
+            lines.append(f"# HELP {name} {help_}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, h in series:
+                cumulative = 0
+                for bound, n in zip((*h.buckets, float("inf")), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {h.sum}")
+                lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+        def counter(name: str, help_: str, series: list[tuple[str, float]]) -> None:
+            lines.append(f"# HELP {name} {help_}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f"{name}{{{labels}}} {value}" for labels, value in series)
+
+        tools = [(f'tool="{name}"', t) for name, t in sorted(self.tools.items())]
+        endpoints = [
+            (f'method="{m}",endpoint="{p}"', e) for (m, p), e in sorted(self.endpoints.items())
+        ]
+        histogram("sprout_mcp_tool_duration_seconds", "Tool call latency.",
+                  [(labels, t.latency) for labels, t in tools])
+        counter("sprout_mcp_tool_errors_total", "Tool calls that returned an error.",
+                [(labels, t.errors) for labels, t in tools])
+        counter("sprout_mcp_tool_cancelled_total", "Tool calls cancelled by the client.",
+                [(labels, t.cancelled) for labels, t in tools])
+        counter("sprout_mcp_tool_output_bytes_total", "Bytes returned by tools.",
+                [(labels, t.bytes_out) for labels, t in tools])
+        counter("sprout_mcp_tool_serialize_seconds_total", "Time spent serializing tool output.",
+                [(labels, t.serialize_seconds) for labels, t in tools])
+        counter("sprout_mcp_tool_upstream_requests_total", "Upstream requests made by tools.",
+                [(labels, t.upstream_requests) for labels, t in tools])
+        histogram("sprout_mcp_upstream_duration_seconds", "Upstream request latency, network only.",
+                  [(labels, e.latency) for labels, e in endpoints])
+        counter("sprout_mcp_upstream_decode_seconds_total", "Time spent decoding upstream JSON.",
+                [(labels, e.decode_seconds) for labels, e in endpoints])
+        counter("sprout_mcp_upstream_received_bytes_total", "Response bytes received upstream.",
+                [(labels, e.bytes_in) for labels, e in endpoints])
+        counter("sprout_mcp_upstream_sent_bytes_total", "Request bytes sent upstream.",
+                [(labels, e.bytes_out) for labels, e in endpoints])
+        counter("sprout_mcp_upstream_retries_total", "Upstream requests that were retries.",
+                [(labels, e.retries) for labels, e in endpoints])
+        counter("sprout_mcp_upstream_responses_total", "Upstream responses by status.",
+                [(f'{labels},status="{status}"', n)
+                 for labels, e in endpoints for status, n in sorted(e.statuses.items())])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically replace path with the current Prometheus text dump."""
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as f:
+            f.write(self.prometheus())
+        os.replace(f.name, path)
@@ -0,0 +1,53 @@
+import json
+import logging
+import os
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see the "fast" extra
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+FORMATS = ("pretty", "compact", "ndjson")
+
+
+def output_format() -> str:
+    """Server-wide output format from SPROUT_OUTPUT_FORMAT: pretty (default), compact or ndjson."""
+    fmt = (os.environ.get("SPROUT_OUTPUT_FORMAT") or "pretty").strip().lower()
+    if fmt not in FORMATS:
+        log.warning("unknown SPROUT_OUTPUT_FORMAT %r; using pretty", fmt)
+        return "pretty"
+    return fmt
+
+
+def _encode(data: Any, pretty: bool) -> str:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(data, option=option).decode()
+        except TypeError:  # e.g. integers wider than 64 bits
+            pass
+    if pretty:
+        return json.dumps(data, indent=2)
+    return json.dumps(data, separators=(",", ":"))
+
+
+def dumps(data: Any, fmt: str | None = None) -> str:
+    """Serialize a tool result in the configured output format.
+
+    ndjson writes each element of a top-level "data" list on its own line,
+    followed by one line holding the remaining keys (paging, _meta, ...).
+    Anything else is written as a single compact line.
+    """
+    fmt = fmt or output_format()
+    if fmt == "pretty":
+        return _encode(data, pretty=True)
+    if fmt == "ndjson" and isinstance(data, dict) and isinstance(data.get("data"), list):
+        lines = [_encode(item, pretty=False) for item in data["data"]]
+        rest = {k: v for k, v in data.items() if k != "data"}
+        if rest:
+            lines.append(_encode(rest, pretty=False))
+        return "\n".join(lines)
+    return _encode(data, pretty=False)
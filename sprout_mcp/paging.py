@@ -0,0 +1,257 @@
+import asyncio
+import heapq
+from collections.abc import AsyncGenerator, Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from .client import SproutClient
+
+_DONE = object()
+
+
+def _next_cursor(data: dict[str, Any], cursor_field: str, body: dict[str, Any]) -> Any:
+    paging = data.get("paging") or {}
+    if cursor_field == "page":
+        current = int(paging.get("current_page") or body.get("page") or 1)
+        return current + 1 if current < int(paging.get("total_pages") or 1) else None
+    return paging.get("next_cursor") or None
+
+
+async def _next_page(queue: asyncio.Queue[Any], producer: asyncio.Task[None]) -> Any:
+    """The next queued page, or _DONE once the producer has stopped (even by cancel()) and the queue is empty."""
+    while queue.empty():
+        if producer.done():
+            return _DONE
+        getter = asyncio.ensure_future(queue.get())
+        try:
+            await asyncio.wait((getter, producer), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        if getter.done() and not getter.cancelled():
+            return getter.result()
+    return queue.get_nowait()
+
+
+class Paginator:
+    """Follow pagination on a POST endpoint, one bounded page queue at a time.
+
+    cursor_field names the body field carrying paging.next_cursor, or is
+    "page" for endpoints numbered by paging.current_page / total_pages.
+
+    A background task fetches up to `prefetch` pages ahead of the consumer and
+    then waits, so memory stays flat no matter how many pages a pull spans.
+    on_page, if given, sees every fetched page, including ones the consumer
+    never reads.
+    Closing the items() generator early, or calling cancel(), cancels the
+    fetch task; after cancel(), items() yields what was already queued and
+    then ends.
+    """
+
+    def __init__(
+        self,
+        client: SproutClient,
+        path: str,
+        body: dict[str, Any],
+        *,
+        cursor_field: str = "cursor",
+        prefetch: int = 2,
+        semaphore: asyncio.Semaphore | None = None,
+        on_page: Callable[[list[dict[str, Any]]], None] | None = None,
+    ) -> None:
+        self.client = client
+        self.path = path
+        self.body = body
+        self.cursor_field = cursor_field
+        self.prefetch = prefetch
+        self.semaphore = semaphore
+        self.on_page = on_page
+        self.pages = 0
+        self.exhausted = False
+        self._task: asyncio.Task[None] | None = None
+
+    async def _produce(self, queue: asyncio.Queue[Any]) -> None:
+        body = dict(self.body)
+        try:
+            while True:
+                if self.semaphore is None:
+                    data = await self.client.post(self.path, body)
+                else:
+                    async with self.semaphore:
+                        data = await self.client.post(self.path, body)
+                self.pages += 1
+                if self.on_page is not None:
+                    self.on_page(data.get("data") or [])
+                await queue.put(data.get("data") or [])
+                cursor = _next_cursor(data, self.cursor_field, body)
+                if cursor is None or not data.get("data"):
+                    self.exhausted = True
+                    break
+                body[self.cursor_field] = cursor
+        except Exception as e:
+            await queue.put(e)
+        await queue.put(_DONE)
+
+    async def items(self) -> AsyncGenerator[dict[str, Any], None]:
+        queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=self.prefetch)
+        task = self._task = asyncio.create_task(self._produce(queue))
+        try:
+            while (page := await _next_page(queue, task)) is not _DONE:
+                if isinstance(page, Exception):
+                    raise page
+                for item in page:
+                    yield item
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def cancel(self) -> None:
+        """Stop fetching pages without waiting; safe to call at any time."""
+        if self._task is not None:
+            self._task.cancel()
+
+
+def _format_like(value: datetime, template: str) -> str:
+    if template.endswith("Z"):
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if value.tzinfo is not None:
+        return value.isoformat()
+    return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def split_window(start: str, end: str, shards: int) -> list[tuple[str, str]]:
+    """Split an inclusive ISO 8601 window into at most `shards` sub-windows, newest first.
+
+    Sub-windows are second-aligned and do not overlap (each ends one second
+    before the next begins), so together they cover exactly the same
+    created_time values as the whole window.
+    """
+    first, last = datetime.fromisoformat(start), datetime.fromisoformat(end)
+    seconds = int((last - first).total_seconds()) + 1
+    shards = max(1, min(shards, seconds))
+    bounds = [first + timedelta(seconds=seconds * i // shards) for i in range(shards + 1)]
+    windows = [
+        (_format_like(bounds[i], start), _format_like(bounds[i + 1] - timedelta(seconds=1), end))
+        for i in range(shards)
+    ]
+    return windows[::-1]
+
+
+class _Desc:
+    """Heap entry that orders by key descending, then by stream index."""
+
+    __slots__ = ("key", "index", "item")
+
+    def __init__(self, key: Any, index: int, item: Any) -> None:
+        self.key, self.index, self.item = key, index, item
+
+    def __lt__(self, other: "_Desc") -> bool:
+        if self.key != other.key:
+            return self.key > other.key
+        return self.index < other.index
+
+
+async def merge_desc(
+    streams: list[AsyncGenerator[dict[str, Any], None]],
+    key: Callable[[dict[str, Any]], Any],
+) -> AsyncGenerator[dict[str, Any], None]:
+    """K-way merge of streams that are each sorted by key descending."""
+    heap: list[_Desc] = []
+    try:
+        firsts = await asyncio.gather(*(anext(stream, None) for stream in streams))
+        heap = [_Desc(key(item), i, item) for i, item in enumerate(firsts) if item is not None]
+        heapq.heapify(heap)
+        while heap:
+            top = heap[0]
+            yield top.item
+            item = await anext(streams[top.index], None)
+            if item is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, _Desc(key(item), top.index, item))
+    finally:
+        for stream in streams:
+            await stream.aclose()
+
+
+class MessageSummary:
+    """Constant-memory rollup of a message stream: counts plus a small sample."""
+
+    def __init__(self, sample_size: int = 10) -> None:
+        self.sample_size = sample_size
+        self.total = 0
+        self.by_network: dict[str, int] = {}
+        self.by_language: dict[str, int] = {}
+        self.by_day: dict[str, int] = {}
+        self.newest: str | None = None
+        self.oldest: str | None = None
+        self.sample: list[dict[str, Any]] = []
+
+    def add(self, item: dict[str, Any]) -> None:
+        self.total += 1
+        for counts, key in (
+            (self.by_network, item.get("network")),
+            (self.by_language, item.get("language")),
+            (self.by_day, (item.get("created_time") or "")[:10]),
+        ):
+            if key:
+                counts[key] = counts.get(key, 0) + 1
+        created = item.get("created_time")
+        if created:
+            self.newest = max(self.newest or created, created)
+            self.oldest = min(self.oldest or created, created)
+        if len(self.sample) < self.sample_size:
+            self.sample.append(item)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total,
+            "newest_created_time": self.newest,
+            "oldest_created_time": self.oldest,
+            "by_network": self.by_network,
+            "by_language": self.by_language,
+            "by_day": dict(sorted(self.by_day.items())),
+            "sample": self.sample,
+        }
+
+
+def merge_summaries(summaries: list[dict[str, Any]], sample_size: int = 10) -> dict[str, Any]:
+    """Combine MessageSummary dicts of disjoint windows, given newest window first."""
+    newest = [s["newest_created_time"] for s in summaries if s["newest_created_time"]]
+    oldest = [s["oldest_created_time"] for s in summaries if s["oldest_created_time"]]
+    merged: dict[str, Any] = {
+        "total": sum(s["total"] for s in summaries),
+        "newest_created_time": max(newest, default=None),
+        "oldest_created_time": min(oldest, default=None),
+    }
+    for field in ("by_network", "by_language", "by_day"):
+        counts: dict[str, int] = {}
+        for s in summaries:
+            for key, n in s[field].items():
+                counts[key] = counts.get(key, 0) + n
+        merged[field] = dict(sorted(counts.items())) if field == "by_day" else counts
+    merged["sample"] = [m for s in summaries for m in s["sample"]][:sample_size]
+    return merged
+
+
+async def collect(
+    items: AsyncGenerator[dict[str, Any], None], max_items: int, summarize: bool
+) -> tuple[dict[str, Any], bool]:
+    """Drain up to max_items into a merged list or a summary; returns (result, truncated)."""
+    summary = MessageSummary() if summarize else None
+    merged: list[dict[str, Any]] = []
+    count = 0
+    truncated = False
+    try:
+        async for item in items:
+            if count >= max_items:
+                truncated = True
+                break
+            count += 1
+            if summary is not None:
+                summary.add(item)
+            else:
+                merged.append(item)
+    finally:
+        await items.aclose()
+    return ({"summary": summary.to_dict()} if summary is not None else {"data": merged}), truncated
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from collections.abc import Mapping
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a request would have to queue longer than the allowed wait."""
+
+
+class TokenBucket:
+    """Client-side token bucket that keeps requests inside the API rate limit.
+
+    Permits are reserved up front, so concurrent callers queue in arrival order
+    instead of racing. The budget is corrected from the X-RateLimit-* headers on
+    every response, which keeps it honest when other clients share the token.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_wait: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Wait for a permit and return how long the caller queued, in seconds."""
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= 1
+        delay = max(-self._tokens / self.rate, self._blocked_until - now, 0.0)
+        if delay > self.max_wait:
+            self._tokens += 1
+            raise RateLimitExceeded(
+                f"Sprout API rate limit budget exhausted; next permit in {delay:.1f}s "
+                f"(max wait {self.max_wait:.0f}s)"
+            )
+        if delay:
+            self._waiting += 1
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._tokens += 1
+                raise
+            finally:
+                self._waiting -= 1
+        return delay
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Tighten the budget from X-RateLimit-Remaining / X-RateLimit-Reset headers."""
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        try:
+            remaining_n = float(remaining)
+        except ValueError:
+            return
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = min(self._tokens, remaining_n)
+        reset = headers.get("x-ratelimit-reset")
+        if remaining_n <= 0 and reset:
+            try:
+                reset_s = float(reset)
+            except ValueError:
+                return
+            if reset_s > 1e9:  # epoch seconds rather than seconds-until-reset
+                reset_s -= time.time()
+            self._blocked_until = max(self._blocked_until, now + max(reset_s, 0.0))
+
+    def snapshot(self) -> dict[str, float | int]:
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "available": round(max(self._tokens, 0.0), 2),
+            "capacity": self.capacity,
+            "refill_per_second": self.rate,
+            "queued": self._waiting,
+            "blocked_for_seconds": round(max(self._blocked_until - now, 0.0), 2),
+            "max_wait_seconds": self.max_wait,
+        }
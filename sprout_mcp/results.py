@@ -0,0 +1,187 @@
+import json
+import re
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from .output import dumps
+
+PREVIEW_ROWS = 3
+
+_CONDITION = re.compile(r"^\s*([^!<>=~]+?)\s*(!=|>=|<=|=|>|<|~)\s*(.*?)\s*$")
+
+
+@dataclass
+class StoredResult:
+    tool: str
+    encoded: list[bytes]  # one compact JSON document per row
+    rest: dict[str, Any]  # the result's other top-level keys (paging, summary, ...)
+    size: int  # bytes held, as charged against the store's budget
+    created: float = field(default_factory=time.time)
+
+    def __len__(self) -> int:
+        return len(self.encoded)
+
+    def rows(self, start: int = 0, stop: int | None = None) -> list[Any]:
+        """Decode rows start..stop (all by default)."""
+        return [json.loads(r) for r in self.encoded[start:stop]]
+
+
+class ResultStore:
+    """LRU store for oversized tool results, bounded by the memory they hold.
+
+    A result too large to return whole is kept here under an opaque handle
+    and read back in slices, so neither Sprout nor the model sees it twice.
+    Rows are kept as encoded JSON, about a third of the size of the live
+    objects, and decoded only when read; each result is charged the size of
+    its encoded rows. Storing evicts the least recently used results until
+    the new one fits.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20) -> None:
+        self.max_bytes = max_bytes
+        self._results: OrderedDict[str, StoredResult] = OrderedDict()
+        self._bytes = 0
+        self.stored = 0
+        self.evicted = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def put(self, tool: str, rows: list[Any], rest: dict[str, Any]) -> str | None:
+        """Store a result and return its handle, or None if it alone exceeds the budget."""
+        encoded = [dumps(row, "compact").encode() for row in rows]
+        size = sum(sys.getsizeof(r) for r in encoded)
+        if size > self.max_bytes:
+            return None
+        while self._bytes + size > self.max_bytes:
+            _, old = self._results.popitem(last=False)
+            self._bytes -= old.size
+            self.evicted += 1
+        handle = f"res_{secrets.token_hex(8)}"
+        self._results[handle] = StoredResult(tool, encoded, rest, size)
+        self._bytes += size
+        self.stored += 1
+        return handle
+
+    def get(self, handle: str) -> StoredResult:
+        result = self._results.get(handle)
+        if result is None:
+            self.misses += 1
+            raise ValueError(f"unknown or expired result handle {handle}; run the original tool again")
+        self._results.move_to_end(handle)
+        return result
+
+    def clear(self) -> None:
+        self._results.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "results": len(self._results),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "stored": self.stored,
+            "evicted": self.evicted,
+            "misses": self.misses,
+        }
+
+
+def lookup(row: Any, path: str) -> Any:
+    """Value at a dotted path; keys that themselves contain dots (lifetime.impressions) are matched whole."""
+    if not path:
+        return row
+    if not isinstance(row, dict):
+        return None
+    if path in row:
+        return row[path]
+    head, _, rest = path.partition(".")
+    while rest:
+        if head in row:
+            return lookup(row[head], rest)
+        more, _, rest = rest.partition(".")
+        head = f"{head}.{more}"
+    return None
+
+
+def fields_of(rows: list[Any], sample: int = 20) -> list[str]:
+    """Dotted paths to the leaf values of the first few rows, for describing a stored result."""
+    paths: dict[str, None] = {}
+
+    def walk(value: Any, prefix: str) -> None:
+        if isinstance(value, dict) and value:
+            for k, v in value.items():
+                walk(v, f"{prefix}.{k}" if prefix else str(k))
+        elif prefix:
+            paths.setdefault(prefix)
+
+    for row in rows[:sample]:
+        walk(row, "")
+    return list(paths)
+
+
+def project(row: Any, fields: list[str]) -> Any:
+    return {f: lookup(row, f) for f in fields} if fields else row
+
+
+def _compare(value: Any, op: str, wanted: str) -> bool:
+    if value is None:
+        return op == "!=" and wanted.lower() not in ("", "null", "none")
+    if op == "~":
+        return wanted.lower() in str(value).lower()
+    if isinstance(value, bool):
+        value = str(value).lower()
+    if isinstance(value, (int, float)):
+        try:
+            target: Any = float(wanted)
+        except ValueError:
+            value, target = str(value), wanted
+    else:
+        value, target = str(value), wanted
+    if op == "=":
+        return value == target
+    if op == "!=":
+        return value != target
+    if op == ">":
+        return value > target
+    if op == ">=":
+        return value >= target
+    if op == "<":
+        return value < target
+    return value <= target
+
+
+def parse_where(where: str) -> list[tuple[str, str, str]]:
+    """Parse 'field op value' conditions separated by ';' (op: = != > >= < <= ~)."""
+    conditions = []
+    for part in where.split(";"):
+        if not part.strip():
+            continue
+        match = _CONDITION.match(part)
+        if match is None:
+            raise ValueError(f"cannot parse condition {part.strip()!r}; use field=value, field>number, field~text")
+        conditions.append(match.groups())
+    return conditions
+
+
+def matches(row: Any, conditions: list[tuple[str, str, str]]) -> bool:
+    return all(_compare(lookup(row, path), op, value) for path, op, value in conditions)
+
+
+def sort_rows(rows: list[Any], path: str, descending: bool) -> list[Any]:
+    """Sort by the value at path; rows without one go last either way."""
+    present = [(v, r) for r in rows if (v := lookup(r, path)) is not None]
+    missing = [r for r in rows if lookup(r, path) is None]
+
+    def key(item: tuple[Any, Any]) -> tuple[int, Any]:
+        value = item[0]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (0, value)
+        return (1, str(value))
+
+    present.sort(key=key, reverse=descending)
+    return [r for _, r in present] + missing
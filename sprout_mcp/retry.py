@@ -0,0 +1,82 @@
+import os
+import random
+import re
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Exceptions raised before the request reached the server, so a retry cannot
+# duplicate a side effect.
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# POST endpoints that only read data and are therefore safe to retry.
+READ_POST_PATHS = (
+    re.compile(r"^/v1/[^/]+/analytics/"),
+    re.compile(r"^/v1/[^/]+/listening/topics/[^/]+/messages$"),
+    re.compile(r"^/v1/[^/]+/messages$"),
+)
+
+
+def is_read_post(path: str) -> bool:
+    return any(p.search(path) for p in READ_POST_PATHS)
+
+
+def retry_after(headers: Mapping[str, str]) -> float | None:
+    """Parse a Retry-After header given as delta-seconds or an HTTP date."""
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """Bounded retries with decorrelated jitter.
+
+    Configured from the environment by from_env():
+        SPROUT_RETRY_ATTEMPTS: Total attempts per request, including the first (default 4).
+        SPROUT_RETRY_BASE_DELAY: Minimum backoff in seconds (default 0.5).
+        SPROUT_RETRY_MAX_DELAY: Maximum backoff in seconds; a Retry-After longer
+            than this ends the retries instead of stalling the tool (default 20).
+    """
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=int(os.environ.get("SPROUT_RETRY_ATTEMPTS") or cls.max_attempts),
+            base_delay=float(os.environ.get("SPROUT_RETRY_BASE_DELAY") or cls.base_delay),
+            max_delay=float(os.environ.get("SPROUT_RETRY_MAX_DELAY") or cls.max_delay),
+        )
+
+    def backoff(self, previous: float) -> float:
+        """Next decorrelated-jitter delay given the previous one."""
+        return min(self.max_delay, random.uniform(self.base_delay, max(previous, self.base_delay) * 3))
+
+    def delay(self, attempt: int, previous: float, response: httpx.Response | None) -> float | None:
+        """Seconds to wait before the next attempt, or None to stop retrying."""
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(previous)
+        if response is not None:
+            hinted = retry_after(response.headers)
+            if hinted is not None:
+                if hinted > self.max_delay:
+                    return None
+                delay = max(delay, hinted)
+        return delay
@@ -0,0 +1,373 @@
+import heapq
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # optional speed-up, see the "search" extra
+    np = None
+
+from .warehouse import iso_utc
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+# (filters, ...) passed from search() to the two engines:
+# scope codes, network codes or None, language codes or None, start epoch or None, end epoch or None
+_Filters = tuple[set[int], set[int] | None, set[int] | None, int | None, int | None]
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _epoch(ts: str) -> int:
+    return int(datetime.fromisoformat(iso_utc(ts)).timestamp()) if ts else 0
+
+
+class _Postings:
+    """Documents containing one term, in doc order, with their term positions flattened."""
+
+    __slots__ = ("docs", "freqs", "offsets", "positions")
+
+    def __init__(self) -> None:
+        self.docs = array("I")
+        self.freqs = array("I")
+        self.offsets = array("I")  # start of each doc's run in positions
+        self.positions = array("I")
+
+    def add(self, doc: int, positions: list[int]) -> None:
+        self.docs.append(doc)
+        self.freqs.append(len(positions))
+        self.offsets.append(len(self.positions))
+        self.positions.extend(positions)
+
+    def find(self, doc: int) -> int:
+        """Index of doc in this list, or -1."""
+        i = bisect_left(self.docs, doc)
+        return i if i < len(self.docs) and self.docs[i] == doc else -1
+
+    def positions_at(self, i: int) -> array:
+        return self.positions[self.offsets[i]:self.offsets[i] + self.freqs[i]]
+
+
+class SearchIndex:
+    """In-memory inverted index with positional postings and BM25 ranking over message text.
+
+    Documents are appended as pages arrive and never rewritten, so postings
+    stay sorted by doc number and adding a page costs only its own tokens.
+    Bare query words are ranked with BM25; "quoted phrases" must appear
+    verbatim, checked against term positions.
+
+    Postings and per-document fields live in flat arrays. With NumPy
+    installed, scoring, filtering and phrase matching run vectorized over
+    them without copying; otherwise the same work is done in Python.
+
+    add() only queues a page, so it is cheap to call from the event loop.
+    Queued pages are indexed by the next flush() or search(), which hold a
+    lock and may run in a worker thread. With max_documents set, the oldest
+    documents are evicted once the index grows past it (down to 90%, so the
+    renumbering is amortized), and pages still queued beyond it are dropped.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_documents: int | None = None) -> None:
+        self.k1, self.b = k1, b
+        self.max_documents = max_documents
+        self._lock = threading.Lock()
+        self._pending: deque[tuple[str, str, list[dict[str, Any]]]] = deque()
+        self._pending_count = 0
+        self._pending_lock = threading.Lock()
+        self._messages: list[dict[str, Any]] = []
+        self._keys: list[tuple[str, str, str]] = []  # per doc, for _seen
+        self._seen: set[tuple[str, str, str]] = set()
+        self._postings: dict[str, _Postings] = {}
+        self._total_length = 0
+        # Per-document columns, indexed by doc number.
+        self._lengths = array("I")
+        self._created = array("q")  # epoch seconds, 0 if unknown
+        self._scope = array("I")  # index into _scopes
+        self._network = array("I")  # network and language are codes from _values
+        self._language = array("I")
+        self._scopes: list[tuple[str, str]] = []  # (customer_id, topic_id)
+        self._scope_codes: dict[tuple[str, str], int] = {}
+        self._values: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def _value(self, value: str) -> int:
+        return self._values.setdefault(value, len(self._values))
+
+    def add(self, customer_id: str, topic_id: str, messages: Iterable[dict[str, Any]]) -> None:
+        """Queue messages for indexing; ones already indexed (by guid or permalink) are skipped then."""
+        batch = list(messages)
+        with self._pending_lock:
+            self._pending.append((customer_id, topic_id, batch))
+            self._pending_count += len(batch)
+            if self.max_documents is None:
+                return
+            # Drop the oldest queued pages once the newer ones alone fill the budget:
+            # indexing them would only evict them again.
+            while self._pending_count - len(self._pending[0][2]) >= self.max_documents:
+                self._pending_count -= len(self._pending.popleft()[2])
+
+    def flush(self) -> int:
+        """Index every queued page now; returns how many documents were added."""
+        with self._lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        added = 0
+        while True:
+            with self._pending_lock:
+                if not self._pending:
+                    break
+                customer_id, topic_id, batch = self._pending.popleft()
+                self._pending_count -= len(batch)
+            added += self._index(customer_id, topic_id, batch)
+        if self.max_documents is not None and len(self._messages) > self.max_documents:
+            self._evict(len(self._messages) - self.max_documents * 9 // 10)
+        return added
+
+    def _index(self, customer_id: str, topic_id: str, messages: list[dict[str, Any]]) -> int:
+        scope = self._scope_codes.get((customer_id, topic_id))
+        if scope is None:
+            scope = self._scope_codes[customer_id, topic_id] = len(self._scopes)
+            self._scopes.append((customer_id, topic_id))
+        added = 0
+        for m in messages:
+            key = (customer_id, topic_id, str(m.get("guid") or m.get("perma_link") or m.get("text")))
+            if key in self._seen or not m.get("text"):
+                continue
+            self._seen.add(key)
+            tokens = tokenize(m["text"])
+            doc = len(self._messages)
+            self._messages.append(m)
+            self._keys.append(key)
+            self._lengths.append(len(tokens))
+            self._created.append(_epoch(m.get("created_time") or ""))
+            self._scope.append(scope)
+            self._network.append(self._value(str(m.get("network") or "").upper()))
+            self._language.append(self._value(str(m.get("language") or "").lower()))
+            positions: dict[str, list[int]] = {}
+            for i, token in enumerate(tokens):
+                positions.setdefault(token, []).append(i)
+            for token, where in positions.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = _Postings()
+                postings.add(doc, where)
+            self._total_length += len(tokens)
+            added += 1
+        return added
+
+    def _evict(self, count: int) -> None:
+        """Drop the `count` oldest documents and renumber the rest from zero."""
+        for term, p in list(self._postings.items()):
+            i = bisect_left(p.docs, count)
+            if i == len(p.docs):
+                del self._postings[term]
+                continue
+            start = p.offsets[i]
+            p.docs = array("I", (d - count for d in p.docs[i:]))
+            p.freqs = p.freqs[i:]
+            p.offsets = array("I", (o - start for o in p.offsets[i:]))
+            p.positions = p.positions[start:]
+        self._total_length -= sum(self._lengths[:count])
+        self._seen.difference_update(self._keys[:count])
+        for column in (self._messages, self._keys, self._lengths, self._created, self._scope, self._network,
+                       self._language):
+            del column[:count]
+
+    def search(
+        self,
+        query: str,
+        *,
+        customer_id: str,
+        topic_ids: set[str] | None = None,
+        networks: set[str] | None = None,
+        languages: set[str] | None = None,
+        start_time: str = "",
+        end_time: str = "",
+        limit: int = 20,
+    ) -> tuple[list[tuple[float, dict[str, Any]]], int]:
+        """Return the top `limit` (score, message) pairs and how many documents matched.
+
+        Indexes any queued pages first; blocking, so call it from a worker thread.
+        """
+        with self._lock:
+            self._flush()
+            return self._search(query, customer_id, topic_ids, networks, languages, start_time, end_time, limit)
+
+    def _search(
+        self,
+        query: str,
+        customer_id: str,
+        topic_ids: set[str] | None,
+        networks: set[str] | None,
+        languages: set[str] | None,
+        start_time: str,
+        end_time: str,
+        limit: int,
+    ) -> tuple[list[tuple[float, dict[str, Any]]], int]:
+        words: list[str] = []
+        phrases: list[list[_Postings | None]] = []
+        for phrase, word in _QUERY.findall(query):
+            terms = tokenize(phrase or word)
+            if phrase and len(terms) > 1:
+                phrases.append([self._postings.get(t) for t in terms])
+            words.extend(terms)
+        terms = [self._postings[w] for w in dict.fromkeys(words) if w in self._postings]
+        if not terms or any(None in p for p in phrases):
+            return [], 0
+
+        n = len(self._messages)
+        k1, b = self.k1, self.b
+        weights = [
+            (p, math.log(1 + (n - len(p.docs) + 0.5) / (len(p.docs) + 0.5)) * (k1 + 1)) for p in terms
+        ]
+        norm = (k1 * (1 - b), k1 * b * n / max(self._total_length, 1))
+        filters: _Filters = (
+            {
+                code for (cid, topic), code in self._scope_codes.items()
+                if cid == customer_id and (not topic_ids or topic in topic_ids)
+            },
+            {self._values.get(v, -1) for v in networks} if networks else None,
+            {self._values.get(v, -1) for v in languages} if languages else None,
+            _epoch(start_time) if start_time else None,
+            _epoch(end_time) if end_time else None,
+        )
+        engine = self._search_numpy if np is not None else self._search_python
+        top, matched = engine(weights, norm, phrases, filters, limit)  # type: ignore[arg-type]
+        return [
+            (score, self._messages[doc] | {"topic_id": self._scopes[self._scope[doc]][1]}) for score, doc in top
+        ], matched
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "documents": len(self._messages),
+            "pending": self._pending_count,
+            "max_documents": self.max_documents,
+            "terms": len(self._postings),
+            "engine": "numpy" if np is not None else "python",
+        }
+
+    # ----- pure Python -----
+
+    def _phrase_docs(self, lists: list[_Postings]) -> set[int]:
+        rarest = min(lists, key=lambda p: len(p.docs))
+        found = set()
+        for doc in rarest.docs:
+            hits = [p.find(doc) for p in lists]
+            if -1 in hits:
+                continue
+            following = [set(p.positions_at(i)) for p, i in zip(lists[1:], hits[1:])]
+            starts = lists[0].positions_at(hits[0])
+            if any(all(pos + k + 1 in s for k, s in enumerate(following)) for pos in starts):
+                found.add(doc)
+        return found
+
+    def _search_python(
+        self,
+        weights: list[tuple[_Postings, float]],
+        norm: tuple[float, float],
+        phrases: list[list[_Postings]],
+        filters: _Filters,
+        limit: int,
+    ) -> tuple[list[tuple[float, int]], int]:
+        # Phrases are required, so when there are any only their matches get scored.
+        required: set[int] | None = None
+        for lists in phrases:
+            found = self._phrase_docs(lists)
+            required = found if required is None else required & found
+        base, per_token = norm
+        lengths = self._lengths
+        scores: dict[int, float] = {}
+        get = scores.get
+        for postings, boost in weights:
+            if required is None:
+                pairs: Iterable[tuple[int, int]] = zip(postings.docs, postings.freqs)
+            else:
+                pairs = ((d, postings.freqs[i]) for d in required if (i := postings.find(d)) >= 0)
+            for doc, f in pairs:
+                scores[doc] = get(doc, 0.0) + boost * f / (f + base + per_token * lengths[doc])
+
+        scopes, networks, languages, start, end = filters
+        scope, network, language, created = self._scope, self._network, self._language, self._created
+        matched = [
+            (score, doc) for doc, score in scores.items()
+            if scope[doc] in scopes
+            and (networks is None or network[doc] in networks)
+            and (languages is None or language[doc] in languages)
+            and (start is None or created[doc] >= start)
+            and (end is None or created[doc] <= end)
+        ]
+        return heapq.nlargest(limit, matched, key=lambda t: (t[0], -t[1])), len(matched)
+
+    # ----- NumPy -----
+
+    @staticmethod
+    def _view(values: array, dtype: Any) -> Any:
+        """Zero-copy NumPy view of an array; callers must drop it before the array grows."""
+        return np.frombuffer(values, dtype=dtype) if len(values) else np.zeros(0, dtype=dtype)
+
+    def _phrase_mask(self, lists: list[_Postings], n: int) -> Any:
+        """Docs where the terms appear consecutively, matched as (doc << 32 | position) codes."""
+
+        def codes(p: _Postings) -> Any:
+            docs = np.repeat(self._view(p.docs, np.uint32).astype(np.int64), self._view(p.freqs, np.uint32))
+            return (docs << 32) | self._view(p.positions, np.uint32)
+
+        starts = codes(lists[0])
+        for k, p in enumerate(lists[1:], 1):
+            following = codes(p)  # sorted: docs ascend, and positions ascend within a doc
+            wanted = starts + k
+            i = np.searchsorted(following, wanted).clip(max=len(following) - 1)
+            starts = starts[following[i] == wanted]
+        mask = np.zeros(n, dtype=bool)
+        mask[starts >> 32] = True
+        return mask
+
+    def _search_numpy(
+        self,
+        weights: list[tuple[_Postings, float]],
+        norm: tuple[float, float],
+        phrases: list[list[_Postings]],
+        filters: _Filters,
+        limit: int,
+    ) -> tuple[list[tuple[float, int]], int]:
+        n = len(self._messages)
+        base, per_token = norm
+        lengths = self._view(self._lengths, np.uint32)
+        scores = np.zeros(n)
+        for postings, boost in weights:
+            docs = self._view(postings.docs, np.uint32)
+            f = self._view(postings.freqs, np.uint32).astype(np.float64)
+            scores[docs] += boost * f / (f + base + per_token * lengths[docs])
+        mask = scores > 0
+        for lists in phrases:
+            mask &= self._phrase_mask(lists, n)
+        scopes, networks, languages, start, end = filters
+        mask &= np.isin(self._view(self._scope, np.uint32), list(scopes))
+        if networks is not None:
+            mask &= np.isin(self._view(self._network, np.uint32), list(networks))
+        if languages is not None:
+            mask &= np.isin(self._view(self._language, np.uint32), list(languages))
+        created = self._view(self._created, np.int64)
+        if start is not None:
+            mask &= created >= start
+        if end is not None:
+            mask &= created <= end
+        candidates = np.flatnonzero(mask)
+        matched = len(candidates)
+        if matched > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+        ranked = sorted(((float(scores[d]), int(d)) for d in candidates), key=lambda t: (-t[0], t[1]))
+        return ranked, matched
@@ -1,23 +1,231 @@
+import argparse
+import asyncio
+import contextlib
+import functools
 import json
+import logging
 import os
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any
 
 import httpx
 from mcp.server.fastmcp import FastMCP
+from starlette.responses import JSONResponse
+
+from .aggregate import GROUP_BY, PostAggregator
+from .analytics import ProfileAnalyticsCache
+from .bulk import DEFAULT_LEDGER, MAX_POSTS as MAX_BULK_POSTS, PostLedger, submit_posts
+from .cache import PublishingCache, TTLCache
+from .client import SproutClient, begin_call, current_call
+from .export import DEFAULT_DIR as EXPORT_DIR, FORMATS as EXPORT_FORMATS, export
+from .metrics import Metrics
+from .output import dumps
+from .paging import MessageSummary, Paginator, collect, merge_desc, split_window
+from .results import PREVIEW_ROWS, ResultStore, fields_of, lookup, matches, parse_where, project, sort_rows
+from .search import SearchIndex
+from .timeseries import BASE_METRICS as TREND_METRICS, analyze as analyze_trends, require_numpy
+from .warehouse import DATASETS, DEFAULT_PATH, Warehouse, newest_records
+
+log = logging.getLogger(__name__)
 
-from .client import SproutClient
+_client: SproutClient | None = None
+_metrics = Metrics()
+_metadata_cache = TTLCache(max_stale=float(os.environ.get("SPROUT_METADATA_MAX_STALE") or 86400))
+_analytics_cache = ProfileAnalyticsCache(
+    settle_days=int(os.environ.get("SPROUT_ANALYTICS_SETTLE_DAYS") or 3),
+    batch_size=int(os.environ.get("SPROUT_ANALYTICS_BATCH_SIZE") or 50),
+    concurrency=int(os.environ.get("SPROUT_ANALYTICS_CONCURRENCY") or 4),
+    batch_window=float(os.environ.get("SPROUT_ANALYTICS_BATCH_WINDOW_MS") or 0) / 1000,
+    max_values=int(os.environ.get("SPROUT_ANALYTICS_CACHE_VALUES") or 500_000),
+)
+_publishing_cache = PublishingCache(
+    published_ttl=float(os.environ.get("SPROUT_POST_TTL_PUBLISHED") or 86400),
+    pending_ttl=float(os.environ.get("SPROUT_POST_TTL_PENDING") or 60),
+    missing_ttl=float(os.environ.get("SPROUT_POST_TTL_MISSING") or 300),
+    list_ttl=float(os.environ.get("SPROUT_POST_LIST_TTL") or 60),
+)
+_search_index = SearchIndex(max_documents=int(os.environ.get("SPROUT_SEARCH_MAX_DOCUMENTS") or 100_000))
+_search_loaded = False
+_search_seed_lock = threading.Lock()
+_results = ResultStore(max_bytes=int(os.environ.get("SPROUT_RESULT_STORE_BYTES") or 64 * 2**20))
+_result_handle_bytes = int(os.environ.get("SPROUT_RESULT_HANDLE_BYTES") or 100_000)
+
+
+def _dump_metrics(path: str) -> None:
+    try:
+        _metrics.write_prometheus(path)
+    except OSError:
+        log.warning("could not write metrics to %s", path, exc_info=True)
 
-mcp = FastMCP("sprout-social")
 
-_client: SproutClient | None = None
+async def _dump_metrics_periodically(path: str, interval: float) -> None:
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            _dump_metrics(path)
+    finally:
+        _dump_metrics(path)
+
+
+_users = 0
+_sessions = 0
+_dumper: asyncio.Task[None] | None = None
+_warehouse: Warehouse | None = None
+_post_ledger: PostLedger | None = None
+
+
+def _open_resources() -> None:
+    global _client, _dumper
+    if _client is None and os.environ.get("SPROUT_API_TOKEN"):
+        _client = SproutClient(metrics=_metrics)
+    metrics_file = os.environ.get("SPROUT_METRICS_FILE")
+    if metrics_file:
+        interval = float(os.environ.get("SPROUT_METRICS_INTERVAL") or 15)
+        _dumper = asyncio.create_task(_dump_metrics_periodically(metrics_file, interval))
+
+
+async def _close_resources() -> None:
+    global _client, _dumper, _warehouse
+    # Detach before awaiting so a session that starts meanwhile opens fresh resources.
+    client, dumper, warehouse = _client, _dumper, _warehouse
+    _client = _dumper = _warehouse = None
+    if warehouse is not None:
+        warehouse.close()
+    if dumper is not None:
+        dumper.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await dumper
+    await _metadata_cache.aclose()
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def _shared_resources() -> AsyncIterator[None]:
+    """Hold the shared client, caches and metrics dumper open while anyone is using them.
+
+    The first user opens them and the last one closes them, so every MCP
+    session in one process shares the same connection pool and caches.
+
+    If SPROUT_METRICS_FILE is set, a Prometheus text dump of server_stats is
+    written there every SPROUT_METRICS_INTERVAL seconds (default 15) and on close.
+    """
+    global _users
+    if _users == 0:
+        _open_resources()
+    _users += 1
+    try:
+        yield
+    finally:
+        _users -= 1
+        if _users == 0:
+            await _close_resources()
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Per-session lifespan: join the shared resources for as long as the session runs."""
+    global _sessions
+    async with _shared_resources():
+        _sessions += 1
+        try:
+            yield
+        finally:
+            _sessions -= 1
+
+
+mcp = FastMCP("sprout-social", lifespan=_lifespan)
+
+
+def _tool(**kwargs: Any) -> Callable[[Callable[..., Awaitable[str]]], Any]:
+    """Register an MCP tool that gets its own per-call stats (see _ok) and is timed in server_stats."""
+
+    def decorator(fn: Callable[..., Awaitable[str]]) -> Any:
+        name = kwargs.get("name") or fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kw: Any) -> str:
+            stats = begin_call(name)
+            started = time.perf_counter()
+            result = ""
+            cancelled = False
+            try:
+                result = await fn(*args, **kw)
+                return result
+            except asyncio.CancelledError:
+                # The client cancelled the call; the cancel has already reached
+                # every upstream request and pagination task the tool started.
+                cancelled = True
+                raise
+            finally:
+                _metrics.record_tool(
+                    name,
+                    time.perf_counter() - started,
+                    bytes_out=len(result.encode()),
+                    error=stats.error,
+                    serialize_seconds=stats.serialize_seconds,
+                    upstream_requests=stats.upstream_requests,
+                    retries=stats.retries,
+                    cancelled=cancelled,
+                )
+
+        return mcp.tool(**kwargs)(wrapper)
+
+    return decorator
 
 
 def _get_client() -> SproutClient:
     global _client
     if _client is None:
-        _client = SproutClient()
+        _client = SproutClient(metrics=_metrics)
     return _client
 
 
+def _get_warehouse() -> Warehouse:
+    global _warehouse
+    if _warehouse is None:
+        _warehouse = Warehouse(
+            os.environ.get("SPROUT_WAREHOUSE_PATH") or DEFAULT_PATH,
+            concurrency=int(os.environ.get("SPROUT_SYNC_CONCURRENCY") or 4),
+            on_page=_index_synced,
+        )
+    return _warehouse
+
+
+def _get_post_ledger() -> PostLedger:
+    global _post_ledger
+    if _post_ledger is None:
+        _post_ledger = PostLedger(os.path.expanduser(os.environ.get("SPROUT_POST_LEDGER") or DEFAULT_LEDGER))
+    return _post_ledger
+
+
+def _index_synced(customer_id: str, dataset: str, scope: str, rows: list[dict[str, Any]]) -> None:
+    if dataset == "listening":
+        _search_index.add(customer_id, scope, rows)
+
+
+def _get_search_index() -> SearchIndex:
+    """The listening search index, seeded once with the newest synced listening rows it can hold.
+
+    Blocking, so tools call it in a worker thread. Only a warehouse that
+    already exists is read; searching never creates one.
+    """
+    global _search_loaded
+    with _search_seed_lock:
+        if not _search_loaded:
+            _search_loaded = True
+            path = os.environ.get("SPROUT_WAREHOUSE_PATH") or DEFAULT_PATH
+            if _warehouse is not None:
+                path = _warehouse.path
+            for customer_id, topic_id, row in newest_records(path, "listening", _search_index.max_documents):
+                _search_index.add(customer_id, topic_id, (row,))
+    return _search_index
+
+
 def _cid(customer_id: str) -> str:
     result = customer_id or os.environ.get("SPROUT_CUSTOMER_ID", "")
     if not result:
@@ -27,6 +235,20 @@ def _cid(customer_id: str) -> str:
     return result
 
 
+def _metadata_ttl(name: str) -> float:
+    """TTL in seconds for a metadata endpoint: SPROUT_METADATA_TTL_<NAME>, then SPROUT_METADATA_TTL."""
+    value = os.environ.get(f"SPROUT_METADATA_TTL_{name.upper()}") or os.environ.get("SPROUT_METADATA_TTL")
+    return float(value or 3600)
+
+
+async def _metadata(name: str, path: str, customer_id: str = "") -> Any:
+    """Fetch a metadata endpoint through the stale-while-revalidate cache."""
+    client = _get_client()
+    return await _metadata_cache.get(
+        (customer_id, name), _metadata_ttl(name), lambda: client.get(path)
+    )
+
+
 def _split(s: str) -> list[str]:
     return [x.strip() for x in s.split(",") if x.strip()]
 
@@ -36,38 +258,96 @@ def _date(dt: str) -> str:
     return dt[:10]
 
 
+async def _profile_ids(profile_ids: str, group_id: str, customer_id: str) -> list[str]:
+    """Profile IDs listed explicitly plus every profile in group_id (from list_groups)."""
+    ids = _split(profile_ids)
+    if group_id:
+        groups = await _metadata("groups", f"/v1/{customer_id}/metadata/customer/groups", customer_id)
+        group = next((g for g in groups.get("data") or [] if str(g.get("group_id")) == group_id), None)
+        if group is None:
+            raise ValueError(f"unknown group_id {group_id}; see list_groups")
+        ids.extend(str(p) for p in group.get("customer_profile_ids") or [])
+    if not ids:
+        raise ValueError("pass profile_ids or group_id")
+    return list(dict.fromkeys(ids))
+
+
+def _meta() -> dict[str, Any]:
+    stats = current_call()
+    if stats is None:
+        return {"retries": 0}
+    return {"retries": stats.retries, **stats.notes}
+
+
+def _ok(data: Any, store: bool = True) -> str:
+    """Return a tool result as JSON, with per-call details under "_meta".
+
+    A result with a "data" list that serializes to more than
+    SPROUT_RESULT_HANDLE_BYTES is kept in the result store instead, and only
+    a handle, its fields and a few preview rows are returned.
+    """
+    if isinstance(data, dict):
+        data = {**data, "_meta": _meta()}
+    else:
+        data = {"data": data, "_meta": _meta()}
+    started = time.perf_counter()
+    text = dumps(data)
+    stats = current_call()
+    if store and _result_handle_bytes and len(text) > _result_handle_bytes and isinstance(data.get("data"), list):
+        rows = data["data"]
+        rest = {k: v for k, v in data.items() if k not in ("data", "_meta")}
+        handle = _results.put(stats.tool if stats is not None else "", rows, rest)
+        if handle is not None:
+            text = dumps({
+                "result_handle": handle,
+                "rows": len(rows),
+                "bytes": len(text.encode()),
+                "fields": fields_of(rows),
+                "preview": rows[:PREVIEW_ROWS],
+                "note": "Result too large to return whole; page it with read_result or filter it with query_result.",
+                **rest,
+                "_meta": data["_meta"],
+            })
+    if stats is not None:
+        stats.serialize_seconds += time.perf_counter() - started
+    return text
+
+
 def _err(e: Exception) -> str:
     """Return a structured JSON error string from an exception."""
+    if (stats := current_call()) is not None:
+        stats.error = True
     if isinstance(e, httpx.HTTPStatusError):
         try:
             detail = e.response.json()
         except Exception:
             detail = e.response.text
-        return json.dumps({
+        return dumps({
             "error": f"HTTP {e.response.status_code}",
             "url": str(e.request.url),
             "detail": detail,
-        }, indent=2)
-    return json.dumps({"error": type(e).__name__, "message": str(e)}, indent=2)
+            "_meta": _meta(),
+        })
+    return dumps({"error": type(e).__name__, "message": str(e), "_meta": _meta()})
 
 
 # ===== METADATA =====
 
 
-@mcp.tool()
+@_tool()
 async def list_customers() -> str:
     """List all customers/accounts accessible with the current API token.
 
     Returns customer IDs and names needed for other API calls.
     """
     try:
-        data = await _get_client().get("/v1/metadata/client")
-        return json.dumps(data, indent=2)
+        data = await _metadata("customers", "/v1/metadata/client")
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-@mcp.tool()
+@_tool()
 async def list_profiles(customer_id: str = "") -> str:
     """List all social profiles for a customer.
 
@@ -75,13 +355,14 @@ async def list_profiles(customer_id: str = "") -> str:
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
     """
     try:
-        data = await _get_client().get(f"/v1/{_cid(customer_id)}/metadata/customer")
-        return json.dumps(data, indent=2)
+        cid = _cid(customer_id)
+        data = await _metadata("profiles", f"/v1/{cid}/metadata/customer", cid)
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-@mcp.tool()
+@_tool()
 async def list_tags(customer_id: str = "") -> str:
     """List all message tags for a customer.
 
@@ -89,13 +370,14 @@ async def list_tags(customer_id: str = "") -> str:
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
     """
     try:
-        data = await _get_client().get(f"/v1/{_cid(customer_id)}/metadata/customer/tags")
-        return json.dumps(data, indent=2)
+        cid = _cid(customer_id)
+        data = await _metadata("tags", f"/v1/{cid}/metadata/customer/tags", cid)
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-@mcp.tool()
+@_tool()
 async def list_groups(customer_id: str = "") -> str:
     """List all profile groups for a customer.
 
@@ -103,13 +385,14 @@ async def list_groups(customer_id: str = "") -> str:
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
     """
     try:
-        data = await _get_client().get(f"/v1/{_cid(customer_id)}/metadata/customer/groups")
-        return json.dumps(data, indent=2)
+        cid = _cid(customer_id)
+        data = await _metadata("groups", f"/v1/{cid}/metadata/customer/groups", cid)
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-@mcp.tool()
+@_tool()
 async def list_users(customer_id: str = "") -> str:
     """List all active users for a customer.
 
@@ -117,13 +400,14 @@ async def list_users(customer_id: str = "") -> str:
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
     """
     try:
-        data = await _get_client().get(f"/v1/{_cid(customer_id)}/metadata/customer/users")
-        return json.dumps(data, indent=2)
+        cid = _cid(customer_id)
+        data = await _metadata("users", f"/v1/{cid}/metadata/customer/users", cid)
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-@mcp.tool()
+@_tool()
 async def list_teams(customer_id: str = "") -> str:
     """List all teams for a customer.
 
@@ -131,8 +415,9 @@ async def list_teams(customer_id: str = "") -> str:
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
     """
     try:
-        data = await _get_client().get(f"/v1/{_cid(customer_id)}/metadata/customer/teams")
-        return json.dumps(data, indent=2)
+        cid = _cid(customer_id)
+        data = await _metadata("teams", f"/v1/{cid}/metadata/customer/teams", cid)
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
@@ -140,11 +425,12 @@ async def list_teams(customer_id: str = "") -> str:
 # ===== ANALYTICS =====
 
 
-@mcp.tool()
+@_tool()
 async def get_profile_analytics(
-    profile_ids: str,
     start_time: str,
     end_time: str,
+    profile_ids: str = "",
+    group_id: str = "",
     metrics: str = "impressions,engagements,net_follower_growth",
     timezone: str = "UTC",
     customer_id: str = "",
@@ -152,40 +438,181 @@ async def get_profile_analytics(
     """Get analytics metrics aggregated by social profile.
 
     Args:
-        profile_ids: Comma-separated Sprout profile IDs.
         start_time: Start of period (ISO 8601, e.g. '2024-01-01T00:00:00').
         end_time: End of period (ISO 8601, e.g. '2024-01-31T23:59:59').
+        profile_ids: Comma-separated Sprout profile IDs; any number.
+        group_id: A profile group from list_groups; its profiles are added to profile_ids.
         metrics: Comma-separated metric names. Common options:
                  impressions, engagements, net_follower_growth, engagement_rate,
                  video_views, reactions, comments, shares, clicks.
         timezone: Timezone for the report (e.g. 'America/Chicago'). Default: UTC.
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+
+    Returns one row per profile per day. Days already fetched are served from
+    a local cache, so widening a range only requests the new days. Large
+    profile lists are fetched in concurrent batches; a batch that fails is
+    listed under "errors" and the rest are still returned. Concurrent calls
+    for the same period and metrics share upstream requests.
     """
     try:
-        ids = ",".join(_split(profile_ids))
-        start_date = _date(start_time)
-        end_date = _date(end_time)
-        body = {
-            "filters": [
-                f"customer_profile_id.eq({ids})",
-                f"reporting_period.in({start_date}...{end_date})",
-            ],
-            "metrics": _split(metrics),
-            "timezone": timezone,
-        }
-        data = await _get_client().post(f"/v1/{_cid(customer_id)}/analytics/profiles", body)
-        return json.dumps(data, indent=2)
+        cid = _cid(customer_id)
+        data = await _analytics_cache.get(
+            _get_client(),
+            cid,
+            await _profile_ids(profile_ids, group_id, cid),
+            _date(start_time),
+            _date(end_time),
+            _split(metrics),
+            timezone,
+        )
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-@mcp.tool()
+@_tool()
+async def get_profile_trends(
+    start_time: str,
+    end_time: str,
+    profile_ids: str = "",
+    group_id: str = "",
+    metrics: str = "impressions,engagements,net_follower_growth",
+    window: int = 7,
+    z_threshold: float = 3.0,
+    include_series: bool = False,
+    timezone: str = "UTC",
+    customer_id: str = "",
+) -> str:
+    """Get trends and anomalies for profiles' daily metrics, computed server-side.
+
+    Args:
+        start_time: Start of period (ISO 8601). Include at least 60 days for
+                    month-over-month deltas and anomaly baselines.
+        end_time: End of period (ISO 8601).
+        profile_ids: Comma-separated Sprout profile IDs; any number.
+        group_id: A profile group from list_groups; its profiles are added to profile_ids.
+        metrics: Comma-separated metric names. impressions, engagements and
+                 net_follower_growth are always included.
+        window: Rolling average window in days. Default: 7.
+        z_threshold: Flag days whose z-score against the previous 28 days
+                     reaches this magnitude. Default: 3.0.
+        include_series: Also return the daily rolling series (large).
+        timezone: Timezone for the report (e.g. 'America/Chicago'). Default: UTC.
+        customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+
+    Returns per profile: totals, latest rolling averages, week-over-week and
+    month-over-month change, engagement rate per impression, follower growth
+    velocity and trend, and the strongest anomalies. Daily rows come from the
+    same cache as get_profile_analytics. Requires the "timeseries" extra (NumPy).
+    """
+    try:
+        require_numpy()
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        cid = _cid(customer_id)
+        profiles = await _profile_ids(profile_ids, group_id, cid)
+        wanted = list(dict.fromkeys([*_split(metrics), *TREND_METRICS]))
+        first, last = date.fromisoformat(_date(start_time)), date.fromisoformat(_date(end_time))
+        data = await _analytics_cache.get(
+            _get_client(), cid, profiles, first.isoformat(), last.isoformat(), wanted, timezone
+        )
+        failed = {str(p) for e in data.get("errors", []) for p in e["profile_ids"]}
+        profiles = [p for p in profiles if p not in failed]
+        trends = await asyncio.to_thread(
+            analyze_trends,
+            data["data"],
+            profiles,
+            wanted,
+            first,
+            last,
+            window=window,
+            z_threshold=z_threshold,
+            include_series=include_series,
+        )
+        if "errors" in data:
+            trends["errors"] = data["errors"]
+        return _ok(trends)
+    except Exception as e:
+        return _err(e)
+
+
+async def _group_key(group_by: str, customer_id: str) -> Callable[[dict[str, Any]], str]:
+    if group_by == "profile":
+        return lambda post: str(post.get("customer_profile_id"))
+    if group_by == "day":
+        return lambda post: (post.get("created_time") or "")[:10]
+    if group_by == "network":
+        profiles = await _metadata("profiles", f"/v1/{customer_id}/metadata/customer", customer_id)
+        networks = {str(p.get("customer_profile_id")): p.get("network_type") for p in profiles.get("data") or []}
+        return lambda post: networks.get(str(post.get("customer_profile_id"))) or "unknown"
+    if group_by:
+        raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)} or empty")
+    return lambda post: "all"
+
+
+def _post_analytics_body(
+    profile_ids: list[str], start_time: str, end_time: str, metrics: list[str], limit: int
+) -> dict[str, Any]:
+    return {
+        "filters": [
+            f"customer_profile_id.eq({','.join(profile_ids)})",
+            f"created_time.in({start_time}..{end_time})",
+        ],
+        "fields": ["created_time", "text", "perma_link"],
+        "metrics": metrics,
+        "limit": limit,
+        "sort": ["created_time:desc"],
+    }
+
+
+async def _aggregate_posts(
+    customer_id: str, bodies: list[dict[str, Any]], metrics: list[str], group_by: str, top_n: int, max_items: int
+) -> dict[str, Any]:
+    """Page through every post matching any of bodies and keep only running aggregates.
+
+    Several bodies (e.g. one per profile chunk) are paged concurrently, at most
+    SPROUT_ANALYTICS_CONCURRENCY requests at a time, and merged newest first.
+    """
+    aggregator = PostAggregator(metrics, await _group_key(group_by, customer_id), top_n)
+    semaphore = asyncio.Semaphore(_analytics_cache.concurrency)
+    pagers = [
+        Paginator(_get_client(), f"/v1/{customer_id}/analytics/posts", body, cursor_field="page", semaphore=semaphore)
+        for body in bodies
+    ]
+    if len(pagers) == 1:
+        items = pagers[0].items()
+    else:
+        items = merge_desc([p.items() for p in pagers], key=lambda post: post.get("created_time") or "")
+    truncated = False
+    try:
+        async for post in items:
+            if aggregator.posts >= max_items:
+                truncated = True
+                break
+            aggregator.add(post)
+    finally:
+        for pager in pagers:
+            pager.cancel()
+        await items.aclose()
+    return {
+        "posts_scanned": aggregator.posts,
+        "group_by": group_by or None,
+        "groups": aggregator.to_dict(),
+        "paging": {"pages": sum(p.pages for p in pagers), "truncated": truncated},
+    }
+
+
+@_tool()
 async def get_post_analytics(
     profile_ids: str,
     start_time: str,
     end_time: str,
     metrics: str = "lifetime.impressions,lifetime.reactions,lifetime.engagements,lifetime.clicks",
     limit: int = 50,
+    aggregate: bool = False,
+    group_by: str = "",
+    top_n: int = 5,
+    max_items: int = 100000,
     customer_id: str = "",
 ) -> str:
     """Get analytics metrics for individual published posts.
@@ -198,28 +625,34 @@ async def get_post_analytics(
     Do NOT use get_messages with an OUTBOUND filter for post counts — that endpoint
     only supports inbound inbox messages.
 
+    For questions like "which post did best last quarter", set aggregate: every
+    post in the period is paged through on the server and only the results come
+    back — per metric the total, mean, min, max, p50/p90/p99 and the top_n and
+    bottom top_n posts, plus the post count — optionally per profile, network
+    or day.
+
     Args:
         profile_ids: Comma-separated Sprout profile IDs.
         start_time: Start of period (ISO 8601, e.g. '2024-01-01T00:00:00').
         end_time: End of period (ISO 8601, e.g. '2024-01-31T23:59:59').
         metrics: Comma-separated metric names with lifetime. prefix.
         limit: Number of posts to return (default 50, max 100).
+        aggregate: Return aggregates over all matching posts instead of a page of posts.
+        group_by: With aggregate: profile, network or day. Leave empty for one group.
+        top_n: With aggregate: best and worst posts listed per metric (default 5, 0 for none).
+        max_items: With aggregate: stop after scanning this many posts (default 100000).
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
     """
     try:
-        ids = ",".join(_split(profile_ids))
-        body = {
-            "filters": [
-                f"customer_profile_id.eq({ids})",
-                f"created_time.in({start_time}..{end_time})",
-            ],
-            "fields": ["created_time", "text", "perma_link"],
-            "metrics": _split(metrics),
-            "limit": limit,
-            "sort": ["created_time:desc"],
-        }
-        data = await _get_client().post(f"/v1/{_cid(customer_id)}/analytics/posts", body)
-        return json.dumps(data, indent=2)
+        cid = _cid(customer_id)
+        body = _post_analytics_body(_split(profile_ids), start_time, end_time, _split(metrics), limit)
+        if aggregate:
+            body["fields"] = ["created_time", "text", "perma_link", "customer_profile_id", "guid"]
+            body["limit"] = 100
+            data = await _aggregate_posts(cid, [body], _split(metrics), group_by, top_n, max_items)
+        else:
+            data = await _get_client().post(f"/v1/{cid}/analytics/posts", body)
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
@@ -227,7 +660,7 @@ async def get_post_analytics(
 # ===== LISTENING =====
 
 
-@mcp.tool()
+@_tool()
 async def list_listening_topics(customer_id: str = "") -> str:
     """List all Listening topics configured for a customer.
 
@@ -238,12 +671,86 @@ async def list_listening_topics(customer_id: str = "") -> str:
     """
     try:
         data = await _get_client().get(f"/v1/{_cid(customer_id)}/listening/topics")
-        return json.dumps(data, indent=2)
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-@mcp.tool()
+async def _pull(
+    path: str,
+    make_body: Callable[[str, str], dict[str, Any]],
+    start_time: str,
+    end_time: str,
+    *,
+    cursor_field: str,
+    shards: int,
+    max_items: int,
+    summarize: bool = False,
+    on_page: Callable[[list[dict[str, Any]]], None] | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> dict[str, Any]:
+    """Paginate a message endpoint server-side, optionally split into concurrent time shards.
+
+    Shards are merged back in created_time:desc order, so the result matches a
+    sequential pull of the whole window. semaphore bounds the page requests in
+    flight; by default each pull gets its own, sized SPROUT_SHARD_CONCURRENCY.
+    """
+    client = _get_client()
+    if shards <= 1:
+        windows = [(start_time, end_time)]
+    else:
+        windows = split_window(start_time, end_time, shards)
+    if semaphore is None:
+        semaphore = _shard_semaphore()
+    pagers = [
+        Paginator(client, path, make_body(a, b), cursor_field=cursor_field, semaphore=semaphore, on_page=on_page)
+        for a, b in windows
+    ]
+    if len(pagers) == 1:
+        items = pagers[0].items()
+    else:
+        items = merge_desc([p.items() for p in pagers], key=lambda m: m.get("created_time") or "")
+    try:
+        data, truncated = await collect(items, max_items, summarize)
+    finally:
+        # Generator cleanup awaits, and a cancelled MCP request may interrupt it;
+        # stop every prefetching shard synchronously so none keeps paging.
+        for pager in pagers:
+            pager.cancel()
+    data["paging"] = {
+        "pages": sum(p.pages for p in pagers),
+        "shards": len(pagers),
+        "truncated": truncated,
+    }
+    return data
+
+
+def _shard_semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(int(os.environ.get("SPROUT_SHARD_CONCURRENCY") or 4))
+
+
+def _check_paging(cursor: str, auto_paginate: bool, shards: int, summarize: bool = False) -> None:
+    """Reject option combinations a message tool would otherwise silently ignore."""
+    if not auto_paginate and (shards > 1 or summarize):
+        raise ValueError("shards and summarize need auto_paginate=True")
+    if cursor and shards > 1:
+        raise ValueError("a cursor continues one sequential pull; it cannot be combined with shards > 1")
+
+
+def _listening_body(start_time: str, end_time: str, networks: str, limit: int) -> dict[str, Any]:
+    filters = [f"created_time.in({start_time}..{end_time})"]
+    if networks:
+        for network in _split(networks):
+            filters.append(f"network.eq({network.upper()})")
+    return {
+        "filters": filters,
+        "fields": ["created_time", "text", "network", "perma_link", "language"],
+        "limit": limit,
+        "sort": ["created_time:desc"],
+    }
+
+
+@_tool()
 async def get_listening_messages(
     topic_id: str,
     start_time: str,
@@ -251,12 +758,23 @@ async def get_listening_messages(
     networks: str = "",
     limit: int = 100,
     cursor: str = "",
+    auto_paginate: bool = False,
+    max_items: int = 1000,
+    summarize: bool = False,
+    shards: int = 1,
     customer_id: str = "",
 ) -> str:
     """Fetch messages from a Sprout Social Listening topic.
 
     Use list_listening_topics first to get topic IDs.
 
+    By default one page is returned along with a cursor for the next page. Set
+    auto_paginate to follow cursors on the server and get every message up to
+    max_items in a single response, or add summarize to get counts by network,
+    language and day plus a small sample instead of the messages themselves.
+    For long, busy windows set shards > 1 to split the time range and page
+    through the pieces concurrently; results keep newest-first order.
+
     Args:
         topic_id: The listening topic ID (UUID).
         start_time: Start datetime (ISO 8601, e.g. '2024-01-01T00:00:00').
@@ -265,27 +783,101 @@ async def get_listening_messages(
                   FACEBOOK, INSTAGRAM, YOUTUBE, NEWS, BLOG. Leave empty for all.
         limit: Number of messages to return per page (default 100, max 100).
         cursor: Pagination cursor from a previous response (optional).
+        auto_paginate: Follow pagination cursors server-side (default False).
+        max_items: With auto_paginate, stop after this many messages (default 1000).
+        summarize: With auto_paginate, return a summary instead of the messages.
+        shards: With auto_paginate, split start_time..end_time into this many
+                windows fetched in parallel (default 1). Cannot be combined with cursor.
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
     """
     try:
-        filters = [f"created_time.in({start_time}..{end_time})"]
-        if networks:
-            for network in _split(networks):
-                filters.append(f"network.eq({network.upper()})")
+        _check_paging(cursor, auto_paginate, shards, summarize)
+
+        def make_body(start: str, end: str) -> dict[str, Any]:
+            body = _listening_body(start, end, networks, min(limit, 100) if auto_paginate else limit)
+            if cursor:
+                body["cursor"] = cursor
+            return body
+
+        cid = _cid(customer_id)
+        path = f"/v1/{cid}/listening/topics/{topic_id}/messages"
+
+        def index(messages: list[dict[str, Any]]) -> None:
+            _search_index.add(cid, topic_id, messages)
+
+        if not auto_paginate:
+            data = await _get_client().post(path, make_body(start_time, end_time))
+            index(data.get("data") or [])
+        else:
+            data = await _pull(
+                path,
+                make_body,
+                start_time,
+                end_time,
+                cursor_field="cursor",
+                shards=shards,
+                max_items=max_items,
+                summarize=summarize,
+                on_page=index,
+            )
+        return _ok(data)
+    except Exception as e:
+        return _err(e)
 
-        body: dict = {
-            "filters": filters,
-            "fields": ["created_time", "text", "network", "perma_link", "language"],
-            "limit": limit,
-            "sort": ["created_time:desc"],
-        }
-        if cursor:
-            body["cursor"] = cursor
 
-        data = await _get_client().post(
-            f"/v1/{_cid(customer_id)}/listening/topics/{topic_id}/messages", body
-        )
-        return json.dumps(data, indent=2)
+@_tool()
+async def search_listening_messages(
+    query: str,
+    topic_ids: str = "",
+    networks: str = "",
+    languages: str = "",
+    start_time: str = "",
+    end_time: str = "",
+    limit: int = 20,
+    customer_id: str = "",
+) -> str:
+    """Full-text search over listening messages this server has already fetched.
+
+    Searches a local BM25 index of the messages seen by get_listening_messages
+    or synced with sync_dataset(dataset="listening"), up to the most recent
+    SPROUT_SEARCH_MAX_DOCUMENTS; it never calls the API, so fetch or sync the
+    topic and period first. Words are ranked by relevance;
+    wrap words in double quotes to require the exact phrase,
+    e.g. '"product recall" refund'.
+
+    Args:
+        query: Search words and "quoted phrases".
+        topic_ids: Comma-separated topic IDs to search (default: all indexed).
+        networks: Comma-separated networks, e.g. REDDIT,TWITTER (default: all).
+        languages: Comma-separated language codes, e.g. en,es (default: all).
+        start_time: Only messages created at or after this time (ISO 8601).
+        end_time: Only messages created at or before this time (ISO 8601).
+        limit: Number of top results to return (default 20).
+        customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+    """
+    try:
+        def search() -> tuple[list[tuple[float, dict[str, Any]]], int, dict[str, Any]]:
+            index = _get_search_index()
+            results, matched = index.search(
+                query,
+                customer_id=cid,
+                topic_ids=set(_split(topic_ids)),
+                networks={n.upper() for n in _split(networks)},
+                languages={lang.lower() for lang in _split(languages)},
+                start_time=start_time,
+                end_time=end_time,
+                limit=limit,
+            )
+            return results, matched, index.stats()
+
+        cid = _cid(customer_id)
+        # Seeding and scoring are CPU-bound; keep them off the event loop other sessions share.
+        results, matched, stats = await asyncio.to_thread(search)
+        return _ok({
+            "data": [{"score": round(score, 3), **message} for score, message in results],
+            "matched": matched,
+            "index": stats,
+        })
     except Exception as e:
         return _err(e)
 
@@ -293,7 +885,19 @@ async def get_listening_messages(
 # ===== MESSAGES =====
 
 
-@mcp.tool()
+def _messages_body(profile_ids: str, start_time: str, end_time: str, tag_ids: str, limit: int) -> dict[str, Any]:
+    ids = ",".join(_split(profile_ids))
+    filters = [
+        f"customer_profile_id.eq({ids})",
+        f"created_time.in({start_time}..{end_time})",
+    ]
+    if tag_ids:
+        tag_list = ",".join(_split(tag_ids))
+        filters.append(f"tag_id.eq({tag_list})")
+    return {"filters": filters, "limit": limit}
+
+
+@_tool()
 async def get_messages(
     profile_ids: str,
     start_time: str,
@@ -301,6 +905,9 @@ async def get_messages(
     tag_ids: str = "",
     limit: int = 50,
     page_cursor: str = "",
+    auto_paginate: bool = False,
+    max_items: int = 1000,
+    shards: int = 1,
     customer_id: str = "",
 ) -> str:
     """Retrieve inbound inbox messages (Smart Inbox) with optional filtering.
@@ -309,6 +916,9 @@ async def get_messages(
     For published post counts and performance metrics, use get_post_analytics instead.
     For social listening data (Reddit, news, etc.), use get_listening_messages instead.
 
+    Set auto_paginate to follow page cursors on the server, and shards > 1 to
+    split a long window into pieces fetched in parallel (newest first).
+
     Args:
         profile_ids: Comma-separated Sprout profile IDs.
         start_time: Start datetime (ISO 8601, e.g. '2024-01-01T00:00:00').
@@ -316,24 +926,38 @@ async def get_messages(
         tag_ids: Comma-separated tag IDs to filter by (optional).
         limit: Number of messages to return (default 50).
         page_cursor: Pagination cursor from a previous response (optional).
+        auto_paginate: Follow pagination cursors server-side (default False).
+        max_items: With auto_paginate, stop after this many messages (default 1000).
+        shards: With auto_paginate, split start_time..end_time into this many
+                windows fetched in parallel (default 1). Cannot be combined with page_cursor.
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
     """
     try:
-        ids = ",".join(_split(profile_ids))
-        filters = [
-            f"customer_profile_id.eq({ids})",
-            f"created_time.in({start_time}..{end_time})",
-        ]
-        if tag_ids:
-            tag_list = ",".join(_split(tag_ids))
-            filters.append(f"tag_id.eq({tag_list})")
-
-        body: dict = {"filters": filters, "limit": limit}
-        if page_cursor:
-            body["page_cursor"] = page_cursor
-
-        data = await _get_client().post(f"/v1/{_cid(customer_id)}/messages", body)
-        return json.dumps(data, indent=2)
+        _check_paging(page_cursor, auto_paginate, shards)
+
+        def make_body(start: str, end: str) -> dict[str, Any]:
+            body = _messages_body(profile_ids, start, end, tag_ids, limit)
+            if auto_paginate:
+                # _pull merges shards newest-first; the inbox has no default order.
+                body["sort"] = ["created_time:desc"]
+            if page_cursor:
+                body["page_cursor"] = page_cursor
+            return body
+
+        path = f"/v1/{_cid(customer_id)}/messages"
+        if not auto_paginate:
+            data = await _get_client().post(path, make_body(start_time, end_time))
+        else:
+            data = await _pull(
+                path,
+                make_body,
+                start_time,
+                end_time,
+                cursor_field="page_cursor",
+                shards=shards,
+                max_items=max_items,
+            )
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
@@ -341,7 +965,7 @@ async def get_messages(
 # ===== PUBLISHING =====
 
 
-@mcp.tool()
+@_tool()
 async def list_publishing_posts(
     profile_ids: str,
     start_time: str,
@@ -359,8 +983,12 @@ async def list_publishing_posts(
         status: Filter by post status: PUBLISHED, SCHEDULED, DRAFT. Leave empty for all.
         limit: Number of posts to return (default 50).
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+
+    Results are cached briefly (SPROUT_POST_LIST_TTL); create_post drops
+    the cached lists for the profiles it posts to.
     """
     try:
+        cid = _cid(customer_id)
         ids = ",".join(_split(profile_ids))
         filters = [
             f"customer_profile_id.eq({ids})",
@@ -374,13 +1002,38 @@ async def list_publishing_posts(
             "limit": limit,
             "sort": ["created_time:desc"],
         }
-        data = await _get_client().post(f"/v1/{_cid(customer_id)}/publishing/posts", body)
-        return json.dumps(data, indent=2)
+        client = _get_client()
+        data = await _publishing_cache.get_list(
+            cid,
+            json.dumps(body, sort_keys=True),
+            _split(profile_ids),
+            lambda: client.post(f"/v1/{cid}/publishing/posts", body, idempotent=True),
+        )
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-@mcp.tool()
+def _post_body(profile_ids: list[str], text: str, scheduled_send_time: str = "") -> dict[str, Any]:
+    body: dict[str, Any] = {
+        "post_type": "OUTBOUND",
+        "profile_ids": profile_ids,
+        "fields": {"text": text},
+    }
+    if scheduled_send_time:
+        body["scheduled_send_time"] = scheduled_send_time
+    return body
+
+
+def _post_created(customer_id: str, body: dict[str, Any], data: Any) -> None:
+    """Write new posts through to the publishing cache and drop stale lists for their profiles."""
+    _publishing_cache.invalidate_lists(customer_id, body["profile_ids"])
+    for post in data.get("data") or []:
+        if isinstance(post, dict) and post.get("id") is not None:
+            _publishing_cache.put_post(customer_id, str(post["id"]), {**data, "data": [post]})
+
+
+@_tool()
 async def create_post(
     profile_ids: str,
     text: str,
@@ -396,21 +1049,16 @@ async def create_post(
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
     """
     try:
-        body: dict = {
-            "post_type": "OUTBOUND",
-            "profile_ids": _split(profile_ids),
-            "fields": {"text": text},
-        }
-        if scheduled_send_time:
-            body["scheduled_send_time"] = scheduled_send_time
-
-        data = await _get_client().post(f"/v1/{_cid(customer_id)}/publishing/posts", body)
-        return json.dumps(data, indent=2)
+        cid = _cid(customer_id)
+        body = _post_body(_split(profile_ids), text, scheduled_send_time)
+        data = await _get_client().post(f"/v1/{cid}/publishing/posts", body, idempotent=False)
+        _post_created(cid, body, data)
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-@mcp.tool()
+@_tool()
 async def get_publishing_post(
     post_id: str,
     customer_id: str = "",
@@ -420,16 +1068,721 @@ async def get_publishing_post(
     Args:
         post_id: The publishing post ID to retrieve.
         customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+
+    Posts are cached by status: published posts for a day, scheduled and
+    draft posts for a minute, and unknown IDs (404) for five minutes.
     """
     try:
-        data = await _get_client().get(f"/v1/{_cid(customer_id)}/publishing/posts/{post_id}")
-        return json.dumps(data, indent=2)
+        cid = _cid(customer_id)
+        client = _get_client()
+        data = await _publishing_cache.get_post(
+            cid, post_id, lambda: client.get(f"/v1/{cid}/publishing/posts/{post_id}")
+        )
+        return _ok(data)
     except Exception as e:
         return _err(e)
 
 
-def main() -> None:
-    mcp.run()
+@_tool()
+async def create_posts_bulk(
+    posts: list[dict[str, Any]],
+    retry_uncertain: bool = False,
+    customer_id: str = "",
+) -> str:
+    """Create many draft or scheduled posts in one call, each at most once.
+
+    Posts are submitted concurrently (SPROUT_BULK_CONCURRENCY at a time,
+    within the client rate limit). Each post is keyed by a hash of its
+    content, and every created post is recorded in a local ledger
+    (SPROUT_POST_LEDGER), so replaying the same list never posts twice:
+    posts already created come back as "already_created" with their IDs.
+
+    A request rejected before Sprout acted on it (HTTP 429, connection
+    refused) is retried. If the outcome is unknown (5xx, timeout, dropped
+    connection), the item is reported as "uncertain" and is NOT resent,
+    now or on replay. Check list_publishing_posts, then pass
+    retry_uncertain=True to send those items again.
+
+    Args:
+        posts: Up to 500 objects with profile_ids (list or comma-separated),
+               text and optionally scheduled_send_time (ISO 8601; omit for a draft).
+        retry_uncertain: Resend items whose earlier outcome was uncertain (default False).
+        customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+
+    Returns one result per input post, in order, with status created,
+    already_created, duplicate (repeats an earlier item), uncertain, failed,
+    invalid or in_progress (being sent by another call), plus counts by status.
+    """
+    try:
+        cid = _cid(customer_id)
+        if len(posts) > MAX_BULK_POSTS:
+            raise ValueError(f"at most {MAX_BULK_POSTS} posts per call; split the list")
+        results: list[dict[str, Any] | None] = [None] * len(posts)
+        bodies, positions = [], []
+        for i, spec in enumerate(posts):
+            ids = spec.get("profile_ids") if isinstance(spec, dict) else None
+            ids = _split(ids) if isinstance(ids, str) else [str(p) for p in ids or []]
+            text = spec.get("text") if isinstance(spec, dict) else None
+            if not ids or not isinstance(text, str) or not text:
+                results[i] = {"index": i, "status": "invalid", "error": "profile_ids and text are required"}
+                continue
+            bodies.append(_post_body(ids, text, str(spec.get("scheduled_send_time") or "")))
+            positions.append(i)
+        submitted = await submit_posts(
+            _get_client(),
+            cid,
+            bodies,
+            _get_post_ledger(),
+            concurrency=int(os.environ.get("SPROUT_BULK_CONCURRENCY") or 4),
+            retry_uncertain=retry_uncertain,
+            on_created=lambda body, data: _post_created(cid, body, data),
+        )
+        for i, result in zip(positions, submitted):
+            result["index"] = i
+            if "duplicate_of" in result:
+                result["duplicate_of"] = positions[result["duplicate_of"]]
+            results[i] = result
+        counts: dict[str, int] = {}
+        for r in results:
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+        if (stats := current_call()) is not None:
+            stats.notes["statuses"] = counts
+        return _ok({"data": results, "summary": counts})
+    except Exception as e:
+        return _err(e)
+
+
+# ===== DASHBOARD =====
+
+DASHBOARD_SECTIONS = ("profiles", "analytics", "posts", "inbox", "publishing")
+
+
+def _analytics_totals(rows: list[dict[str, Any]], metrics: list[str]) -> dict[str, Any]:
+    """Per-profile and overall metric totals from daily profile analytics rows."""
+    per_profile: dict[str, dict[str, float]] = {}
+    for row in rows:
+        totals = per_profile.setdefault(str(row["dimensions"]["customer_profile_id"]), dict.fromkeys(metrics, 0))
+        for m, v in (row.get("metrics") or {}).items():
+            if isinstance(v, (int, float)):
+                totals[m] += v
+    overall = {m: sum(t[m] for t in per_profile.values()) for m in metrics}
+    for totals in (*per_profile.values(), overall):
+        impressions = totals.get("impressions")
+        totals["engagement_rate"] = round(totals["engagements"] / impressions, 5) if impressions else None
+    return {"total": overall, "by_profile": per_profile}
+
+
+def _profile_chunks(profiles: list[str]) -> list[list[str]]:
+    """Split profiles into SPROUT_ANALYTICS_BATCH_SIZE chunks, one customer_profile_id filter each."""
+    size = max(1, _analytics_cache.batch_size)
+    return [profiles[i:i + size] for i in range(0, len(profiles), size)] or [profiles]
+
+
+async def _dashboard_section(
+    name: str, cid: str, profiles: list[str], start_time: str, end_time: str, top_n: int, max_items: int
+) -> dict[str, Any]:
+    client = _get_client()
+    # Large orgs time out on one filter naming every profile, so the posts,
+    # inbox and publishing sections page each chunk of profiles separately.
+    chunks = _profile_chunks(profiles)
+    if name == "profiles":
+        data = await _metadata("profiles", f"/v1/{cid}/metadata/customer", cid)
+        wanted = set(profiles)
+        return {
+            str(p["customer_profile_id"]): {"name": p.get("name"), "network": p.get("network_type")}
+            for p in data.get("data") or []
+            if str(p.get("customer_profile_id")) in wanted
+        }
+    if name == "analytics":
+        metrics = ["impressions", "engagements", "net_follower_growth"]
+        data = await _analytics_cache.get(
+            client, cid, profiles, _date(start_time), _date(end_time), metrics, "UTC"
+        )
+        return _analytics_totals(data["data"], metrics) | ({"errors": data["errors"]} if "errors" in data else {})
+    if name == "posts":
+        metrics = ["lifetime.impressions", "lifetime.engagements"]
+        bodies = [_post_analytics_body(chunk, start_time, end_time, metrics, 100) for chunk in chunks]
+        for body in bodies:
+            body["fields"] = ["created_time", "text", "perma_link", "customer_profile_id", "guid"]
+        data = await _aggregate_posts(cid, bodies, metrics, "", top_n, max_items)
+        group = data["groups"].get("all") or {"posts": 0, "metrics": {}}
+        return {
+            "posts": group["posts"],
+            "metrics": group["metrics"],
+            "truncated": data["paging"]["truncated"],
+        }
+    if name == "inbox":
+        # Order does not matter for a summary, so each time shard of each chunk
+        # is drained concurrently instead of merged newest-first as get_messages
+        # does; max_items caps the messages counted across all of them.
+        windows = split_window(start_time, end_time, 4)
+        semaphore = _shard_semaphore()
+        summary = MessageSummary(sample_size=top_n)
+
+        async def summarize_pull(chunk: list[str], start: str, end: str) -> bool:
+            """Add one chunk's messages in one window to the summary; returns whether every page was read."""
+            body = _messages_body(",".join(chunk), start, end, "", 100)
+            pager = Paginator(client, f"/v1/{cid}/messages", body, cursor_field="page_cursor", semaphore=semaphore)
+            items = pager.items()
+            try:
+                async for message in items:
+                    if summary.total >= max_items:
+                        return False
+                    summary.add(message)
+            finally:
+                pager.cancel()
+                await items.aclose()
+            return pager.exhausted
+
+        exhausted = await asyncio.gather(*(summarize_pull(chunk, a, b) for chunk in chunks for a, b in windows))
+        return summary.to_dict() | {"truncated": not all(exhausted)}
+    # publishing
+    by_status: dict[str, int] = {}
+    count = 0
+    semaphore = asyncio.Semaphore(_analytics_cache.concurrency)
+
+    async def count_chunk(chunk: list[str]) -> bool:
+        """Count one chunk's posts by status; returns whether every page was read."""
+        nonlocal count
+        body = {
+            "filters": [
+                f"customer_profile_id.eq({','.join(chunk)})",
+                f"created_time.in({start_time}..{end_time})",
+            ],
+            "limit": 100,
+            "sort": ["created_time:desc"],
+        }
+        pager = Paginator(client, f"/v1/{cid}/publishing/posts", body, cursor_field="page", semaphore=semaphore)
+        items = pager.items()
+        try:
+            async for post in items:
+                if count >= max_items:
+                    break
+                count += 1
+                status = post.get("status") or "UNKNOWN"
+                by_status[status] = by_status.get(status, 0) + 1
+        finally:
+            pager.cancel()
+            await items.aclose()
+        return pager.exhausted
+
+    exhausted = await asyncio.gather(*(count_chunk(chunk) for chunk in chunks))
+    return {"posts": count, "by_status": by_status, "truncated": not all(exhausted)}
+
+
+@_tool()
+async def get_dashboard(
+    start_time: str,
+    end_time: str,
+    profile_ids: str = "",
+    group_id: str = "",
+    sections: str = ",".join(DASHBOARD_SECTIONS),
+    top_n: int = 3,
+    max_items: int = 10000,
+    customer_id: str = "",
+) -> str:
+    """Get a one-call performance overview for a period: use this for "how did we do" questions.
+
+    Fetches every section at once instead of one tool call each, and returns
+    summaries rather than raw rows:
+      profiles: name and network of each profile.
+      analytics: impressions, engagements, net follower growth and engagement
+                 rate, in total and per profile (as get_profile_analytics).
+      posts: post count and per-metric totals, percentiles and top/bottom
+             top_n posts (as get_post_analytics with aggregate).
+      inbox: inbound message counts by network, language and day, with a
+             top_n sample (as get_messages with summarize).
+      publishing: post counts by status (as list_publishing_posts).
+    A section that fails reports its error; the others are still returned.
+
+    Args:
+        start_time: Start of period (ISO 8601, e.g. '2024-01-01T00:00:00').
+        end_time: End of period (ISO 8601, e.g. '2024-01-07T23:59:59').
+        profile_ids: Comma-separated Sprout profile IDs. Default: every profile.
+        group_id: A profile group from list_groups; its profiles are added to profile_ids.
+        sections: Comma-separated sections to include (default: all).
+        top_n: Posts and messages listed per section (default 3).
+        max_items: Stop counting posts or messages in a section after this many (default 10000).
+        customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+    """
+    try:
+        cid = _cid(customer_id)
+        names = _split(sections)
+        if unknown := set(names) - set(DASHBOARD_SECTIONS):
+            raise ValueError(
+                f"unknown sections {', '.join(sorted(unknown))}; choose from {', '.join(DASHBOARD_SECTIONS)}"
+            )
+        if profile_ids or group_id:
+            profiles = await _profile_ids(profile_ids, group_id, cid)
+        else:
+            data = await _metadata("profiles", f"/v1/{cid}/metadata/customer", cid)
+            profiles = [str(p["customer_profile_id"]) for p in data.get("data") or []]
+        results = await asyncio.gather(
+            *(_dashboard_section(n, cid, profiles, start_time, end_time, top_n, max_items) for n in names),
+            return_exceptions=True,
+        )
+        dashboard: dict[str, Any] = {"start_time": start_time, "end_time": end_time, "profile_count": len(profiles)}
+        for name, result in zip(names, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, httpx.HTTPStatusError):
+                dashboard[name] = {"error": f"HTTP {result.response.status_code}", "url": str(result.request.url)}
+            elif isinstance(result, BaseException):
+                dashboard[name] = {"error": type(result).__name__, "message": str(result)}
+            else:
+                dashboard[name] = result
+        return _ok(dashboard)
+    except Exception as e:
+        return _err(e)
+
+
+# ===== LOCAL WAREHOUSE =====
+
+
+def _dataset(name: str) -> str:
+    if name not in DATASETS:
+        raise ValueError(f"dataset must be one of {', '.join(DATASETS)}")
+    return name
+
+
+@_tool()
+async def sync_dataset(
+    dataset: str,
+    ids: str,
+    start_time: str,
+    end_time: str,
+    resync: bool = False,
+    customer_id: str = "",
+) -> str:
+    """Copy Sprout data into the local warehouse, fetching only what is not stored yet.
+
+    Each profile (or topic) remembers the window it has synced and the newest
+    created_time seen, so repeat syncs only pull the new delta plus any older
+    backfill. An interrupted sync resumes from its last stored page.
+
+    Args:
+        dataset: post_analytics, messages or publishing_posts (ids are profile
+                 IDs), or listening (ids are listening topic IDs).
+        ids: Comma-separated profile or topic IDs.
+        start_time: Start datetime (ISO 8601, e.g. '2024-01-01T00:00:00').
+        end_time: End datetime (ISO 8601). Times after now are synced later.
+        resync: Refetch the whole window, e.g. to refresh post metrics (default False).
+        customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+    """
+    try:
+        report = await _get_warehouse().sync(
+            _get_client(), _dataset(dataset), _cid(customer_id), _split(ids), start_time, end_time, resync=resync
+        )
+        return _ok({"synced": report})
+    except Exception as e:
+        return _err(e)
+
+
+@_tool()
+async def query_synced(
+    dataset: str,
+    ids: str,
+    start_time: str,
+    end_time: str,
+    text_contains: str = "",
+    limit: int = 100,
+    offset: int = 0,
+    refresh: bool = True,
+    customer_id: str = "",
+) -> str:
+    """Answer from the local warehouse instead of re-reading history from Sprout.
+
+    With refresh (the default) the new delta is synced first, so only rows
+    created since the last sync are fetched from the API. Results are newest
+    first; "coverage" shows the synced window per ID and whether it spans the
+    requested one.
+
+    Args:
+        dataset: post_analytics, messages, publishing_posts or listening.
+        ids: Comma-separated profile IDs, or topic IDs for listening.
+        start_time: Start datetime (ISO 8601).
+        end_time: End datetime (ISO 8601).
+        text_contains: Only rows whose text contains this (case-insensitive).
+        limit: Rows to return (default 100).
+        offset: Rows to skip, for paging through a large result.
+        refresh: Sync the delta before querying (default True).
+        customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+    """
+    try:
+        cid, scopes = _cid(customer_id), _split(ids)
+        warehouse = _get_warehouse()
+        if refresh:
+            await warehouse.sync(_get_client(), _dataset(dataset), cid, scopes, start_time, end_time)
+        data = await asyncio.to_thread(
+            warehouse.query, _dataset(dataset), cid, scopes, start_time, end_time,
+            text_contains=text_contains, limit=limit, offset=offset,
+        )
+        return _ok(data)
+    except Exception as e:
+        return _err(e)
+
+
+# ===== EXPORT =====
+
+
+@_tool()
+async def export_dataset(
+    dataset: str,
+    ids: str,
+    start_time: str,
+    end_time: str,
+    format: str = "jsonl",
+    compress: bool = False,
+    filename: str = "",
+    customer_id: str = "",
+) -> str:
+    """Write every row of a dataset for a period to a local file, for offline analysis.
+
+    Pages are streamed straight to disk, so any volume works in constant
+    memory, and only the file's path, row count and size come back. Progress
+    is checkpointed after every page: if an export is interrupted, call it
+    again with the same arguments to continue where it stopped.
+
+    Args:
+        dataset: post_analytics, messages, publishing_posts or listening.
+        ids: Comma-separated profile IDs, or topic IDs for listening.
+        start_time: Start datetime (ISO 8601).
+        end_time: End datetime (ISO 8601).
+        format: jsonl (one JSON object per line) or csv (nested fields as dotted columns;
+                the header holds every field seen on any page, and rows leave the
+                ones they lack empty).
+        compress: Gzip the file (default False).
+        filename: File name inside SPROUT_EXPORT_DIR. Default: built from the arguments.
+        customer_id: Sprout customer ID. Defaults to SPROUT_CUSTOMER_ID env var.
+    """
+    try:
+        cid = _cid(customer_id)
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        name = filename or (
+            f"{_dataset(dataset)}-{cid}-{_date(start_time)}-{_date(end_time)}.{format}{'.gz' if compress else ''}"
+        )
+        if os.path.basename(name) != name or name.startswith("."):
+            raise ValueError("filename must be a plain file name, without directories")
+        directory = os.path.expanduser(os.environ.get("SPROUT_EXPORT_DIR") or EXPORT_DIR)
+        data = await export(
+            _get_client(), _dataset(dataset), cid, _split(ids), start_time, end_time,
+            os.path.join(directory, name), format, compress,
+        )
+        return _ok(data)
+    except Exception as e:
+        return _err(e)
+
+
+# ===== STORED RESULTS =====
+
+MAX_READ_ROWS = 1000
+
+
+def _read_limit(limit: int) -> int:
+    if not 1 <= limit <= MAX_READ_ROWS:
+        raise ValueError(f"limit must be between 1 and {MAX_READ_ROWS}")
+    return limit
+
+
+@_tool()
+async def read_result(handle: str, offset: int = 0, limit: int = 100, fields: str = "") -> str:
+    """Read rows of a stored result, returned as a result_handle by a tool whose output was too large.
+
+    Args:
+        handle: The result_handle from the original tool response.
+        offset: Index of the first row to return (default 0).
+        limit: Number of rows to return (default 100, max 1000).
+        fields: Comma-separated dotted paths to keep from each row, e.g.
+                'created_time,metrics.lifetime.impressions'. Default: whole rows.
+    """
+    try:
+        stored = _results.get(handle)
+        rows = stored.rows(offset, offset + _read_limit(limit))
+        wanted = _split(fields)
+        return _ok({
+            "result_handle": handle,
+            "tool": stored.tool,
+            "rows": len(stored),
+            "offset": offset,
+            "next_offset": offset + len(rows) if offset + len(rows) < len(stored) else None,
+            "data": [project(r, wanted) for r in rows],
+            **stored.rest,
+        }, store=False)
+    except Exception as e:
+        return _err(e)
+
+
+@_tool()
+async def query_result(
+    handle: str,
+    where: str = "",
+    sort_by: str = "",
+    descending: bool = True,
+    fields: str = "",
+    count_by: str = "",
+    offset: int = 0,
+    limit: int = 100,
+) -> str:
+    """Filter, sort, project or count the rows of a stored result without fetching it again.
+
+    Args:
+        handle: The result_handle from the original tool response.
+        where: Conditions on dotted paths separated by ';', all of which must hold.
+               Operators: = != > >= < <= and ~ (contains, case-insensitive), e.g.
+               'network=TWITTER; metrics.lifetime.impressions>1000; text~refund'.
+        sort_by: Dotted path to sort matching rows by (rows without it go last).
+        descending: Sort largest first (default True).
+        fields: Comma-separated dotted paths to keep from each row. Default: whole rows.
+        count_by: Dotted path to count matching rows by value, e.g. 'network'.
+        offset: Index of the first matching row to return (default 0).
+        limit: Number of matching rows to return (default 100, max 1000).
+    """
+    try:
+        stored = _results.get(handle)
+        conditions = parse_where(where)
+        rows = stored.rows()
+        if conditions:
+            rows = [r for r in rows if matches(r, conditions)]
+        if sort_by:
+            rows = sort_rows(rows, sort_by, descending)
+        page = rows[offset:offset + _read_limit(limit)]
+        wanted = _split(fields)
+        result: dict[str, Any] = {
+            "result_handle": handle,
+            "tool": stored.tool,
+            "rows": len(stored),
+            "matched": len(rows),
+            "offset": offset,
+            "next_offset": offset + len(page) if offset + len(page) < len(rows) else None,
+        }
+        if count_by:
+            counts: dict[str, int] = {}
+            for r in rows:
+                key = str(lookup(r, count_by))
+                counts[key] = counts.get(key, 0) + 1
+            result["counts"] = dict(sorted(counts.items(), key=lambda kv: -kv[1]))
+        result["data"] = [project(r, wanted) for r in page]
+        return _ok(result, store=False)
+    except Exception as e:
+        return _err(e)
+
+
+# ===== DIAGNOSTICS =====
+
+
+@_tool()
+async def get_client_diagnostics() -> str:
+    """Show the state of the shared Sprout API client.
+
+    Reports the remaining client-side rate-limit budget (permits available,
+    refill rate, calls currently queued), connection settings, request
+    coalescing counters and metadata cache hit rates. Use this before a large
+    batch of calls to check how much budget is left.
+    """
+    try:
+        warehouse = await asyncio.to_thread(_warehouse.stats) if _warehouse is not None else None
+        return _ok({
+            **_get_client().diagnostics(),
+            "metadata_cache": _metadata_cache.stats(),
+            "analytics_cache": _analytics_cache.stats(),
+            "warehouse": warehouse,
+            "result_store": _results.stats(),
+            "publishing_cache": _publishing_cache.stats(),
+            "post_ledger": _get_post_ledger().stats(),
+        })
+    except Exception as e:
+        return _err(e)
+
+
+@_tool()
+async def server_stats(reset: bool = False) -> str:
+    """Show where time goes inside this server.
+
+    Per tool: call and error counts, latency (mean/p50/p95/p99), time spent
+    serializing output, bytes returned and upstream requests per call.
+    Per upstream endpoint: request count, network latency, JSON decode time,
+    bytes in and out, status codes and retries.
+
+    Args:
+        reset: Clear all counters after reading them (default False).
+    """
+    try:
+        snapshot = _metrics.snapshot()
+        if reset:
+            _metrics.reset()
+        return _ok(snapshot)
+    except Exception as e:
+        return _err(e)
+
+
+class _SessionLimit:
+    """ASGI middleware that turns away new streamable HTTP sessions beyond a limit.
+
+    Only used with MCP SDKs whose session manager has no max_sessions or
+    session_idle_timeout of its own; see _http_app. A request without an
+    mcp-session-id header starts a session; it is counted as pending until
+    its response starts and names the new session. Those SDKs never expire a
+    session its client abandons without a DELETE, so a session with no
+    request in flight for idle_timeout seconds is terminated here before a
+    new one is admitted; otherwise abandoned sessions would hold their slots
+    until a restart.
+    """
+
+    def __init__(self, app: Any, max_sessions: int, manager: Any, idle_timeout: float = 1800.0) -> None:
+        self.app = app
+        self.max_sessions = max_sessions
+        self.manager = manager
+        self.idle_timeout = idle_timeout
+        self._pending = 0
+        self._last_seen: dict[str, float] = {}
+        self._active: dict[str, int] = {}
+        self.reaped = 0
+
+    def _transports(self) -> dict[str, Any] | None:
+        # The SDK keeps no public registry of its sessions; older releases keep this private one.
+        return getattr(self.manager, "_server_instances", None)
+
+    async def reap(self) -> int:
+        """Forget sessions that ended and terminate the ones idle past idle_timeout."""
+        transports = self._transports()
+        if transports is None:
+            return 0  # cannot see the SDK's sessions: the limit still holds, but nothing is reaped
+        now = time.monotonic()
+        reaped = 0
+        for sid, seen in list(self._last_seen.items()):
+            transport = transports.get(sid)
+            if transport is None or transport.is_terminated:
+                del self._last_seen[sid]
+                continue
+            terminate = getattr(transport, "terminate", None)
+            if terminate is not None and not self._active.get(sid) and now - seen >= self.idle_timeout:
+                log.info("terminating MCP session %s after %.0fs idle", sid, now - seen)
+                del self._last_seen[sid]
+                transports.pop(sid, None)
+                await terminate()
+                reaped += 1
+        self.reaped += reaped
+        return reaped
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        sid = next((v.decode() for k, v in scope["headers"] if k == b"mcp-session-id"), None)
+        if sid is not None:
+            await self._track(sid, scope, receive, send)
+            return
+        if scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        await self.reap()
+        if len(self._last_seen) + self._pending >= self.max_sessions:
+            response = JSONResponse(
+                {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {"code": -32000, "message": f"Session limit reached ({self.max_sessions}); retry later."},
+                },
+                status_code=503,
+                headers={"Retry-After": "5"},
+            )
+            await response(scope, receive, send)
+            return
+        self._pending += 1
+        released = False
+
+        async def send_and_release(message: Any) -> None:
+            nonlocal released
+            if message["type"] == "http.response.start" and not released:
+                released = True
+                self._pending -= 1
+                for k, v in message.get("headers") or []:
+                    if k.lower() == b"mcp-session-id":
+                        self._last_seen[v.decode()] = time.monotonic()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            if not released:
+                self._pending -= 1
+
+    async def _track(self, sid: str, scope: Any, receive: Any, send: Any) -> None:
+        """Pass a request for an existing session through, noting that the session is in use."""
+        known = sid in self._last_seen
+        if known:
+            self._active[sid] = self._active.get(sid, 0) + 1
+            self._last_seen[sid] = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if known:
+                self._active[sid] -= 1
+                if not self._active[sid]:
+                    del self._active[sid]
+                if sid in self._last_seen:
+                    self._last_seen[sid] = time.monotonic()
+
+
+def _http_app(server: FastMCP, max_sessions: int, idle_timeout: float) -> Any:
+    """The streamable HTTP app, limited to max_sessions sessions that expire after idle_timeout seconds idle.
+
+    MCP SDKs that support it enforce both in the session manager; older ones
+    get the _SessionLimit middleware instead.
+    """
+    native = hasattr(server.settings, "max_sessions") and hasattr(server.settings, "session_idle_timeout")
+    if native:
+        server.settings.max_sessions = max_sessions
+        server.settings.session_idle_timeout = idle_timeout
+    app = server.streamable_http_app()
+    if not native:
+        app.add_middleware(
+            _SessionLimit, max_sessions=max_sessions, manager=server.session_manager, idle_timeout=idle_timeout
+        )
+    return app
+
+
+async def _serve_http(host: str, port: int, max_sessions: int, idle_timeout: float = 1800.0) -> None:
+    import uvicorn
+
+    mcp.settings.host, mcp.settings.port = host, port
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        # Same as FastMCP(host=...) for a non-loopback bind: no localhost-only Host check.
+        mcp.settings.transport_security = None
+    app = _http_app(mcp, max_sessions, idle_timeout)
+    config = uvicorn.Config(app, host=host, port=port, log_level=mcp.settings.log_level.lower())
+    async with _shared_resources():
+        await uvicorn.Server(config).serve()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="sprout-mcp", description="MCP server for the Sprout Social API.")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http"],
+        default=os.environ.get("SPROUT_MCP_TRANSPORT") or "stdio",
+        help="stdio (default) serves one client; streamable-http serves many from one process",
+    )
+    parser.add_argument("--host", default=os.environ.get("SPROUT_MCP_HOST") or "127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SPROUT_MCP_PORT") or 8000))
+    parser.add_argument(
+        "--max-sessions",
+        type=int,
+        default=int(os.environ.get("SPROUT_MAX_SESSIONS") or 32),
+        help="concurrent MCP sessions allowed over HTTP (default 32)",
+    )
+    parser.add_argument(
+        "--session-idle-timeout",
+        type=float,
+        default=float(os.environ.get("SPROUT_SESSION_IDLE_TIMEOUT") or 1800),
+        help="seconds without a request before an HTTP session is closed (default 1800)",
+    )
+    args = parser.parse_args(argv)
+    if args.transport == "stdio":
+        mcp.run()
+    else:
+        asyncio.run(_serve_http(args.host, args.port, args.max_sessions, args.session_idle_timeout))
 
 
 if __name__ == "__main__":
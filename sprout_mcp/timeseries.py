@@ -0,0 +1,211 @@
+from datetime import date, timedelta
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # optional, see the "timeseries" extra
+    np = None
+
+from .analytics import DAY_KEY
+
+# Always fetched alongside the requested metrics, for the derived ones.
+BASE_METRICS = ("impressions", "engagements", "net_follower_growth")
+
+MIN_BASELINE = 7  # days of history before a day can be flagged as an anomaly
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("profile trends need NumPy: install sprout-mcp[timeseries]")
+
+
+def build_matrix(
+    rows: list[dict[str, Any]], profile_ids: list[str], metrics: list[str], first: date, last: date
+) -> dict[str, Any]:
+    """Lay daily analytics rows out as one profiles x days float array per metric (NaN = no data)."""
+    days = (last - first).days + 1
+    profile_index = {p: i for i, p in enumerate(profile_ids)}
+    matrices = {m: np.full((len(profile_ids), days), np.nan) for m in metrics}
+    for row in rows:
+        dims = row.get("dimensions") or {}
+        p = profile_index.get(str(dims.get("customer_profile_id")))
+        d = (date.fromisoformat(dims[DAY_KEY]) - first).days
+        if p is None or not 0 <= d < days:
+            continue
+        values = row.get("metrics") or {}
+        for m in metrics:
+            v = values.get(m)
+            if v is not None:
+                matrices[m][p, d] = v
+    return matrices
+
+
+def _cumulative(x: Any) -> tuple[Any, Any, Any]:
+    """Cumulative sums of values, squares and observation counts, with a leading zero column."""
+    valid = ~np.isnan(x)
+    v = np.where(valid, x, 0.0)
+    pad = ((0, 0), (1, 0))
+    return (
+        np.pad(np.cumsum(v, axis=1), pad),
+        np.pad(np.cumsum(v * v, axis=1), pad),
+        np.pad(np.cumsum(valid, axis=1), pad),
+    )
+
+
+def rolling_sum(x: Any, window: int) -> tuple[Any, Any]:
+    """Trailing window sums ending on each day (inclusive), and how many days had data."""
+    s, _, n = _cumulative(x)
+    hi = np.arange(1, x.shape[1] + 1)
+    lo = np.clip(hi - window, 0, None)
+    return s[:, hi] - s[:, lo], n[:, hi] - n[:, lo]
+
+
+def rolling_mean(x: Any, window: int) -> Any:
+    sums, counts = rolling_sum(x, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def period_change(x: Any, period: int) -> Any:
+    """Percent change of the last `period` days' total against the `period` days before it."""
+    if x.shape[1] < 2 * period:
+        return np.full(x.shape[0], np.nan)
+    current = np.nansum(x[:, -period:], axis=1)
+    previous = np.nansum(x[:, -2 * period:-period], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(previous != 0, (current - previous) / np.abs(previous) * 100, np.nan)
+
+
+def zscores(x: Any, baseline: int) -> Any:
+    """Each day's z-score against the trailing `baseline` days before it (NaN without enough history)."""
+    s, s2, n = _cumulative(x)
+    hi = np.arange(x.shape[1])  # column t of the cumulative sums covers days before t
+    lo = np.clip(hi - baseline, 0, None)
+    count = n[:, hi] - n[:, lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (s[:, hi] - s[:, lo]) / count
+        std = np.sqrt(np.maximum((s2[:, hi] - s2[:, lo]) / count - mean * mean, 0.0))
+        z = (x - mean) / std
+    return np.where((count >= MIN_BASELINE) & (std > 0), z, np.nan)
+
+
+def slope(x: Any) -> Any:
+    """Least-squares slope per row over the days that have data."""
+    valid = ~np.isnan(x)
+    t = np.arange(x.shape[1], dtype=float)
+    n = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_mean = (t * valid).sum(axis=1) / n
+        y_mean = np.nansum(x, axis=1) / n
+        dt = np.where(valid, t - t_mean[:, None], 0.0)
+        dy = np.where(valid, x - y_mean[:, None], 0.0)
+        return np.where(n >= 2, (dt * dy).sum(axis=1) / (dt * dt).sum(axis=1), np.nan)
+
+
+def _num(value: Any, digits: int = 3) -> float | None:
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+
+def analyze(
+    rows: list[dict[str, Any]],
+    profile_ids: list[str],
+    metrics: list[str],
+    first: date,
+    last: date,
+    *,
+    window: int = 7,
+    baseline: int = 28,
+    z_threshold: float = 3.0,
+    max_anomalies: int = 10,
+    include_series: bool = False,
+) -> dict[str, Any]:
+    """Derived metrics for every profile at once.
+
+    Per metric: period total and mean, the latest `window`-day rolling average,
+    and week-over-week / month-over-month change of 7- and 30-day totals. Also
+    engagement rate per impression (period and rolling), follower growth
+    velocity (mean daily net growth over the window) and its trend (slope of
+    daily net growth), and days whose |z| against the trailing `baseline`
+    days reaches z_threshold.
+    """
+    require_numpy()
+    metrics = list(dict.fromkeys([*metrics, *BASE_METRICS]))
+    x = build_matrix(rows, profile_ids, metrics, first, last)
+    days = [(first + timedelta(days=i)).isoformat() for i in range(x[metrics[0]].shape[1])]
+
+    derived: dict[str, dict[str, Any]] = {}
+    for m in metrics:
+        total = np.nansum(x[m], axis=1)
+        observed = (~np.isnan(x[m])).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(observed > 0, total / observed, np.nan)
+        derived[m] = {
+            "total": total,
+            "mean": mean,
+            "rolling": rolling_mean(x[m], window),
+            "wow_pct": period_change(x[m], 7),
+            "mom_pct": period_change(x[m], 30),
+            "z": zscores(x[m], baseline),
+        }
+    imp, eng = x["impressions"], x["engagements"]
+    both = ~np.isnan(imp) & ~np.isnan(eng)
+    imp_sum, _ = rolling_sum(np.where(both, imp, np.nan), window)
+    eng_sum, _ = rolling_sum(np.where(both, eng, np.nan), window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate_rolling = np.where(imp_sum > 0, eng_sum / imp_sum, np.nan)
+        period_imp = np.where(both, imp, 0.0).sum(axis=1)
+        rate_period = np.where(period_imp > 0, np.where(both, eng, 0.0).sum(axis=1) / period_imp, np.nan)
+    growth = x["net_follower_growth"]
+    velocity = derived["net_follower_growth"]["rolling"][:, -1]
+    trend = slope(growth)
+
+    # Anomalies across every profile and metric in one pass, strongest first.
+    stacked = np.stack([derived[m]["z"] for m in metrics])  # metric x profile x day
+    flagged = np.argwhere(np.abs(np.nan_to_num(stacked)) >= z_threshold)
+
+    profiles: dict[str, Any] = {}
+    for i, p in enumerate(profile_ids):
+        profiles[p] = {
+            "days_with_data": int((~np.isnan(x[metrics[0]][i])).sum()),
+            "metrics": {
+                m: {
+                    "total": _num(derived[m]["total"][i]),
+                    "mean": _num(derived[m]["mean"][i]),
+                    f"rolling_{window}d": _num(derived[m]["rolling"][i, -1]),
+                    "wow_pct": _num(derived[m]["wow_pct"][i], 1),
+                    "mom_pct": _num(derived[m]["mom_pct"][i], 1),
+                }
+                for m in metrics
+            },
+            "engagement_rate": _num(rate_period[i], 5),
+            f"engagement_rate_rolling_{window}d": _num(rate_rolling[i, -1], 5),
+            "follower_growth": {
+                "velocity_per_day": _num(velocity[i]),
+                "trend_per_day": _num(trend[i], 4),
+            },
+            "anomalies": [],
+        }
+    for k, i, d in sorted(flagged.tolist(), key=lambda f: -abs(stacked[f[0], f[1], f[2]])):
+        anomalies = profiles[profile_ids[i]]["anomalies"]
+        if len(anomalies) < max_anomalies:
+            anomalies.append({
+                "day": days[d],
+                "metric": metrics[k],
+                "value": _num(x[metrics[k]][i, d]),
+                "z": _num(stacked[k, i, d], 2),
+            })
+
+    result: dict[str, Any] = {"days": len(days), "window": window, "profiles": profiles}
+    if include_series:
+        result["series"] = {
+            "days": days,
+            **{
+                f"{m}_rolling_{window}d": {p: [_num(v) for v in derived[m]["rolling"][i]] for i, p in enumerate(profile_ids)}
+                for m in metrics
+            },
+            f"engagement_rate_rolling_{window}d": {
+                p: [_num(v, 5) for v in rate_rolling[i]] for i, p in enumerate(profile_ids)
+            },
+        }
+    return result
@@ -0,0 +1,437 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from .client import SproutClient, current_call
+
+DEFAULT_PATH = os.path.join("~", ".cache", "sprout-mcp", "warehouse.sqlite3")
+
+POST_METRICS = [
+    "lifetime.impressions",
+    "lifetime.reactions",
+    "lifetime.engagements",
+    "lifetime.clicks",
+    "lifetime.shares",
+    "lifetime.comments",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    customer_id TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    id TEXT NOT NULL,
+    created_time TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (customer_id, dataset, scope, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS records_by_time ON records (customer_id, dataset, scope, created_time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    customer_id TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    covered_start TEXT,
+    covered_end TEXT,
+    high_water TEXT,
+    pending_start TEXT,
+    pending_end TEXT,
+    pending_token TEXT,
+    synced_at TEXT,
+    PRIMARY KEY (customer_id, dataset, scope)
+);
+"""
+
+
+def iso_utc(ts: str) -> str:
+    """Normalize an ISO 8601 timestamp to naive UTC 'YYYY-MM-DDTHH:MM:SS' so strings sort by time."""
+    value = datetime.fromisoformat(ts)
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _now() -> str:
+    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _record_id(row: dict[str, Any]) -> str:
+    for field in ("guid", "id", "perma_link"):
+        if row.get(field):
+            return str(row[field])
+    return hashlib.sha1(json.dumps(row, sort_keys=True).encode()).hexdigest()
+
+
+def _window_filter(start: str, end: str) -> str:
+    return f"created_time.in({start}..{end})"
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """How to page through one endpoint for a single profile or topic."""
+
+    name: str
+    scope: str  # what the IDs passed to sync name: "profile" or "topic"
+    path: str  # formatted with cid and scope
+    token_field: str  # "page" for numbered pages, otherwise the cursor field
+    body: Callable[[str, str, str], dict[str, Any]]
+
+
+DATASETS = {
+    ds.name: ds
+    for ds in (
+        Dataset(
+            "post_analytics",
+            "profile",
+            "/v1/{cid}/analytics/posts",
+            "page",
+            lambda scope, start, end: {
+                "filters": [f"customer_profile_id.eq({scope})", _window_filter(start, end)],
+                "fields": ["created_time", "text", "perma_link"],
+                "metrics": POST_METRICS,
+                "limit": 100,
+                "sort": ["created_time:desc"],
+            },
+        ),
+        Dataset(
+            "messages",
+            "profile",
+            "/v1/{cid}/messages",
+            "page_cursor",
+            lambda scope, start, end: {
+                "filters": [f"customer_profile_id.eq({scope})", _window_filter(start, end)],
+                "limit": 100,
+            },
+        ),
+        Dataset(
+            "publishing_posts",
+            "profile",
+            "/v1/{cid}/publishing/posts",
+            "page",
+            lambda scope, start, end: {
+                "filters": [f"customer_profile_id.eq({scope})", _window_filter(start, end)],
+                "limit": 100,
+                "sort": ["created_time:desc"],
+            },
+        ),
+        Dataset(
+            "listening",
+            "topic",
+            "/v1/{cid}/listening/topics/{scope}/messages",
+            "cursor",
+            lambda scope, start, end: {
+                "filters": [_window_filter(start, end)],
+                "fields": ["created_time", "text", "network", "perma_link", "language"],
+                "limit": 100,
+                "sort": ["created_time:desc"],
+            },
+        ),
+    )
+}
+
+
+def next_token(ds: Dataset, data: dict[str, Any], token: str | None) -> str | None:
+    """Token for the page after `data`, or None on the last page."""
+    paging = data.get("paging") or {}
+    if ds.token_field == "page":
+        current = int(paging.get("current_page") or token or 1)
+        return str(current + 1) if current < int(paging.get("total_pages") or 1) else None
+    return paging.get("next_cursor") if data.get("data") else None
+
+
+@dataclass
+class _State:
+    covered_start: str | None
+    covered_end: str | None
+    high_water: str | None
+    pending_start: str | None
+    pending_end: str | None
+    pending_token: str | None
+
+
+def newest_records(path: str, dataset: str, limit: int | None = None) -> Iterator[tuple[str, str, dict[str, Any]]]:
+    """Yield (customer_id, scope, row) for the newest `limit` rows of a dataset, oldest first.
+
+    Reads through its own read-only connection, so it is safe from any thread
+    and never creates a warehouse that does not exist yet.
+    """
+    try:
+        db = sqlite3.connect(f"file:{os.path.expanduser(path)}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return
+    try:
+        cursor = db.execute(
+            "SELECT customer_id, scope, data FROM ("
+            "SELECT customer_id, scope, data, created_time FROM records WHERE dataset = ? "
+            "ORDER BY created_time DESC LIMIT ?) ORDER BY created_time",
+            (dataset, -1 if limit is None else limit),
+        )
+    except sqlite3.OperationalError:  # no records table yet
+        db.close()
+        return
+    try:
+        for customer_id, scope, data in cursor:
+            yield customer_id, scope, json.loads(data)
+    finally:
+        db.close()
+
+
+class Warehouse:
+    """Local SQLite (WAL) copy of posts, inbox and listening data, synced incrementally.
+
+    Each (customer, dataset, profile or topic) tracks the contiguous window
+    it covers and the newest created_time seen (its high-water mark). A sync
+    only fetches what lies outside the covered window: the delta from the
+    high-water mark up to now, plus any older backfill. Every page is written
+    together with its pagination token in one transaction, so a sync that
+    dies midway resumes from the last stored page instead of starting over.
+    on_page(customer_id, dataset, scope, rows) sees every stored page.
+
+    SQLite calls block, so sync runs them in worker threads, serialized on
+    one connection by a lock; async callers should likewise run query,
+    coverage and stats with asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        concurrency: int = 4,
+        on_page: Callable[[str, str, str, list[dict[str, Any]]], None] | None = None,
+    ) -> None:
+        self.path = os.path.expanduser(path)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db_lock = threading.RLock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.executescript(_SCHEMA)
+        self._locks: dict[tuple[str, str, str], asyncio.Lock] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.on_page = on_page
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._db.close()
+
+    def _state(self, customer_id: str, dataset: str, scope: str) -> _State | None:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT covered_start, covered_end, high_water, pending_start, pending_end, pending_token "
+                "FROM sync_state WHERE customer_id = ? AND dataset = ? AND scope = ?",
+                (customer_id, dataset, scope),
+            ).fetchone()
+        return _State(*row) if row else None
+
+    def _begin_window(self, key: tuple[str, str, str], start: str, end: str) -> None:
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT INTO sync_state (customer_id, dataset, scope, pending_start, pending_end) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT DO UPDATE SET "
+                "pending_start = excluded.pending_start, pending_end = excluded.pending_end, pending_token = NULL",
+                (*key, start, end),
+            )
+
+    def _store_page(
+        self, key: tuple[str, str, str], rows: list[dict[str, Any]], token: str | None, window: tuple[str, str]
+    ) -> None:
+        """Upsert one page and checkpoint its token; close the window when there is no next page."""
+        records = [
+            (*key, _record_id(r), iso_utc(r["created_time"]) if r.get("created_time") else window[0],
+             json.dumps(r, separators=(",", ":")))
+            for r in rows
+        ]
+        with self._db_lock, self._db:
+            self._db.executemany(
+                "INSERT INTO records (customer_id, dataset, scope, id, created_time, data) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET created_time = excluded.created_time, data = excluded.data",
+                records,
+            )
+            if token is not None:
+                self._db.execute(
+                    "UPDATE sync_state SET pending_token = ? WHERE customer_id = ? AND dataset = ? AND scope = ?",
+                    (token, *key),
+                )
+                return
+            state = self._state(*key)
+            start, end = window
+            covered_start, covered_end = state.covered_start, state.covered_end
+            if covered_start is None or (start <= covered_end and end >= covered_start):
+                covered_start = min(covered_start or start, start)
+                covered_end = max(covered_end or end, end)
+            (high_water,) = self._db.execute(
+                "SELECT MAX(created_time) FROM records WHERE customer_id = ? AND dataset = ? AND scope = ?", key
+            ).fetchone()
+            self._db.execute(
+                "UPDATE sync_state SET covered_start = ?, covered_end = ?, high_water = ?, pending_start = NULL, "
+                "pending_end = NULL, pending_token = NULL, synced_at = ? "
+                "WHERE customer_id = ? AND dataset = ? AND scope = ?",
+                (covered_start, covered_end, high_water, _now(), *key),
+            )
+
+    def _plan(self, state: _State | None, start: str, end: str, resync: bool) -> list[tuple[str, str]]:
+        """Windows still to fetch for start..end, given what is already covered."""
+        if start > end:
+            return []
+        if state is None or state.covered_start is None or resync:
+            return [(start, end)]
+        windows = []
+        if end > state.covered_end:
+            # Refetch from the newest row seen, so late-indexed items near the edge are picked up.
+            windows.append((min(state.high_water or state.covered_end, state.covered_end), end))
+        if start < state.covered_start:
+            windows.append((start, state.covered_start))
+        return windows
+
+    async def _fetch_window(
+        self,
+        client: SproutClient,
+        ds: Dataset,
+        key: tuple[str, str, str],
+        window: tuple[str, str],
+        token: str | None,
+    ) -> tuple[int, int]:
+        customer_id, _, scope = key
+        path = ds.path.format(cid=customer_id, scope=scope)
+        body = ds.body(scope, *window)
+        pages = rows = 0
+        while True:
+            page_body = dict(body)
+            if token is not None:
+                page_body[ds.token_field] = int(token) if ds.token_field == "page" else token
+            data = await client.post(path, page_body, idempotent=True)
+            items = data.get("data") or []
+            token = next_token(ds, data, token)
+            await asyncio.to_thread(self._store_page, key, items, token, window)
+            if self.on_page is not None:
+                self.on_page(*key, items)
+            pages += 1
+            rows += len(items)
+            if token is None:
+                return pages, rows
+
+    async def _sync_scope(
+        self, client: SproutClient, ds: Dataset, customer_id: str, scope: str, start: str, end: str, resync: bool
+    ) -> dict[str, Any]:
+        key = (customer_id, ds.name, scope)
+        async with self._locks.setdefault(key, asyncio.Lock()), self._semaphore:
+            pages = rows = 0
+            resumed = False
+            state = await asyncio.to_thread(self._state, *key)
+            if state is not None and state.pending_start is not None:
+                # A previous sync died midway: finish its window from the last checkpoint.
+                resumed = True
+                window = (state.pending_start, state.pending_end)
+                p, r = await self._fetch_window(client, ds, key, window, state.pending_token)
+                pages, rows = pages + p, rows + r
+                state = await asyncio.to_thread(self._state, *key)
+            windows = self._plan(state, start, end, resync)
+            for window in windows:
+                await asyncio.to_thread(self._begin_window, key, *window)
+                p, r = await self._fetch_window(client, ds, key, window, None)
+                pages, rows = pages + p, rows + r
+            return {
+                "pages": pages,
+                "rows_fetched": rows,
+                "windows": [list(w) for w in windows],
+                "resumed": resumed,
+                **await asyncio.to_thread(self.coverage, customer_id, ds.name, scope),
+            }
+
+    async def sync(
+        self,
+        client: SproutClient,
+        dataset: str,
+        customer_id: str,
+        scopes: list[str],
+        start_time: str,
+        end_time: str,
+        *,
+        resync: bool = False,
+    ) -> dict[str, Any]:
+        """Bring every scope up to date for start_time..end_time; per-scope errors do not stop the rest."""
+        ds = DATASETS[dataset]
+        start, end = iso_utc(start_time), min(iso_utc(end_time), _now())
+        results = await asyncio.gather(
+            *(self._sync_scope(client, ds, customer_id, s, start, end, resync) for s in scopes),
+            return_exceptions=True,
+        )
+        report: dict[str, Any] = {}
+        for scope, result in zip(scopes, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                report[scope] = {"error": type(result).__name__, "message": str(result)}
+            else:
+                report[scope] = result
+        if (stats := current_call()) is not None:
+            stats.notes["rows_fetched"] = sum(r.get("rows_fetched", 0) for r in report.values())
+            errors = {scope: r["message"] for scope, r in report.items() if "error" in r}
+            if errors:
+                stats.notes["sync_errors"] = errors
+        return report
+
+    def coverage(self, customer_id: str, dataset: str, scope: str) -> dict[str, Any]:
+        state = self._state(customer_id, dataset, scope)
+        if state is None:
+            return {"covered_start": None, "covered_end": None, "high_water": None}
+        return {
+            "covered_start": state.covered_start,
+            "covered_end": state.covered_end,
+            "high_water": state.high_water,
+        }
+
+    def query(
+        self,
+        dataset: str,
+        customer_id: str,
+        scopes: list[str],
+        start_time: str,
+        end_time: str,
+        *,
+        text_contains: str = "",
+        limit: int = 100,
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        """Read synced rows for start_time..end_time, newest first, without calling the API."""
+        start, end = iso_utc(start_time), iso_utc(end_time)
+        where = (
+            f"customer_id = ? AND dataset = ? AND scope IN ({','.join('?' * len(scopes))}) "
+            "AND created_time BETWEEN ? AND ?"
+        )
+        args: list[Any] = [customer_id, dataset, *scopes, start, end]
+        if text_contains:
+            where += " AND instr(lower(json_extract(data, '$.text')), ?) > 0"
+            args.append(text_contains.lower())
+        with self._db_lock:
+            (total,) = self._db.execute(f"SELECT COUNT(*) FROM records WHERE {where}", args).fetchone()
+            rows = self._db.execute(
+                f"SELECT scope, data FROM records WHERE {where} ORDER BY created_time DESC, id LIMIT ? OFFSET ?",
+                [*args, limit, offset],
+            ).fetchall()
+        covered_to = min(end, _now())
+        coverage = {}
+        for scope in scopes:
+            c = self.coverage(customer_id, dataset, scope)
+            c["complete"] = bool(
+                c["covered_start"] and c["covered_start"] <= start and c["covered_end"] >= covered_to
+            )
+            coverage[scope] = c
+        return {
+            "data": [{DATASETS[dataset].scope + "_id": scope, **json.loads(data)} for scope, data in rows],
+            "total": total,
+            "coverage": coverage,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        with self._db_lock:
+            counts = self._db.execute("SELECT dataset, COUNT(*) FROM records GROUP BY dataset").fetchall()
+            (scopes,) = self._db.execute("SELECT COUNT(*) FROM sync_state").fetchone()
+        return {"path": self.path, "records": dict(counts), "synced_scopes": scopes}
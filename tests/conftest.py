@@ -0,0 +1,52 @@
+import asyncio
+import json
+import re
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from sprout_mcp import server
+from sprout_mcp.client import SproutClient
+
+PAGE_SIZE = 20
+
+
+class FakeUpstream:
+    """An endless cursor-paged Sprout endpoint behind httpx.MockTransport, counting every request."""
+
+    def __init__(self, latency: float = 0.05) -> None:
+        self.latency = latency
+        self.requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        body = json.loads(request.content or b"{}")
+        window = next((m.group(1) for f in body.get("filters", []) if (m := re.fullmatch(r"created_time\.in\((.*)\)", f))), "")
+        end = datetime.fromisoformat(window.partition("..")[2].replace("Z", "+00:00")) if window else datetime(2024, 1, 31)
+        offset = int(body.get("cursor") or 0)
+        items = [
+            {"guid": f"m{offset + i}", "created_time": (end - timedelta(seconds=offset + i)).strftime("%Y-%m-%dT%H:%M:%SZ")}
+            for i in range(PAGE_SIZE)
+        ]
+        return httpx.Response(200, json={"data": items, "paging": {"next_cursor": str(offset + PAGE_SIZE)}})
+
+
+@pytest.fixture
+def upstream() -> FakeUpstream:
+    return FakeUpstream()
+
+
+@pytest.fixture
+async def client(upstream: FakeUpstream, monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[SproutClient]:
+    """The server's shared client, talking to the fake upstream."""
+    monkeypatch.setenv("SPROUT_API_TOKEN", "test-token")
+    monkeypatch.setenv("SPROUT_CUSTOMER_ID", "1")
+    monkeypatch.setenv("SPROUT_RATE_LIMIT", "1000000")
+    monkeypatch.setattr(server, "_result_handle_bytes", 0)  # read at import; the env var is too late here
+    sprout = SproutClient(base_url="https://sprout.test", transport=httpx.MockTransport(upstream.handler))
+    monkeypatch.setattr(server, "_client", sprout)
+    yield sprout
+    await sprout.aclose()
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import re
+from datetime import UTC, date, datetime, timedelta
+
+import httpx
+import pytest
+
+from sprout_mcp.analytics import ProfileAnalyticsCache
+from sprout_mcp.client import SproutClient
+
+METRICS = ["impressions"]
+
+
+class AnalyticsUpstream:
+    """/analytics/profiles with one row per profile and day; a non-numeric profile ID fails the whole request.
+
+    Days in `gaps` (profile ID, day) have no row, as for a profile that did not exist yet.
+    """
+
+    def __init__(self) -> None:
+        self.requests: list[list[str]] = []
+        self.ranges: list[tuple[date, date]] = []
+        self.gaps: set[tuple[str, date]] = set()
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        ids = re.fullmatch(r"customer_profile_id\.eq\((.*)\)", body["filters"][0]).group(1).split(",")
+        self.requests.append(ids)
+        await asyncio.sleep(0.01)
+        if not all(p.isdigit() for p in ids):
+            return httpx.Response(400, json={"error": "invalid customer_profile_id"})
+        first, last = (
+            date.fromisoformat(d)
+            for d in re.fullmatch(r"reporting_period\.in\((.*)\.\.\.(.*)\)", body["filters"][1]).groups()
+        )
+        self.ranges.append((first, last))
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        rows = [
+            {"dimensions": {"customer_profile_id": int(p), "reporting_period.by(day)": d.isoformat()},
+             "metrics": {"impressions": d.day}}
+            for p in ids
+            for d in days
+            if (p, d) not in self.gaps
+        ]
+        return httpx.Response(200, json={"data": rows, "paging": {"total_pages": 1}})
+
+
+@pytest.fixture
+def upstream() -> AnalyticsUpstream:
+    return AnalyticsUpstream()
+
+
+async def test_a_bad_profile_does_not_fail_callers_merged_with_it(
+    client: SproutClient, upstream: AnalyticsUpstream
+) -> None:
+    cache = ProfileAnalyticsCache(batch_window=0.02)
+    good, bad = await asyncio.gather(
+        cache.get(client, "1", ["1000"], "2024-01-01", "2024-01-02", METRICS, "UTC"),
+        cache.get(client, "1", ["bogus"], "2024-01-01", "2024-01-02", METRICS, "UTC"),
+        return_exceptions=True,
+    )
+    assert isinstance(bad, httpx.HTTPStatusError)
+    assert {r["dimensions"]["customer_profile_id"] for r in good["data"]} == {1000}
+    assert "errors" not in good
+    # One merged request, then each caller on its own.
+    assert sorted(upstream.requests) == [["1000"], ["1000", "bogus"], ["bogus"]]
+
+
+async def test_merged_callers_share_one_request(client: SproutClient, upstream: AnalyticsUpstream) -> None:
+    cache = ProfileAnalyticsCache(batch_window=0.02)
+    results = await asyncio.gather(*(
+        cache.get(client, "1", [p], "2024-01-01", "2024-01-02", METRICS, "UTC") for p in ("1000", "1001", "1002")
+    ))
+    assert [{r["dimensions"]["customer_profile_id"] for r in res["data"]} for res in results] == [{1000}, {1001}, {1002}]
+    assert upstream.requests == [["1000", "1001", "1002"]]
+
+
+async def test_cache_evicts_least_recently_used_series(client: SproutClient, upstream: AnalyticsUpstream) -> None:
+    cache = ProfileAnalyticsCache(max_values=10)
+    for p in ("1000", "1001", "1000", "1002"):  # five days each; 1001 is the least recently used at the end
+        await cache.get(client, "1", [p], "2024-01-01", "2024-01-05", METRICS, "UTC")
+    assert upstream.requests == [["1000"], ["1001"], ["1002"]]
+    stats = cache.stats()
+    assert (stats["series"], stats["values"], stats["evicted_series"]) == (2, 10, 1)
+
+    await cache.get(client, "1", ["1000"], "2024-01-01", "2024-01-05", METRICS, "UTC")
+    assert len(upstream.requests) == 3
+    await cache.get(client, "1", ["1001"], "2024-01-01", "2024-01-05", METRICS, "UTC")
+    assert upstream.requests[-1] == ["1001"]
+
+
+async def test_a_call_larger_than_the_cache_still_returns_every_row(
+    client: SproutClient, upstream: AnalyticsUpstream
+) -> None:
+    cache = ProfileAnalyticsCache(max_values=4)
+    result = await cache.get(client, "1", ["1000", "1001"], "2024-01-01", "2024-01-05", METRICS, "UTC")
+    assert len(result["data"]) == 10
+    assert cache.stats()["values"] <= 4  # trimmed once the call is done
+
+
+async def test_only_missing_days_are_fetched_as_ranges(client: SproutClient, upstream: AnalyticsUpstream) -> None:
+    cache = ProfileAnalyticsCache()
+    await cache.get(client, "1", ["1000"], "2024-01-01", "2024-01-03", METRICS, "UTC")
+    await cache.get(client, "1", ["1000"], "2024-01-07", "2024-01-08", METRICS, "UTC")
+    result = await cache.get(client, "1", ["1000"], "2024-01-01", "2024-01-10", METRICS, "UTC")
+    assert upstream.ranges[2:] == [(date(2024, 1, 4), date(2024, 1, 6)), (date(2024, 1, 9), date(2024, 1, 10))]
+    assert [r["metrics"]["impressions"] for r in result["data"]] == list(range(1, 11))
+
+    # Old days are final: asking again sends nothing.
+    await cache.get(client, "1", ["1000"], "2024-01-01", "2024-01-10", METRICS, "UTC")
+    assert len(upstream.requests) == 4
+
+
+async def test_settle_window_is_refetched(client: SproutClient, upstream: AnalyticsUpstream) -> None:
+    cache = ProfileAnalyticsCache(settle_days=3)
+    today = datetime.now(UTC).date()
+    start, end = (today - timedelta(days=6)).isoformat(), today.isoformat()
+    await cache.get(client, "1", ["1000"], start, end, METRICS, "UTC")
+    await cache.get(client, "1", ["1000"], start, end, METRICS, "UTC")
+    assert upstream.ranges == [(today - timedelta(days=6), today), (today - timedelta(days=2), today)]
+
+
+async def test_days_without_a_row_are_cached(client: SproutClient, upstream: AnalyticsUpstream) -> None:
+    upstream.gaps = {("1000", date(2024, 1, 2)), ("1000", date(2024, 1, 3))}
+    cache = ProfileAnalyticsCache()
+    first = await cache.get(client, "1", ["1000"], "2024-01-01", "2024-01-04", METRICS, "UTC")
+    second = await cache.get(client, "1", ["1000"], "2024-01-01", "2024-01-04", METRICS, "UTC")
+    assert len(upstream.requests) == 1
+    assert first == second
+    assert [r["dimensions"]["reporting_period.by(day)"] for r in second["data"]] == ["2024-01-01", "2024-01-04"]
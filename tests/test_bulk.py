@@ -0,0 +1,155 @@
+import asyncio
+import json
+from collections import Counter
+from pathlib import Path
+
+import httpx
+import pytest
+
+from sprout_mcp.bulk import PostLedger, post_key, submit_posts
+from sprout_mcp.client import SproutClient
+
+
+class PublishingUpstream:
+    """POST /publishing/posts whose answer depends on the post text; counts requests per text.
+
+    "throttled" gets one 429 and is then created, "bad gateway" always gets a
+    502, "timeout" times out after the request was sent, "rejected" gets a
+    400 and "hang" is never answered. Anything else is created.
+    """
+
+    def __init__(self) -> None:
+        self.sent: Counter[str] = Counter()
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        text = json.loads(request.content)["fields"]["text"]
+        self.sent[text] += 1
+        if text == "throttled" and self.sent[text] == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if text == "bad gateway":
+            return httpx.Response(502)
+        if text == "timeout":
+            raise httpx.ReadTimeout("read timed out", request=request)
+        if text == "rejected":
+            return httpx.Response(400, json={"error": "text too long"})
+        if text == "hang":
+            await asyncio.Event().wait()
+        return httpx.Response(200, json={"data": [{"id": f"post-{text}-{self.sent[text]}", "text": text}]})
+
+
+@pytest.fixture
+def upstream() -> PublishingUpstream:
+    return PublishingUpstream()
+
+
+@pytest.fixture
+def fast_client(client: SproutClient) -> SproutClient:
+    client.retry.base_delay = client.retry.max_delay = 0.01
+    return client
+
+
+def _body(text: str) -> dict:
+    return {"post_type": "OUTBOUND", "profile_ids": ["1000"], "fields": {"text": text}}
+
+
+def _ledger_lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+async def test_429_is_resent_and_created(fast_client: SproutClient, upstream: PublishingUpstream, tmp_path: Path) -> None:
+    ledger_path = tmp_path / "ledger.jsonl"
+    [result] = await submit_posts(fast_client, "1", [_body("throttled")], PostLedger(str(ledger_path)))
+    assert result["status"] == "created"
+    assert result["attempts"] == 2
+    assert result["post_ids"] == ["post-throttled-2"]
+    assert upstream.sent["throttled"] == 2
+    # Each send is recorded as uncertain first; the 429 is then discarded, as nothing was created.
+    assert [e["status"] for e in _ledger_lines(ledger_path)] == ["uncertain", "discarded", "uncertain", "created"]
+    assert PostLedger(str(ledger_path)).stats() | {"path": ""} == {"path": "", "created": 1, "uncertain": 0, "pending": 0}
+
+
+@pytest.mark.parametrize("text", ["bad gateway", "timeout"])
+async def test_unknown_outcome_is_uncertain_and_never_resent(
+    fast_client: SproutClient, upstream: PublishingUpstream, tmp_path: Path, text: str
+) -> None:
+    ledger_path = tmp_path / "ledger.jsonl"
+    [result] = await submit_posts(fast_client, "1", [_body(text)], PostLedger(str(ledger_path)))
+    assert result["status"] == "uncertain"
+    assert result["attempts"] == 1
+    assert upstream.sent[text] == 1
+    entry = _ledger_lines(ledger_path)[-1]
+    assert (entry["key"], entry["status"]) == (post_key("1", _body(text)), "uncertain")
+    assert entry["error"] != "sent; no answer recorded"  # the write-ahead entry now carries the actual error
+
+    # A replay, even from a fresh process, does not send it again...
+    [replayed] = await submit_posts(fast_client, "1", [_body(text)], PostLedger(str(ledger_path)))
+    assert replayed["status"] == "uncertain"
+    assert upstream.sent[text] == 1
+
+    # ...unless the caller has checked and asks for it.
+    await submit_posts(fast_client, "1", [_body(text)], PostLedger(str(ledger_path)), retry_uncertain=True)
+    assert upstream.sent[text] == 2
+
+
+async def test_definite_rejection_is_failed_and_discarded(
+    fast_client: SproutClient, upstream: PublishingUpstream, tmp_path: Path
+) -> None:
+    ledger_path = tmp_path / "ledger.jsonl"
+    [result] = await submit_posts(fast_client, "1", [_body("rejected")], PostLedger(str(ledger_path)))
+    assert result["status"] == "failed"
+    assert result["error"].startswith("HTTP 400")
+    assert [e["status"] for e in _ledger_lines(ledger_path)] == ["uncertain", "discarded"]
+    assert PostLedger(str(ledger_path)).get(post_key("1", _body("rejected"))) is None
+
+    # Nothing was created, so it can simply be submitted again.
+    await submit_posts(fast_client, "1", [_body("rejected")], PostLedger(str(ledger_path)))
+    assert upstream.sent["rejected"] == 2
+
+
+async def test_ledger_replay_returns_already_created(
+    fast_client: SproutClient, upstream: PublishingUpstream, tmp_path: Path
+) -> None:
+    ledger_path = tmp_path / "ledger.jsonl"
+    bodies = [_body("hello"), _body("world")]
+    first = await submit_posts(fast_client, "1", bodies, PostLedger(str(ledger_path)))
+    assert [r["status"] for r in first] == ["created", "created"]
+
+    # A new ledger object reads the file, as after a restart.
+    replay = await submit_posts(fast_client, "1", [*bodies, _body("new")], PostLedger(str(ledger_path)))
+    assert [r["status"] for r in replay] == ["already_created", "already_created", "created"]
+    assert [r["post_ids"] for r in replay[:2]] == [r["post_ids"] for r in first]
+    assert upstream.sent == {"hello": 1, "world": 1, "new": 1}
+
+    # The same post for another customer is a different post.
+    [other] = await submit_posts(fast_client, "2", [_body("hello")], PostLedger(str(ledger_path)))
+    assert other["status"] == "created"
+
+
+async def test_duplicates_within_one_call_are_sent_once(
+    fast_client: SproutClient, upstream: PublishingUpstream, tmp_path: Path
+) -> None:
+    results = await submit_posts(
+        fast_client, "1", [_body("a"), _body("b"), _body("a"), _body("a")], PostLedger(str(tmp_path / "ledger.jsonl"))
+    )
+    assert [r["status"] for r in results] == ["created", "created", "duplicate", "duplicate"]
+    assert [r.get("duplicate_of") for r in results[2:]] == [0, 0]
+    assert upstream.sent == {"a": 1, "b": 1}
+
+
+async def test_a_process_killed_after_sending_leaves_the_post_uncertain(
+    fast_client: SproutClient, upstream: PublishingUpstream, tmp_path: Path
+) -> None:
+    ledger_path = tmp_path / "ledger.jsonl"
+    call = asyncio.create_task(submit_posts(fast_client, "1", [_body("hang")], PostLedger(str(ledger_path))))
+    while not upstream.sent["hang"]:
+        await asyncio.sleep(0.001)
+    try:
+        # The request is out and no answer is recorded: what a restarted process finds on disk.
+        replay = submit_posts(fast_client, "1", [_body("hang")], PostLedger(str(ledger_path)))
+        [replayed] = await asyncio.wait_for(replay, 1)  # a resend would hang too
+        assert (replayed["status"], replayed["error"]) == ("uncertain", "sent; no answer recorded")
+        assert upstream.sent["hang"] == 1
+    finally:
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any
+
+import anyio
+import pytest
+
+from sprout_mcp import server
+from sprout_mcp.client import SproutClient
+from sprout_mcp.paging import Paginator
+
+from .conftest import PAGE_SIZE, FakeUpstream
+
+START, END = "2024-01-01T00:00:00Z", "2024-01-31T23:59:59Z"
+SETTLE = 0.3  # several upstream latencies: any request sent after a cancel would land in this window
+
+
+def _other_tasks() -> set[asyncio.Task[Any]]:
+    return {t for t in asyncio.all_tasks() if t is not asyncio.current_task()}
+
+
+async def _quiet_after(upstream: FakeUpstream) -> int:
+    """Upstream requests that arrive within SETTLE seconds from now."""
+    before = upstream.requests
+    await asyncio.sleep(SETTLE)
+    return upstream.requests - before
+
+
+async def test_paginator_cancel_leaves_no_pending_tasks(client: SproutClient, upstream: FakeUpstream) -> None:
+    baseline = _other_tasks()
+    pager = Paginator(client, "/v1/1/messages", {"limit": PAGE_SIZE}, prefetch=2)
+    seen = 0
+    async for _ in pager.items():
+        seen += 1
+        if seen == PAGE_SIZE + 1:  # reading page 2 while later pages are prefetched
+            pager.cancel()
+            break
+    assert await _quiet_after(upstream) == 0
+    assert _other_tasks() - baseline == set()
+    assert not pager.exhausted
+    assert client.diagnostics()["requests"]["in_flight"] == 0
+
+
+async def test_paginator_cancel_during_a_request(client: SproutClient, upstream: FakeUpstream) -> None:
+    baseline = _other_tasks()
+    pager = Paginator(client, "/v1/1/messages", {"limit": PAGE_SIZE}, prefetch=4)
+    items = pager.items()
+    await anext(items)  # the producer is now prefetching further pages
+    pager.cancel()
+    with pytest.raises(StopAsyncIteration):
+        while True:
+            await anext(items)
+    assert await _quiet_after(upstream) == 0
+    assert _other_tasks() - baseline == set()
+
+
+async def test_closing_items_early_stops_prefetch(client: SproutClient, upstream: FakeUpstream) -> None:
+    baseline = _other_tasks()
+    pager = Paginator(client, "/v1/1/messages", {"limit": PAGE_SIZE}, prefetch=3)
+    items = pager.items()
+    await anext(items)
+    await items.aclose()
+    assert await _quiet_after(upstream) == 0
+    assert _other_tasks() - baseline == set()
+
+
+@pytest.mark.parametrize(
+    ("args", "requests"),
+    [
+        ({"auto_paginate": True, "max_items": 100000}, 3),
+        ({"auto_paginate": True, "max_items": 100000, "shards": 4}, 6),
+    ],
+    ids=["auto_paginate", "sharded"],
+)
+async def test_cancelled_tool_call_stops_upstream_requests(
+    client: SproutClient, upstream: FakeUpstream, args: dict[str, Any], requests: int
+) -> None:
+    baseline = _other_tasks()
+    finished = False
+
+    async def call() -> None:
+        nonlocal finished
+        await server.mcp.call_tool("get_listening_messages", {"topic_id": "t1", "start_time": START, "end_time": END, **args})
+        finished = True
+
+    # Cancel the way an MCP session does: through the anyio cancel scope around the call.
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(call)
+        while upstream.requests < requests:
+            await asyncio.sleep(0.001)
+        tg.cancel_scope.cancel()
+
+    assert not finished
+    assert await _quiet_after(upstream) == 0
+    assert client.diagnostics()["requests"]["in_flight"] == 0
+    assert _other_tasks() - baseline == set()
@@ -0,0 +1,87 @@
+import json
+import re
+
+import httpx
+import pytest
+
+from sprout_mcp import server
+from sprout_mcp.client import SproutClient
+
+PROFILES = [str(1000 + i) for i in range(120)]
+CREATED = "2024-01-01T12:00:00"  # every post and message, so each lands in exactly one time shard
+
+
+class OrgUpstream:
+    """A large org whose endpoints each return one row per profile named in the filter."""
+
+    def __init__(self) -> None:
+        self.filters: dict[str, list[list[str]]] = {}
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json={"data": [{"customer_profile_id": int(p), "name": p} for p in PROFILES]})
+        body = json.loads(request.content)
+        ids = next(m.group(1) for f in body["filters"] if (m := re.fullmatch(r"customer_profile_id\.eq\((.*)\)", f)))
+        profiles = ids.split(",")
+        endpoint = request.url.path.split("/", 3)[3]
+        self.filters.setdefault(endpoint, []).append(profiles)
+        if endpoint == "analytics/profiles":
+            rows = [
+                {"dimensions": {"customer_profile_id": int(p), "reporting_period.by(day)": "2024-01-01"},
+                 "metrics": {"impressions": 10, "engagements": 1, "net_follower_growth": 0}}
+                for p in profiles
+            ]
+            return httpx.Response(200, json={"data": rows})
+        window = next(m.group(1) for f in body["filters"] if (m := re.fullmatch(r"created_time\.in\((.*)\)", f)))
+        start, end = window.split("..")
+        if not start <= CREATED <= end:
+            return httpx.Response(200, json={"data": [], "paging": {"current_page": 1, "total_pages": 1}})
+        rows = [
+            {"guid": f"{endpoint}-{p}", "customer_profile_id": int(p), "created_time": CREATED + "Z",
+             "status": "PUBLISHED", "metrics": {"lifetime.impressions": 5, "lifetime.engagements": 1}}
+            for p in profiles
+        ]
+        return httpx.Response(200, json={"data": rows, "paging": {"current_page": 1, "total_pages": 1}})
+
+
+@pytest.fixture
+def upstream() -> OrgUpstream:
+    return OrgUpstream()
+
+
+async def test_dashboard_splits_large_orgs_into_profile_chunks(
+    client: SproutClient, upstream: OrgUpstream, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server._analytics_cache, "batch_size", 50)
+    server._analytics_cache.clear()
+    server._metadata_cache.clear()
+    dashboard = json.loads(await server.get_dashboard(start_time="2024-01-01T00:00:00", end_time="2024-01-01T23:59:59"))
+
+    assert dashboard["profile_count"] == len(PROFILES)
+    for endpoint in ("analytics/profiles", "analytics/posts", "messages", "publishing/posts"):
+        chunks = upstream.filters[endpoint]
+        assert max(len(c) for c in chunks) <= 50, endpoint
+        assert {p for c in chunks for p in c} == set(PROFILES), endpoint
+    assert dashboard["posts"]["posts"] == len(PROFILES)
+    assert dashboard["inbox"]["total"] == len(PROFILES)
+    assert dashboard["publishing"] == {"posts": len(PROFILES), "by_status": {"PUBLISHED": len(PROFILES)}, "truncated": False}
+    assert dashboard["inbox"]["truncated"] is False
+
+
+async def test_inbox_max_items_is_shared_across_chunks_and_windows(
+    client: SproutClient, upstream: OrgUpstream, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server._analytics_cache, "batch_size", 50)
+    server._metadata_cache.clear()
+
+    async def inbox(max_items: int) -> dict:
+        text = await server.get_dashboard(
+            start_time="2024-01-01T00:00:00", end_time="2024-01-01T23:59:59", sections="inbox", max_items=max_items
+        )
+        return json.loads(text)["inbox"]
+
+    # Every message is in one of the four time shards, so a per-pull share of max_items would undercount.
+    exact = await inbox(len(PROFILES))
+    assert (exact["total"], exact["truncated"]) == (len(PROFILES), False)
+    capped = await inbox(100)
+    assert (capped["total"], capped["truncated"]) == (100, True)
@@ -0,0 +1,94 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from sprout_mcp import export as export_module
+from sprout_mcp.client import SproutClient
+from sprout_mcp.export import export
+
+START, END = "2024-01-01T00:00:00", "2024-01-31T23:59:59"
+
+# Later pages bring fields the first one lacks, nested ones included.
+PAGES = [
+    [{"guid": "p1", "created_time": "2024-01-03T00:00:00Z", "text": "a"}],
+    [{"guid": "p2", "created_time": "2024-01-02T00:00:00Z", "text": "b", "network": "REDDIT"}],
+    [{"guid": "p3", "created_time": "2024-01-01T00:00:00Z", "metrics": {"lifetime.clicks": 3}}],
+]
+
+
+class PagedUpstream:
+    """A listening topic that serves PAGES by cursor; request number `fail_at` returns HTTP 400."""
+
+    def __init__(self) -> None:
+        self.fail_at: int | None = None
+        self.requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.requests == self.fail_at:
+            return httpx.Response(400, json={"error": "injected"})
+        page = int(json.loads(request.content).get("cursor") or 0)
+        more = page + 1 < len(PAGES)
+        return httpx.Response(200, json={"data": PAGES[page], "paging": {"next_cursor": str(page + 1) if more else None}})
+
+
+@pytest.fixture
+def upstream() -> PagedUpstream:
+    return PagedUpstream()
+
+
+@pytest.mark.parametrize("compress", [False, True])
+async def test_csv_header_is_the_union_of_every_page(
+    client: SproutClient, upstream: PagedUpstream, tmp_path: Path, compress: bool
+) -> None:
+    path = str(tmp_path / "out.csv")
+    upstream.fail_at = 3  # the export dies before its last page...
+    with pytest.raises(httpx.HTTPStatusError):
+        await export(client, "listening", "1", ["t1"], START, END, path, "csv", compress)
+
+    upstream.fail_at = None  # ...and a second run resumes it
+    result = await export(client, "listening", "1", ["t1"], START, END, path, "csv", compress)
+
+    raw = Path(path).read_bytes()
+    assert result == {"path": path, "rows": 3, "bytes": len(raw)}
+    rows = list(csv.DictReader(io.StringIO((gzip.decompress(raw) if compress else raw).decode())))
+    assert list(rows[0]) == ["guid", "created_time", "text", "network", "metrics.lifetime.clicks"]
+    assert [r["guid"] for r in rows] == ["p1", "p2", "p3"]
+    assert rows[0]["network"] == "" and rows[1]["network"] == "REDDIT"
+    assert rows[2]["metrics.lifetime.clicks"] == "3"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.csv"]
+
+
+async def test_a_cancelled_export_finishes_its_page_write_and_resumes(
+    client: SproutClient, upstream: PagedUpstream, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = str(tmp_path / "out.jsonl")
+    threads: set[str] = set()
+    append_page = export_module._append_page
+
+    def slow_append_page(*args):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        append_page(*args)
+
+    monkeypatch.setattr(export_module, "_append_page", slow_append_page)
+    task = asyncio.create_task(export(client, "listening", "1", ["t1"], START, END, path))
+    await asyncio.sleep(0.02)  # inside the first page write
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert threading.main_thread().name not in threads
+
+    checkpoint = json.loads(Path(f"{path}.checkpoint").read_text())
+    assert (checkpoint["rows"], checkpoint["bytes"]) == (1, Path(path).stat().st_size)
+    result = await export(client, "listening", "1", ["t1"], START, END, path)
+    assert result["rows"] == 3
+    assert [json.loads(line)["guid"] for line in Path(path).read_text().splitlines()] == ["p1", "p2", "p3"]
@@ -0,0 +1,52 @@
+import asyncio
+import traceback
+from typing import Any
+
+import httpx
+import pytest
+
+from sprout_mcp.cache import PublishingCache
+
+
+async def _missing() -> Any:
+    request = httpx.Request("GET", "https://sprout.test/v1/1/publishing/posts/404")
+    httpx.Response(404, json={"error": "not found"}, request=request).raise_for_status()
+
+
+async def test_cached_404_raises_a_fresh_error_on_every_hit() -> None:
+    cache = PublishingCache()
+    with pytest.raises(httpx.HTTPStatusError):
+        await cache.get_post("1", "404", _missing)
+
+    errors = []
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError) as info:
+            await cache.get_post("1", "404", _missing)
+        errors.append(info.value)
+    assert len({id(e) for e in errors}) == 3
+    depths = [len(traceback.extract_tb(e.__traceback__)) for e in errors]
+    assert depths[0] == depths[-1]
+    assert errors[-1].response.status_code == 404
+    assert cache.stats()["negative_hits"] == 3
+
+
+async def test_list_fetched_across_an_invalidation_is_not_cached() -> None:
+    cache = PublishingCache()
+    release = asyncio.Event()
+    loads = 0
+
+    async def load() -> Any:
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return {"data": [{"id": loads}]}
+
+    fetch = asyncio.create_task(cache.get_list("1", "posts", ["1000"], load))
+    await asyncio.sleep(0)
+    cache.invalidate_lists("1", ["1000"])  # create_post finished while the list was in flight
+    release.set()
+    assert await fetch == {"data": [{"id": 1}]}
+
+    assert await cache.get_list("1", "posts", ["1000"], load) == {"data": [{"id": 2}]}
+    assert await cache.get_list("1", "posts", ["1000"], load) == {"data": [{"id": 2}]}
+    assert loads == 2
@@ -0,0 +1,45 @@
+import json
+import sys
+
+import pytest
+
+from sprout_mcp import server
+from sprout_mcp.client import SproutClient
+from sprout_mcp.results import ResultStore
+
+ROWS = [{"id": i, "text": f"café №{i}", "metrics": {"impressions": i * 10}} for i in range(50)]
+
+
+def test_store_charges_the_encoded_rows_it_keeps() -> None:
+    store = ResultStore(max_bytes=10**6)
+    handle = store.put("tool", ROWS, {"paging": {"pages": 1}})
+    stored = store.get(handle)
+    assert stored.size == sum(sys.getsizeof(r) for r in stored.encoded)
+    assert store.stats()["bytes"] == stored.size
+    assert len(stored) == len(ROWS)
+    assert stored.rows() == ROWS
+    assert stored.rows(10, 12) == ROWS[10:12]
+
+
+def test_store_evicts_by_held_bytes() -> None:
+    probe = ResultStore()
+    one = probe.get(probe.put("tool", ROWS, {})).size
+    store = ResultStore(max_bytes=2 * one)
+    first, _, third = (store.put("tool", ROWS, {}) for _ in range(3))
+    assert store.stats()["evicted"] == 1
+    with pytest.raises(ValueError):
+        store.get(first)
+    assert store.get(third).rows(0, 1) == ROWS[:1]
+    assert ResultStore(max_bytes=one - 1).put("tool", ROWS, {}) is None
+
+
+async def test_oversized_result_reports_its_utf8_size(client: SproutClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server, "_result_handle_bytes", 100)
+    text = server.dumps({"data": ROWS, "_meta": server._meta()})
+    result = json.loads(server._ok(ROWS))
+    assert result["bytes"] == len(text.encode()) > len(text)
+
+    page = json.loads(await server.read_result(result["result_handle"], offset=48))
+    assert page["data"] == ROWS[48:]
+    queried = json.loads(await server.query_result(result["result_handle"], where="metrics.impressions>=470"))
+    assert [r["id"] for r in queried["data"]] == [47, 48, 49]
@@ -0,0 +1,130 @@
+import time
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from sprout_mcp.client import SproutClient
+from sprout_mcp.retry import RetryPolicy, is_read_post, retry_after
+
+
+class ScriptedUpstream:
+    """Answers each request with the next scripted status (then 200), counting requests per path."""
+
+    def __init__(self) -> None:
+        self.script: list[tuple[int, dict[str, str]]] = []
+        self.requests: dict[str, int] = {}
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests[request.url.path] = self.requests.get(request.url.path, 0) + 1
+        if self.script:
+            status, headers = self.script.pop(0)
+            return httpx.Response(status, headers=headers, json={"error": status})
+        return httpx.Response(200, json={"data": [{"id": 1}]})
+
+
+@pytest.fixture
+def upstream() -> ScriptedUpstream:
+    return ScriptedUpstream()
+
+
+@pytest.fixture
+def fast_client(client: SproutClient) -> SproutClient:
+    client.retry = RetryPolicy(max_attempts=4, base_delay=0.001, max_delay=0.05)
+    return client
+
+
+@pytest.mark.parametrize(
+    ("path", "read"),
+    [
+        ("/v1/1/analytics/profiles", True),
+        ("/v1/1/analytics/posts", True),
+        ("/v1/1/listening/topics/t1/messages", True),
+        ("/v1/1/messages", True),
+        ("/v1/1/publishing/posts", False),
+        ("/v1/1/listening/topics/t1/messages/extra", False),
+        ("/v1/1/metadata/customer", False),
+    ],
+)
+def test_is_read_post(path: str, read: bool) -> None:
+    assert is_read_post(path) is read
+
+
+def test_retry_after_parsing() -> None:
+    assert retry_after({"retry-after": "7"}) == 7.0
+    assert retry_after({"retry-after": "-3"}) == 0.0
+    assert retry_after({}) is None
+    assert retry_after({"retry-after": "soon"}) is None
+    hinted = retry_after({"retry-after": formatdate(time.time() + 30, usegmt=True)})
+    assert hinted is not None and 28 <= hinted <= 30
+    assert retry_after({"retry-after": formatdate(time.time() - 30, usegmt=True)}) == 0.0
+
+
+def test_delay_bounds() -> None:
+    policy = RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=20)
+    for _ in range(100):
+        assert 0.5 <= policy.delay(1, 0.0, None) <= 1.5
+        assert 0.5 <= policy.backoff(100) <= 20
+    assert policy.delay(3, 1.0, None) is None  # out of attempts
+
+    def hinted(seconds: str) -> httpx.Response:
+        return httpx.Response(429, headers={"Retry-After": seconds})
+
+    assert policy.delay(1, 0.0, hinted("10")) >= 10
+    assert policy.delay(1, 0.0, hinted("21")) is None  # longer than max_delay: give up
+
+
+async def test_reads_are_retried(fast_client: SproutClient, upstream: ScriptedUpstream) -> None:
+    upstream.script = [(503, {}), (429, {"Retry-After": "0"}), (502, {})]
+    assert await fast_client.get("/v1/1/metadata/customer") == {"data": [{"id": 1}]}
+    assert upstream.requests["/v1/1/metadata/customer"] == 4
+
+    upstream.script = [(429, {})]
+    await fast_client.post("/v1/1/analytics/posts", {"page": 1})
+    assert upstream.requests["/v1/1/analytics/posts"] == 2
+
+
+async def test_reads_give_up_after_max_attempts(fast_client: SproutClient, upstream: ScriptedUpstream) -> None:
+    upstream.script = [(502, {})] * 10
+    with pytest.raises(httpx.HTTPStatusError) as info:
+        await fast_client.get("/v1/1/metadata/customer")
+    assert info.value.response.status_code == 502
+    assert upstream.requests["/v1/1/metadata/customer"] == 4
+
+
+async def test_long_retry_after_fails_instead_of_stalling(fast_client: SproutClient, upstream: ScriptedUpstream) -> None:
+    upstream.script = [(429, {"Retry-After": "3600"})]
+    started = time.monotonic()
+    with pytest.raises(httpx.HTTPStatusError):
+        await fast_client.get("/v1/1/metadata/customer")
+    assert time.monotonic() - started < 1
+    assert upstream.requests["/v1/1/metadata/customer"] == 1
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+async def test_create_post_is_never_retried(fast_client: SproutClient, upstream: ScriptedUpstream, status: int) -> None:
+    upstream.script = [(status, {"Retry-After": "0"})]
+    with pytest.raises(httpx.HTTPStatusError):
+        await fast_client.post("/v1/1/publishing/posts", {"fields": {"text": "hi"}})
+    assert upstream.requests["/v1/1/publishing/posts"] == 1
+
+
+async def test_create_post_is_not_retried_on_a_dropped_connection(fast_client: SproutClient) -> None:
+    sent = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal sent
+        sent += 1
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = SproutClient(base_url="https://sprout.test", transport=httpx.MockTransport(handler))
+    client.retry = fast_client.retry
+    try:
+        with pytest.raises(httpx.ConnectError):
+            await client.post("/v1/1/publishing/posts", {"fields": {"text": "hi"}})
+        assert sent == 1
+        with pytest.raises(httpx.ConnectError):
+            await client.get("/v1/1/metadata/customer")
+        assert sent == 1 + 4
+    finally:
+        await client.aclose()
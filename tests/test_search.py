@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from sprout_mcp import server
+from sprout_mcp.search import SearchIndex
+
+WORDS = ["product", "recall", "refund", "battery", "love", "app", "crash", "great"]
+
+
+def _messages(count: int) -> list[dict[str, str]]:
+    return [
+        {
+            "guid": f"m{i}",
+            "created_time": f"2024-01-{1 + i % 28:02d}T00:00:00Z",
+            "text": " ".join(WORDS[(i * k) % len(WORDS)] for k in range(1, 2 + i % 6)),
+            "network": "REDDIT" if i % 2 else "TWITTER",
+        }
+        for i in range(count)
+    ]
+
+
+def _search(index: SearchIndex, query: str) -> list[tuple[float, str]]:
+    results, _ = index.search(query, customer_id="1", limit=1000)
+    return [(round(score, 9), m["guid"]) for score, m in results]
+
+
+def test_eviction_keeps_the_newest_documents_searchable() -> None:
+    messages = _messages(250)
+    index = SearchIndex(max_documents=100)
+    for start in range(0, len(messages), 25):
+        index.add("1", "t1", messages[start:start + 25])
+        index.flush()
+    assert len(index) <= 100
+
+    # The survivors rank exactly as in an index that only ever held them.
+    survivors = messages[-len(index):]
+    fresh = SearchIndex()
+    fresh.add("1", "t1", survivors)
+    for query in ("recall", "battery crash", '"love app"', "product refund great"):
+        assert _search(index, query) == _search(fresh, query)
+
+    # Evicted messages can be indexed again.
+    index.add("1", "t1", messages[:1])
+    index.flush()
+    assert "m0" in {guid for _, guid in _search(index, WORDS[0])}
+
+
+def test_queued_pages_beyond_the_budget_are_dropped() -> None:
+    index = SearchIndex(max_documents=50)
+    for start in range(0, 500, 10):
+        index.add("1", "t1", _messages(500)[start:start + 10])
+    assert index.stats()["pending"] <= 60
+    index.flush()
+    assert len(index) <= 50
+
+
+async def test_search_does_not_create_a_warehouse(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "warehouse.sqlite3"
+    monkeypatch.setenv("SPROUT_WAREHOUSE_PATH", str(path))
+    monkeypatch.setenv("SPROUT_CUSTOMER_ID", "1")
+    monkeypatch.setattr(server, "_search_index", SearchIndex(max_documents=100))
+    monkeypatch.setattr(server, "_search_loaded", False)
+    monkeypatch.setattr(server, "_warehouse", None)
+    server._search_index.add("1", "t1", _messages(10))
+
+    result = json.loads(await server.search_listening_messages("recall"))
+    assert result["matched"] > 0
+    assert result["index"]["documents"] == 10
+    assert not path.exists()
@@ -0,0 +1,83 @@
+import asyncio
+
+import httpx
+from mcp.server.fastmcp import FastMCP
+
+from sprout_mcp import server
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {"protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "test", "version": "0"}},
+}
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+
+def _app(max_sessions: int, idle_timeout: float) -> tuple[object, server._SessionLimit]:
+    # A fresh FastMCP per test: a session manager can only be run once.
+    mcp = FastMCP("test", lifespan=server._lifespan, json_response=True)
+    app = mcp.streamable_http_app()
+    limit = server._SessionLimit(app, max_sessions=max_sessions, manager=mcp.session_manager, idle_timeout=idle_timeout)
+    return app, limit
+
+
+async def _initialize(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.post("/mcp", json=INITIALIZE, headers=HEADERS)
+
+
+async def test_abandoned_sessions_do_not_lock_the_server() -> None:
+    app, limit = _app(max_sessions=2, idle_timeout=0.2)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(limit), base_url="http://127.0.0.1:8000") as client:
+            # Four clients initialize and leave without DELETE.
+            statuses = [(await _initialize(client)).status_code for _ in range(4)]
+            assert statuses == [200, 200, 503, 503]
+
+            await asyncio.sleep(0.3)
+            first = await _initialize(client)
+            second = await _initialize(client)
+            assert (first.status_code, second.status_code) == (200, 200)
+            assert limit.reaped == 2
+            assert (await _initialize(client)).status_code == 503
+
+
+async def test_reaped_session_is_gone_and_active_session_is_kept() -> None:
+    app, limit = _app(max_sessions=2, idle_timeout=0.2)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(limit), base_url="http://127.0.0.1:8000") as client:
+            idle = (await _initialize(client)).headers["mcp-session-id"]
+            busy = (await _initialize(client)).headers["mcp-session-id"]
+            await asyncio.sleep(0.15)
+            ping = {"jsonrpc": "2.0", "id": 2, "method": "ping"}
+            response = await client.post("/mcp", json=ping, headers={**HEADERS, "mcp-session-id": busy, "mcp-protocol-version": "2025-06-18"})
+            assert response.status_code == 200
+            await asyncio.sleep(0.1)
+
+            assert await limit.reap() == 1
+            response = await client.post("/mcp", json=ping, headers={**HEADERS, "mcp-session-id": idle, "mcp-protocol-version": "2025-06-18"})
+            assert response.status_code == 404
+            assert (await _initialize(client)).status_code == 200
+
+
+async def test_deleted_session_frees_its_slot() -> None:
+    app, limit = _app(max_sessions=1, idle_timeout=3600)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(limit), base_url="http://127.0.0.1:8000") as client:
+            sid = (await _initialize(client)).headers["mcp-session-id"]
+            assert (await _initialize(client)).status_code == 503
+            await client.delete("/mcp", headers={**HEADERS, "mcp-session-id": sid, "mcp-protocol-version": "2025-06-18"})
+            assert (await _initialize(client)).status_code == 200
+
+
+async def test_sdk_session_limit_is_used_when_available() -> None:
+    mcp = FastMCP("test", lifespan=server._lifespan, json_response=True)
+    if not hasattr(mcp.settings, "max_sessions"):
+        return  # older SDK: _http_app falls back to _SessionLimit, covered above
+    app = server._http_app(mcp, max_sessions=1, idle_timeout=3600)
+    assert not any(m.cls is server._SessionLimit for m in app.user_middleware)
+    assert mcp.session_manager.max_sessions == 1
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://127.0.0.1:8000") as client:
+            assert (await _initialize(client)).status_code == 200
+            assert (await _initialize(client)).status_code == 503
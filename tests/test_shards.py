@@ -0,0 +1,94 @@
+import asyncio
+import json
+import re
+from datetime import datetime
+from typing import Any
+
+import httpx
+import pytest
+
+from sprout_mcp import server
+from sprout_mcp.client import SproutClient
+
+START, END = "2024-01-01T00:00:00Z", "2024-01-31T23:59:59Z"
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class InboxUpstream:
+    """A finite /messages endpoint that pages by page_cursor and, like the real API, only sorts on request."""
+
+    def __init__(self, count: int = 500) -> None:
+        first = _parse(START)
+        step = (_parse(END) - first) / count
+        self.messages = [
+            {"guid": f"m{i}", "created_time": (first + step * i).strftime("%Y-%m-%dT%H:%M:%SZ")}
+            # Stored out of created_time order, so an unsorted pull is visibly unsorted.
+            for i in sorted(range(count), key=lambda i: (i * 7919) % count)
+        ]
+        self.requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(0.001)
+        body = json.loads(request.content)
+        window = next(m.group(1) for f in body["filters"] if (m := re.fullmatch(r"created_time\.in\((.*)\)", f)))
+        low, high = (_parse(t) for t in window.split(".."))
+        rows = [m for m in self.messages if low <= _parse(m["created_time"]) <= high]
+        if body.get("sort") == ["created_time:desc"]:
+            rows.sort(key=lambda m: m["created_time"], reverse=True)
+        offset = int(body.get("page_cursor") or 0)
+        page = rows[offset:offset + body["limit"]]
+        more = offset + body["limit"] < len(rows)
+        return httpx.Response(200, json={"data": page, "paging": {"next_cursor": str(offset + body["limit"]) if more else None}})
+
+
+@pytest.fixture
+def upstream() -> InboxUpstream:
+    return InboxUpstream()
+
+
+async def _get_messages(**kwargs: Any) -> dict[str, Any]:
+    text = await server.get_messages(profile_ids="1000", start_time=START, end_time=END, limit=40, **kwargs)
+    return json.loads(text)
+
+
+async def test_sharded_pull_matches_sequential_pull(client: SproutClient, upstream: InboxUpstream) -> None:
+    sequential = await _get_messages(auto_paginate=True, max_items=10000)
+    sharded = await _get_messages(auto_paginate=True, max_items=10000, shards=4)
+
+    times = [m["created_time"] for m in sequential["data"]]
+    assert len(times) == len(upstream.messages)
+    assert times == sorted(times, reverse=True)
+    assert [m["guid"] for m in sharded["data"]] == [m["guid"] for m in sequential["data"]]
+    assert sharded["paging"]["shards"] == 4
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"shards": 4},
+        {"page_cursor": "40", "auto_paginate": True, "shards": 4},
+    ],
+)
+async def test_ignored_paging_options_are_rejected(
+    client: SproutClient, upstream: InboxUpstream, kwargs: dict[str, Any]
+) -> None:
+    result = await _get_messages(**kwargs)
+    assert result["error"] == "ValueError"
+    assert upstream.requests == 0
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"summarize": True},
+        {"shards": 2},
+        {"cursor": "abc", "auto_paginate": True, "shards": 2},
+    ],
+)
+async def test_listening_rejects_ignored_paging_options(client: SproutClient, kwargs: dict[str, Any]) -> None:
+    text = await server.get_listening_messages(topic_id="t1", start_time=START, end_time=END, **kwargs)
+    assert json.loads(text)["error"] == "ValueError"
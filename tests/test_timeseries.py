@@ -0,0 +1,54 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from sprout_mcp.timeseries import MIN_BASELINE, period_change, rolling_sum, slope, zscores  # noqa: E402
+
+nan = math.nan
+
+
+def _rows(*rows: list[float]) -> "np.ndarray":
+    return np.array(rows, dtype=float)
+
+
+def _assert_close(actual: "np.ndarray", expected: list) -> None:
+    np.testing.assert_allclose(actual, np.array(expected, dtype=float), rtol=1e-9, equal_nan=True)
+
+
+def test_rolling_sum_skips_missing_days() -> None:
+    sums, counts = rolling_sum(_rows([1, 2, nan, 4, 5]), 3)
+    _assert_close(sums, [[1, 3, 3, 6, 9]])
+    _assert_close(counts, [[1, 2, 2, 2, 2]])
+
+
+def test_period_change() -> None:
+    x = _rows([1, 1, 2, 2], [nan, 2, 3, 3], [0, 0, 5, 5], [4, 4, 1, 1])
+    _assert_close(period_change(x, 2), [100.0, 200.0, nan, -75.0])
+
+
+def test_period_change_needs_two_full_periods() -> None:
+    _assert_close(period_change(_rows([1, 2, 3], [4, 5, 6]), 2), [nan, nan])
+
+
+def test_zscores_against_the_trailing_baseline() -> None:
+    assert MIN_BASELINE == 7
+    x = _rows(
+        [10, 12, 10, 12, 10, 12, 10, 20, 9],
+        [5, 5, 5, 5, 5, 5, 5, 9, 5],  # flat baseline before day 7: no spread, no z-score
+        [10, 12, nan, 12, 10, 12, 10, 20, 9],  # a missing day: at most six days of history
+    )
+    z = zscores(x, baseline=7)
+    _assert_close(z[0], [nan] * 7 + [9.237604307034012, -1.0009465217452627])
+    assert np.isnan(z[1, :8]).all()
+    assert np.isnan(z[2]).all()
+
+
+def test_zscores_with_a_baseline_shorter_than_the_minimum_are_all_nan() -> None:
+    assert np.isnan(zscores(_rows(list(range(20))), baseline=MIN_BASELINE - 1)).all()
+
+
+def test_slope() -> None:
+    x = _rows([1, 3, 5, 7], [1, nan, 5, 7], [nan, 4, nan, nan], [2, 2, 2, 2])
+    _assert_close(slope(x), [2.0, 2.0, nan, 0.0])
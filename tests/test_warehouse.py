@@ -0,0 +1,93 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+
+from sprout_mcp import server
+from sprout_mcp.client import SproutClient
+from sprout_mcp.warehouse import Warehouse
+
+START, END = "2024-01-01T00:00:00", "2024-01-31T23:59:59"
+
+
+class TopicUpstream:
+    """A finite listening topic, newest first, paged by cursor; request number `fail_at` returns HTTP 400."""
+
+    def __init__(self, count: int = 350) -> None:
+        last = datetime.fromisoformat(END)
+        self.messages = [
+            {"guid": f"m{i}", "created_time": (last - timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%SZ")}
+            for i in range(count)
+        ]
+        self.fail_at: int | None = None
+        self.requests = 0
+        self.served: list[str] = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.requests == self.fail_at:
+            return httpx.Response(400, json={"error": "injected"})
+        body = json.loads(request.content)
+        offset = int(body.get("cursor") or 0)
+        page = self.messages[offset:offset + body["limit"]]
+        self.served += [m["guid"] for m in page]
+        more = offset + body["limit"] < len(self.messages)
+        return httpx.Response(200, json={"data": page, "paging": {"next_cursor": str(offset + body["limit"]) if more else None}})
+
+
+@pytest.fixture
+def upstream() -> TopicUpstream:
+    return TopicUpstream()
+
+
+async def test_interrupted_sync_resumes_without_duplicates_or_gaps(
+    client: SproutClient, upstream: TopicUpstream, tmp_path: Path
+) -> None:
+    warehouse = Warehouse(str(tmp_path / "warehouse.sqlite3"))
+    try:
+        upstream.fail_at = 3  # two pages stored, then the sync dies
+        report = await warehouse.sync(client, "listening", "1", ["t1"], START, END)
+        assert report["t1"]["error"] == "HTTPStatusError"
+        assert len(upstream.served) == 200
+        assert warehouse.query("listening", "1", ["t1"], START, END)["total"] == 200
+
+        upstream.fail_at = None
+        report = await warehouse.sync(client, "listening", "1", ["t1"], START, END)
+        assert report["t1"]["resumed"]
+        assert report["t1"]["windows"] == []
+        assert report["t1"]["rows_fetched"] == 150
+
+        # Every message was fetched exactly once across both runs, and every one is stored.
+        assert sorted(upstream.served) == sorted(m["guid"] for m in upstream.messages)
+        stored = warehouse.query("listening", "1", ["t1"], START, END, limit=1000)
+        assert stored["total"] == len(upstream.messages)
+        assert [m["guid"] for m in stored["data"]] == [m["guid"] for m in upstream.messages]
+        assert stored["coverage"]["t1"]["complete"]
+    finally:
+        warehouse.close()
+
+
+async def test_sqlite_work_runs_off_the_event_loop(
+    client: SproutClient, upstream: TopicUpstream, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    warehouse = Warehouse(str(tmp_path / "warehouse.sqlite3"))
+    monkeypatch.setattr(server, "_warehouse", warehouse)
+    threads: set[str] = set()
+    for name in ("_state", "_begin_window", "_store_page", "query", "stats"):
+        method = getattr(warehouse, name)
+
+        def traced(*args, _method=method, **kwargs):
+            threads.add(threading.current_thread().name)
+            return _method(*args, **kwargs)
+
+        monkeypatch.setattr(warehouse, name, traced)
+    try:
+        result = json.loads(await server.query_synced("listening", "t1", START, END))
+        assert result["total"] == len(upstream.messages)
+        assert "error" not in json.loads(await server.get_client_diagnostics())
+        assert threads and threading.main_thread().name not in threads
+    finally:
+        warehouse.close()